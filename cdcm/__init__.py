@@ -11,8 +11,15 @@ from .state import *
 from .function import *
 from .factory import *
 from .system import *
+from .lti import *
 from .clock import *
+from .data_sources import *
 from .data_system import *
+from .snapshot import *
+from .storage_backends import *
+from .save_policies import *
 from .simulation_saver import *
+from .simulation_results import *
 from .agenda import *
 from .simulator import *
+from .serialization import *
@@ -13,7 +13,7 @@ Date:
 __all__ = ["make_clock"]
 
 
-from . import make_node, make_function, System
+from . import make_node, make_function, declare_k_steps, System
 
 
 def make_clock(
@@ -30,6 +30,7 @@ def make_clock(
         pdt = make_node(f"P:{dt_name}:{dt}:{units}", description="The timestep.")
         t = make_node(f"S:{t_name}:{t0}:{units}", description="The time.")
         @make_function(t)
+        @declare_k_steps(lambda t, dt, k: t + k * dt)
         def tick(t=t, dt=pdt):
             """Moves time forward by `dt`."""
             return t + dt
@@ -0,0 +1,438 @@
+"""Read tabular input data in chunks.
+
+The readers are generators that yield 2-D arrays (rows, columns) of at
+most `chunk_size` rows. They never hold more than one chunk of the
+source in memory. A `Prefetcher` reads the next chunks on a background
+thread while the current one is used.
+
+`resample()` puts data sampled at arbitrary times on the time grid of a
+simulation. `load_source()` reads (and optionally resamples) a whole
+source once and caches the result as a `.npy` file next to it. Later
+loads memory-map the cached array.
+
+The supported sources are CSV files (`.csv`, read with pandas), Parquet
+files (`.parquet`, `.pq`, read with pyarrow) and HDF5 files (`.h5`,
+`.hdf5`) in which every column is a 1-D dataset.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "iter_csv",
+    "iter_parquet",
+    "iter_hdf5",
+    "get_source_columns",
+    "open_source",
+    "Prefetcher",
+    "SOURCE_READERS",
+    "RESAMPLING_METHODS",
+    "make_time_grid",
+    "resample",
+    "hash_file",
+    "load_source",
+    "CACHE_DIR_NAME"
+]
+
+
+import os
+import json
+import contextlib
+import queue
+import hashlib
+import tempfile
+import threading
+import h5py
+import numpy as np
+from typing import (
+    Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
+
+
+def iter_csv(
+    path : str,
+    chunk_size : int,
+    columns : Optional[List[str]] = None,
+    dtype : Any = np.float64
+) -> Iterator[np.ndarray]:
+    """Read the `columns` of a CSV file in chunks of `chunk_size` rows."""
+    import pandas as pd
+    with pd.read_csv(path, usecols=columns, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            if columns is not None:
+                chunk = chunk[columns]
+            yield chunk.to_numpy(dtype=dtype)
+
+
+def iter_parquet(
+    path : str,
+    chunk_size : int,
+    columns : Optional[List[str]] = None,
+    dtype : Any = np.float64
+) -> Iterator[np.ndarray]:
+    """Read the `columns` of a Parquet file in chunks of `chunk_size`
+    rows."""
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path, memory_map=True)
+    for batch in pf.iter_batches(batch_size=chunk_size, columns=columns):
+        yield np.column_stack([
+            c.to_numpy(zero_copy_only=False).astype(dtype, copy=False)
+            for c in batch.columns
+        ])
+
+
+def iter_hdf5(
+    path : str,
+    chunk_size : int,
+    columns : Optional[List[str]] = None,
+    dtype : Any = np.float64
+) -> Iterator[np.ndarray]:
+    """Read 1-D datasets of an HDF5 file in chunks of `chunk_size` rows.
+
+    `columns` are the paths of the datasets.
+    """
+    assert columns is not None, "Give me the paths of the datasets."
+    with h5py.File(path, "r") as fd:
+        dsets = [fd[c] for c in columns]
+        num_rows = min(d.shape[0] for d in dsets)
+        for start in range(0, num_rows, chunk_size):
+            stop = min(start + chunk_size, num_rows)
+            chunk = np.empty((stop - start, len(dsets)), dtype=dtype)
+            for j, d in enumerate(dsets):
+                chunk[:, j] = d[start:stop]
+            yield chunk
+
+
+# The readers for each file extension
+SOURCE_READERS = {
+    ".csv": iter_csv,
+    ".parquet": iter_parquet,
+    ".pq": iter_parquet,
+    ".h5": iter_hdf5,
+    ".hdf5": iter_hdf5,
+}
+
+
+def _get_reader(path : str) -> Callable:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SOURCE_READERS:
+        raise ValueError(
+            f"I do not know how to read `{path}`. The supported "
+            + f"extensions are {tuple(SOURCE_READERS.keys())}."
+        )
+    return SOURCE_READERS[ext]
+
+
+def get_source_columns(path : str) -> List[str]:
+    """Get the names of the columns of a CSV or Parquet file."""
+    reader = _get_reader(path)
+    if reader is iter_csv:
+        import pandas as pd
+        return list(pd.read_csv(path, nrows=0).columns)
+    if reader is iter_parquet:
+        import pyarrow.parquet as pq
+        return list(pq.ParquetFile(path).schema_arrow.names)
+    raise ValueError("The columns of an HDF5 source must be given.")
+
+
+def open_source(
+    path : str,
+    chunk_size : int,
+    columns : Optional[List[str]] = None,
+    dtype : Any = np.float64
+) -> Tuple[List[str], Callable[[], Iterator[np.ndarray]]]:
+    """Get the column names of a source and a function that starts
+    reading it from the beginning.
+
+    For HDF5 files, the names are the last components of the dataset
+    paths.
+    """
+    reader = _get_reader(path)
+    if columns is None:
+        columns = get_source_columns(path)
+    columns = list(columns)
+    names = [c.rsplit("/", 1)[-1] for c in columns]
+    return names, lambda: reader(path, chunk_size, columns, dtype)
+
+
+class Prefetcher(object):
+    """Iterate over `iterable` while a background thread reads ahead.
+
+    At most `depth` items are read ahead. Errors of the thread are
+    raised by `__next__()`.
+
+    Arguments:
+    iterable    -- The iterable to read.
+    depth       -- The number of items to read ahead.
+    """
+
+    # Marks the end of the items
+    _END = object()
+
+    def __init__(self, iterable : Iterable, depth : int = 1):
+        assert depth >= 1, "Read at least one item ahead."
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._done = False
+        self._thread = threading.Thread(
+            target=self._read,
+            args=(iterable,),
+            name="Prefetcher",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item : Any) -> bool:
+        """Put `item` in the queue unless we are asked to stop."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read(self, iterable : Iterable):
+        try:
+            for item in iterable:
+                if not self._put(item):
+                    return
+        except BaseException as error:
+            self._put(error)
+            return
+        self._put(self._END)
+
+    def __iter__(self) -> "Prefetcher":
+        return self
+
+    def __next__(self) -> Any:
+        if self._done:
+            raise StopIteration
+        item = self._queue.get()
+        if item is self._END:
+            self._done = True
+            raise StopIteration
+        if isinstance(item, BaseException):
+            self._done = True
+            raise item
+        return item
+
+    def close(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        self._done = True
+        self._thread.join()
+
+
+# The methods of `resample()`
+RESAMPLING_METHODS = ("zoh", "linear", "cubic")
+
+
+def make_time_grid(t0 : float, dt : float, num_steps : int) -> np.ndarray:
+    """Get the times of the steps of a simulation."""
+    return t0 + dt * np.arange(num_steps)
+
+
+def resample(
+    times : np.ndarray,
+    data : np.ndarray,
+    grid : np.ndarray,
+    method : str = "linear"
+) -> np.ndarray:
+    """Get the values of data sampled at `times` on the times `grid`.
+
+    Outside of the range of `times`, the first or last values are held.
+
+    Arguments:
+    times   -- The increasing times of the rows of `data`.
+    data    -- A 2-D array (rows, columns).
+    grid    -- The times at which the values are needed.
+    method  -- "zoh" (zero-order hold, the last value at or before each
+               time), "linear" or "cubic" (a cubic spline, requires
+               `scipy`).
+
+    Returns a contiguous 2-D array with a row for each time of `grid`.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    data = np.asarray(data)
+    grid = np.asarray(grid, dtype=np.float64)
+    assert times.ndim == 1 and data.shape[0] == times.shape[0], \
+        "I need one time for each row of the data."
+    if np.any(np.diff(times) <= 0.0):
+        raise ValueError("The times must be increasing.")
+    if method == "zoh":
+        idx = np.searchsorted(times, grid, side="right") - 1
+        return np.ascontiguousarray(data[np.clip(idx, 0, len(times) - 1)])
+    clipped = np.clip(grid, times[0], times[-1])
+    if method == "linear":
+        res = np.empty((grid.shape[0], data.shape[1]))
+        for j in range(data.shape[1]):
+            res[:, j] = np.interp(clipped, times, data[:, j])
+        return res
+    if method == "cubic":
+        from scipy.interpolate import CubicSpline
+        return np.ascontiguousarray(CubicSpline(times, data, axis=0)(clipped))
+    raise ValueError(
+        f"Unknown method `{method}`. Pick from {RESAMPLING_METHODS}."
+    )
+
+
+# The directory of the cache (next to the sources)
+CACHE_DIR_NAME = ".cdcm_cache"
+
+# Change this to invalidate all cached arrays
+CACHE_VERSION = 1
+
+
+def hash_file(path : str, block_size : int = 1 << 20) -> str:
+    """Get the SHA-256 hash of the content of a file."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for block in iter(lambda: fd.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_all(
+    path : str,
+    columns : Optional[List[str]],
+    dtype : Any
+) -> Tuple[List[str], np.ndarray]:
+    """Read all the rows of the `columns` of a source."""
+    names, chunks = open_source(path, 100000, columns, dtype)
+    data = list(chunks())
+    if not data:
+        return names, np.empty((0, len(names)), dtype=dtype)
+    return names, np.concatenate(data)
+
+
+def _save_atomically(filename : str, save : Callable[[str], None]) -> None:
+    """Save to a temporary file and then rename it to `filename`.
+
+    Concurrent processes never see half written files.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix=".tmp")
+    os.close(fd)
+    try:
+        save(tmp)
+        os.replace(tmp, filename)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp)
+        raise
+
+
+def load_source(
+    path : str,
+    columns : Optional[Sequence[str]] = None,
+    dtype : Any = np.float64,
+    times : Optional[str] = None,
+    time_scale : float = 1.0,
+    grid : Optional[np.ndarray] = None,
+    method : str = "linear",
+    cache : bool = True,
+    cache_dir : Optional[str] = None
+) -> Tuple[List[str], np.ndarray]:
+    """Load the `columns` of a CSV, Parquet or HDF5 source.
+
+    The parsed (and resampled) array is cached as a `.npy` file. The
+    key of the cache is the hash of the content of the source and of
+    all the arguments. So, a new array is made when the source or the
+    arguments change. When the source changes, the arrays made from its
+    older versions are removed. Cached arrays are memory-mapped
+    copy-on-write. Writing to them changes only the pages that are
+    written (in memory), never the cached file.
+
+    Arguments:
+    path        -- The source (see `open_source()`).
+    columns     -- The columns to load. All if None (CSV and Parquet).
+    dtype       -- The data type of the array.
+    times       -- The column with the times of the rows. Only used
+                   with `grid`. Then it is not part of the result.
+    time_scale  -- The times are multiplied by this (e.g., 3600 to turn
+                   hours into seconds).
+    grid        -- If given, the data are resampled at these times (see
+                   `resample()`).
+    method      -- The resampling method.
+    cache       -- If False, the cache is not used.
+    cache_dir   -- The directory of the cache. The default is
+                   `CACHE_DIR_NAME` in the directory of the source.
+
+    Returns the names of the columns and the 2-D array.
+    """
+    if columns is not None:
+        columns = list(columns)
+    if grid is not None:
+        assert times is not None, "Which column has the times?"
+        grid = np.asarray(grid, dtype=np.float64)
+    if cache:
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                os.path.dirname(os.path.abspath(path)),
+                CACHE_DIR_NAME
+            )
+        settings = {
+            "version": CACHE_VERSION,
+            "columns": columns,
+            "dtype": np.dtype(dtype).str
+        }
+        if grid is not None:
+            settings.update(
+                times=times,
+                time_scale=time_scale,
+                method=method,
+                grid=hashlib.sha256(grid.tobytes()).hexdigest()
+            )
+        settings = json.dumps(settings, sort_keys=True)
+        content_key = hash_file(path)[:16]
+        settings_key = hashlib.sha256(settings.encode()).hexdigest()[:16]
+        # Sources with the same name may share the directory
+        prefix = os.path.join(
+            cache_dir,
+            os.path.basename(path) + "."
+            + hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+            + "."
+        )
+        data_file = prefix + content_key + "." + settings_key + ".npy"
+        names_file = prefix + content_key + "." + settings_key + ".json"
+        if os.path.exists(data_file) and os.path.exists(names_file):
+            with open(names_file) as fd:
+                names = json.load(fd)
+            return names, np.load(data_file, mmap_mode="c")
+    read_columns = columns
+    if grid is not None and columns is not None:
+        read_columns = columns + [times]
+    names, data = _read_all(path, read_columns, dtype)
+    if grid is not None:
+        j = names.index(times.rsplit("/", 1)[-1])
+        t = data[:, j].astype(np.float64) * time_scale
+        keep = [i for i in range(len(names)) if i != j]
+        names = [names[i] for i in keep]
+        data = resample(t, data[:, keep], grid, method)
+        data = data.astype(dtype, copy=False)
+    data = np.ascontiguousarray(data)
+    if not cache:
+        return names, data
+    os.makedirs(cache_dir, exist_ok=True)
+    # Remove the arrays of older versions of the source
+    for f in os.listdir(cache_dir):
+        old = os.path.join(cache_dir, f)
+        if (old.startswith(prefix) and not old.endswith(".tmp")
+            and not old.startswith(prefix + content_key)):
+            # Another process may have removed it already
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(old)
+
+    def save_data(tmp):
+        with open(tmp, "wb") as fd:
+            np.save(fd, data)
+
+    def save_names(tmp):
+        with open(tmp, "w") as fd:
+            json.dump(names, fd)
+
+    _save_atomically(data_file, save_data)
+    _save_atomically(names_file, save_names)
+    return names, np.load(data_file, mmap_mode="c")
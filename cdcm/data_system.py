@@ -13,13 +13,38 @@ TODO: Write me.
 """
 
 
-__all__ = ["DataSystem", "make_data_system"]
+__all__ = [
+    "DataSystem",
+    "DataCursor",
+    "ColumnVariable",
+    "FastDataSystem",
+    "StreamingCursor",
+    "StreamingDataSystem",
+    "TimeCursor",
+    "TimeDataSystem",
+    "make_data_system"
+]
 
 
-from typing import Collection, Union, Sequence
+from typing import Any, Callable, Collection, Iterator, Union, Sequence
 import numpy as np
 from pandas import DataFrame
-from . import Variable, Parameter, State, System, make_function
+from . import (
+    Node,
+    Variable,
+    Parameter,
+    State,
+    System,
+    make_function,
+    declare_k_steps
+)
+from .data_sources import (
+    open_source,
+    load_source,
+    Prefetcher,
+    make_time_grid,
+    resample
+)
 
 class DataSystem(System):
     """A system that just reads through a data sequence.
@@ -89,6 +114,7 @@ class DataSystem(System):
         )
 
         @make_function(row)
+        @declare_k_steps(lambda row, k: row + k)
         def incrow(row=row):
             """Increases the row by one."""
             return row + 1
@@ -105,8 +131,516 @@ class DataSystem(System):
                 return tuple(d.item() for d in data[row])
 
 
-def make_data_system(data : DataFrame, **kwargs):
-    """Make a data system from a pandas DataFrame."""
+class DataCursor(State):
+    """A state that points to the current row of a data array.
+
+    Every `transition()` moves the cursor to the next row and tells the
+    functions that read the columns of the array that their parents
+    have changed. The set of these functions is kept until a column
+    gains or loses a child. The work per step does not depend on the
+    number of columns.
+
+    Arguments:
+    data    -- A 2-D array (rows, columns). It is made contiguous.
+
+    See `State` for the rest of the keyword arguments.
+    """
+
+    def __init__(self, *, data : np.ndarray, **kwargs) -> None:
+        kwargs.setdefault("value", 0)
+        kwargs.setdefault("track", False)
+        super().__init__(**kwargs)
+        self.data = np.ascontiguousarray(data)
+        self._index = self._value
+        self._columns = []
+        self._downstream = None
+
+    @property
+    def columns(self):
+        """Get the variables that read the columns of the data."""
+        return self._columns
+
+    @property
+    def downstream(self):
+        """Get the functions that read the columns of the data."""
+        if self._downstream is None:
+            downstream = {}
+            for c in self._columns:
+                for f in c.children:
+                    downstream[id(f)] = f
+            self._downstream = list(downstream.values())
+        return self._downstream
+
+    def _invalidate_downstream(self) -> None:
+        """Forget the functions that read the columns of the data."""
+        self._downstream = None
+
+    def _move(self, row : int) -> None:
+        """Point to `row` without telling anybody."""
+        self._value = self._next_value = row
+        self._index = row
+
+    def seek(self, row : int) -> None:
+        """Point to `row`."""
+        self._move(row)
+        for f in self.downstream:
+            f.parents_changed = True
+
+    def transition(self) -> None:
+        """Point to the next row."""
+        self.seek(self._value + 1)
+
+    def skip(self, k : int) -> None:
+        """Point `k` rows ahead (see `fast_forward()`)."""
+        self.seek(self._value + k)
+
+
+class ColumnVariable(Variable):
+    """A variable whose value is a column of the data of a cursor at
+    the row that the cursor points to.
+
+    The value is read from the data when it is accessed. Nothing is
+    copied when the cursor moves. Setting the value writes it in the
+    data.
+
+    Arguments:
+    cursor  -- A `DataCursor`.
+    column  -- The index of the column.
+
+    See `Variable` for the rest of the keyword arguments.
+    """
+
+    def __init__(
+        self,
+        *,
+        cursor : DataCursor,
+        column : int,
+        **kwargs
+    ) -> None:
+        self._cursor = cursor
+        self._column = column
+        super().__init__(**kwargs)
+        cursor.columns.append(self)
+
+    @property
+    def value(self) -> Any:
+        """Get the value of the column at the current row."""
+        cursor = self._cursor
+        return cursor.data[cursor._index, self._column]
+
+    @value.setter
+    def value(self, new_value : Any):
+        """Write the value of the column at the current row."""
+        if new_value is None:
+            return
+        self._cursor.data[self._cursor._index, self._column] = new_value
+        self.tell_my_children_I_have_changed()
+
+    def add_child(self, obj : Node, reflexive : bool = True) -> None:
+        super().add_child(obj, reflexive)
+        self._cursor._invalidate_downstream()
+
+    def remove_child(self, obj : Node, reflexive : bool = True) -> None:
+        super().remove_child(obj, reflexive)
+        self._cursor._invalidate_downstream()
+
+
+def _make_column_variables(
+    cursor : DataCursor,
+    columns : Sequence[str],
+    units : Union[str, Sequence[str]] = None,
+    descriptions : Union[str, Sequence[str]] = None,
+    track : Union[bool, Sequence[bool]] = True
+) -> None:
+    """Make a `ColumnVariable` of `cursor` for each of the `columns`.
+
+    `units` and `descriptions` may be a single string or None for all
+    columns. `track` may be a single flag.
+    """
+    num_cols = len(columns)
+    if isinstance(units, str):
+        units = (units,)
+    if isinstance(descriptions, str):
+        descriptions = (descriptions,)
+    if isinstance(track, bool):
+        track = (track,) * num_cols
+    if units is None:
+        units = (None, ) * num_cols
+    if descriptions is None:
+        descriptions = (None, ) * num_cols
+    assert len(units) == num_cols
+    assert len(descriptions) == num_cols
+    for j, (n, u, d, t) in enumerate(zip(columns, units, descriptions, track)):
+        ColumnVariable(
+            name=n,
+            cursor=cursor,
+            column=j,
+            units=u,
+            description=d,
+            track=t
+        )
+
+
+class FastDataSystem(System):
+    """A data system whose columns are read directly from a contiguous
+    array.
+
+    It has the same arguments as `DataSystem`. Instead of reading a
+    row with a function at every step, the output variables are
+    `ColumnVariable`s of a `DataCursor` named `row`. Moving to the next
+    row is a single increment, no matter how many columns there are.
+    The values are NumPy scalars. The variables have their values
+    right after construction.
+
+    `data` can also be the name of a CSV, Parquet or HDF5 file. Then,
+    `columns` are the columns to read (all if None) and the parsed
+    array is cached next to the file (see `load_source()`). The
+    arguments `cache` and `cache_dir` control the cache.
+    """
+
+    def define_internal_nodes(
+        self,
+        data : Union[str, Collection, Collection[Collection]] = None,
+        columns : Union[str, Sequence[str]] = None,
+        column_units : Union[str, Sequence[str]] = None,
+        column_descriptions : Union[str, Sequence[str]] = None,
+        column_track : Union[bool, Sequence[bool]] = True,
+        cache : bool = True,
+        cache_dir : str = None,
+        **kwargs
+    ):
+        if isinstance(columns, str):
+            columns = (columns, )
+        if isinstance(data, str):
+            columns, data = load_source(
+                data,
+                columns,
+                cache=cache,
+                cache_dir=cache_dir
+            )
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        assert len(columns) == data.shape[1]
+
+        row = DataCursor(
+            name="row",
+            data=data,
+            description="The row of the data currently pointing to."
+        )
+        _make_column_variables(
+            row,
+            columns,
+            column_units,
+            column_descriptions,
+            column_track
+        )
+
+
+class StreamingCursor(DataCursor):
+    """A cursor over data that are read in chunks.
+
+    Only the current chunk (and the chunks read ahead) are in memory.
+    The value of the cursor is the row of the whole data. `data` is the
+    current chunk.
+
+    Arguments:
+    chunks      -- A function that returns an iterator over the chunks
+                   (2-D arrays of rows). It is called again when the
+                   cursor seeks backwards.
+    prefetch    -- The number of chunks that are read ahead by a
+                   background thread. If 0, the chunks are read when
+                   they are needed.
+
+    See `State` for the rest of the keyword arguments.
+    """
+
+    def __init__(
+        self,
+        *,
+        chunks : Callable[[], Iterator[np.ndarray]],
+        prefetch : int = 1,
+        **kwargs
+    ) -> None:
+        self._make_chunks = chunks
+        self._prefetch = prefetch
+        self._chunks = None
+        super().__init__(data=self._restart(), **kwargs)
+        self._move(self._value)
+
+    def _restart(self) -> np.ndarray:
+        """Start reading from the beginning and return the first chunk."""
+        self.close()
+        chunks = self._make_chunks()
+        if self._prefetch > 0:
+            chunks = Prefetcher(chunks, depth=self._prefetch)
+        self._chunks = chunks
+        self._offset = 0
+        self.data = np.ascontiguousarray(
+            next(self._chunks, np.empty((0, 0)))
+        )
+        return self.data
+
+    def _move(self, row : int) -> None:
+        if row < self._offset:
+            self._restart()
+        while row >= self._offset + self.data.shape[0]:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                # No more data. Reading the columns will fail.
+                break
+            self._offset += self.data.shape[0]
+            self.data = np.ascontiguousarray(chunk)
+        self._value = self._next_value = row
+        self._index = row - self._offset
+
+    def close(self) -> None:
+        """Stop reading ahead (if the chunks are prefetched)."""
+        if isinstance(self._chunks, Prefetcher):
+            self._chunks.close()
+
+
+class StreamingDataSystem(System):
+    """A data system that reads its data in chunks from a file.
+
+    It works like `FastDataSystem`, but the memory it needs does not
+    depend on the length of the data. The next chunks are read by a
+    background thread while the current one is used.
+
+    Arguments:
+    source      -- A CSV, Parquet or HDF5 file (see `data_sources`),
+                   or a function that returns an iterator over chunks
+                   (2-D arrays of rows). Then, `columns` are the names
+                   of the columns.
+    columns     -- The columns to read. If None, all the columns of a
+                   CSV or Parquet file are read. For HDF5 files, these
+                   are the paths of 1-D datasets.
+    chunk_size  -- The number of rows per chunk.
+    prefetch    -- The number of chunks that are read ahead.
+    dtype       -- The data type of the data.
+
+    See `DataSystem` for the rest of the arguments.
+    """
+
+    def define_internal_nodes(
+        self,
+        source : Union[str, Callable[[], Iterator[np.ndarray]]] = None,
+        columns : Union[str, Sequence[str]] = None,
+        chunk_size : int = 10000,
+        prefetch : int = 1,
+        dtype : Any = np.float64,
+        column_units : Union[str, Sequence[str]] = None,
+        column_descriptions : Union[str, Sequence[str]] = None,
+        column_track : Union[bool, Sequence[bool]] = True,
+        **kwargs
+    ):
+        if isinstance(columns, str):
+            columns = (columns, )
+        if isinstance(source, str):
+            names, chunks = open_source(source, chunk_size, columns, dtype)
+        else:
+            assert columns is not None, "Give me the names of the columns."
+            names, chunks = list(columns), source
+
+        row = StreamingCursor(
+            name="row",
+            chunks=chunks,
+            prefetch=prefetch,
+            description="The row of the data currently pointing to."
+        )
+        _make_column_variables(
+            row,
+            names,
+            column_units,
+            column_descriptions,
+            column_track
+        )
+
+
+class TimeCursor(DataCursor):
+    """A cursor over data that are resampled on the time grid of a
+    simulation.
+
+    Row `k` of the data is the value at time `grid[k]`. Moving to the
+    next step is a single increment. Jumping to a time is a binary
+    search. After the end of the grid, the last row is held.
+
+    Arguments:
+    data    -- A 2-D array with a row for each time of `grid`.
+    grid    -- The increasing times of the steps.
+    t       -- The time node of the clock (optional). It is used by
+               `sync()`.
+
+    See `State` for the rest of the keyword arguments.
+    """
+
+    def __init__(
+        self,
+        *,
+        data : np.ndarray,
+        grid : np.ndarray,
+        t : Variable = None,
+        **kwargs
+    ) -> None:
+        assert data.shape[0] == grid.shape[0], \
+            "I need a row for each time of the grid."
+        super().__init__(data=data, **kwargs)
+        self.grid = grid
+        self._t = t
+        # Tolerance for the round off errors of the clock
+        self._eps = 1e-9 * (grid[1] - grid[0]) if grid.shape[0] > 1 else 0.0
+
+    def _move(self, row : int) -> None:
+        # After the end of the grid, the last row is held
+        self._value = self._next_value = row
+        self._index = min(row, self.data.shape[0] - 1)
+
+    def time_to_row(self, t : float) -> int:
+        """Get the last row whose time is at or before `t`."""
+        return max(
+            int(np.searchsorted(self.grid, t + self._eps, side="right")) - 1,
+            0
+        )
+
+    def seek_time(self, t : float) -> None:
+        """Point to the last row whose time is at or before `t`."""
+        self.seek(self.time_to_row(t))
+
+    def sync(self) -> None:
+        """Point to the row of the current time of the clock."""
+        assert self._t is not None, "I do not have a clock."
+        self.seek_time(self._t.value)
+
+
+class TimeDataSystem(System):
+    """A data system that is keyed on the time of the simulation.
+
+    The data may be sampled at any times. They are resampled once on
+    the time grid of the simulation (`t0 + k * dt`) when the system is
+    made. Then the system works like a `FastDataSystem`: each step moves
+    to the next row. Use `row.seek_time(t)` or `row.sync()` to jump to
+    a time (e.g., after a restart).
+
+    Arguments:
+    data        -- A 2-D array (rows, columns) or a DataFrame.
+    times       -- The increasing times of the rows of the data, in the
+                   units of the clock.
+    columns     -- The names of the columns. Taken from a DataFrame if
+                   None.
+    clock       -- A clock made by `make_clock()`. Its `t` and `dt` give
+                   the time grid. Alternatively, give `dt` and `t0`.
+    dt          -- The time step.
+    t0          -- The initial time.
+    num_steps   -- The number of steps of the grid. The default covers
+                   the times of the data.
+    method      -- The resampling method. "zoh" (zero-order hold),
+                   "linear" or "cubic" (see `resample()`).
+    time_scale  -- Multiplies the times read from a file.
+    cache       -- If True, the resampled data read from a file are
+                   cached next to it (see `load_source()`).
+    cache_dir   -- The directory of the cache.
+
+    `data` can also be the name of a CSV, Parquet or HDF5 file. Then,
+    `times` is the name of the column with the times and `columns` are
+    the columns to read (all the others if None).
+
+    See `DataSystem` for the rest of the arguments.
+    """
+
+    def define_internal_nodes(
+        self,
+        data : Union[np.ndarray, DataFrame] = None,
+        times : Sequence[float] = None,
+        columns : Union[str, Sequence[str]] = None,
+        clock : System = None,
+        dt : float = None,
+        t0 : float = None,
+        num_steps : int = None,
+        method : str = "linear",
+        time_scale : float = 1.0,
+        cache : bool = True,
+        cache_dir : str = None,
+        column_units : Union[str, Sequence[str]] = None,
+        column_descriptions : Union[str, Sequence[str]] = None,
+        column_track : Union[bool, Sequence[bool]] = True,
+        **kwargs
+    ):
+        if isinstance(columns, str):
+            columns = (columns, )
+        source = None
+        if isinstance(data, str):
+            source, time_column = data, times
+            if columns is not None:
+                columns = [c for c in columns if c != time_column]
+            _, times = load_source(
+                source,
+                [time_column],
+                cache=cache,
+                cache_dir=cache_dir
+            )
+            times = times[:, 0] * time_scale
+        elif isinstance(data, DataFrame):
+            if columns is None:
+                columns = tuple(data.columns.values)
+            data = data.values
+        times = np.asarray(times, dtype=np.float64)
+        t = None
+        if clock is not None:
+            t = clock.t
+            dt = clock.dt.value if dt is None else dt
+            t0 = clock.t.value if t0 is None else t0
+        assert dt is not None, "Give me a clock or a time step."
+        t0 = 0.0 if t0 is None else t0
+        if num_steps is None:
+            num_steps = int(np.floor((times[-1] - t0) / dt + 1e-9)) + 1
+        grid = make_time_grid(t0, dt, num_steps)
+        if source is None:
+            data = np.asarray(data, dtype=np.float64)
+            if data.ndim == 1:
+                data = data.reshape(-1, 1)
+            values = resample(times, data, grid, method)
+        else:
+            columns, values = load_source(
+                source,
+                columns,
+                times=time_column,
+                time_scale=time_scale,
+                grid=grid,
+                method=method,
+                cache=cache,
+                cache_dir=cache_dir
+            )
+
+        assert len(columns) == values.shape[1]
+
+        row = TimeCursor(
+            name="row",
+            data=values,
+            grid=grid,
+            t=t,
+            description="The step of the time grid currently pointing to."
+        )
+        _make_column_variables(
+            row,
+            columns,
+            column_units,
+            column_descriptions,
+            column_track
+        )
+
+
+def make_data_system(data : DataFrame, fast : bool = False, **kwargs):
+    """Make a data system from a pandas DataFrame.
+
+    If `fast` is True, a `FastDataSystem` is made. Then, all columns
+    must have types that NumPy can put in a single array.
+    """
+    if fast:
+        return FastDataSystem(
+            data=data.values,
+            columns=tuple(data.columns.values),
+            **kwargs
+        )
     data_system = DataSystem(
         data=data.values,
         columns=data.columns.values,
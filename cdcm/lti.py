@@ -0,0 +1,289 @@
+"""Linear time-invariant transitions that can skip many steps at once.
+
+A `LinearTransition` updates states with `x' = A x + B u`. If `A`, `B`
+and the inputs `u` do not change, `k` steps are:
+
+    x_k = A^k x + (I + A + ... + A^(k-1)) B u.
+
+Both matrices are read from the power of the augmented matrix
+`[[A, I], [0, I]]`, which is computed with `O(log k)` products and
+cached. `fast_forward()` uses this to advance a whole system by `k`
+steps.
+
+Transitions that are not linear can still be skipped if their function
+knows how to do `k` steps at once (see `declare_k_steps()`).
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "LinearTransition",
+    "lti_powers",
+    "declare_k_steps",
+    "can_fast_forward",
+    "fast_forward"
+]
+
+
+from functools import lru_cache
+from typing import Any, Callable, Sequence, Tuple, Union
+import numpy as np
+from . import Node, State, Transition, System
+
+
+# The name of the attribute of a function that does `k` steps at once
+K_STEPS_ATTR = "k_steps"
+
+
+@lru_cache(maxsize=256)
+def _lti_powers_cached(
+    data : bytes,
+    n : int,
+    k : int
+) -> Tuple[np.ndarray, np.ndarray]:
+    A = np.frombuffer(data, dtype=np.float64).reshape(n, n)
+    M = np.zeros((2 * n, 2 * n))
+    M[:n, :n] = A
+    M[:n, n:] = np.eye(n)
+    M[n:, n:] = np.eye(n)
+    P = np.linalg.matrix_power(M, k)
+    Ak = P[:n, :n].copy()
+    Sk = P[:n, n:].copy()
+    Ak.setflags(write=False)
+    Sk.setflags(write=False)
+    return Ak, Sk
+
+
+def lti_powers(A : np.ndarray, k : int) -> Tuple[np.ndarray, np.ndarray]:
+    """Get `A^k` and `I + A + ... + A^(k-1)`.
+
+    The results are cached by the value of `A` and `k`. They are
+    read-only.
+    """
+    A = np.ascontiguousarray(np.atleast_2d(A), dtype=np.float64)
+    assert A.shape[0] == A.shape[1], "A must be square."
+    assert k >= 0, "The number of steps must be nonnegative."
+    return _lti_powers_cached(A.tobytes(), A.shape[0], k)
+
+
+def _is_scalar(A : Any) -> bool:
+    return isinstance(A, (int, float, np.generic)) or (
+        isinstance(A, np.ndarray) and A.size == 1
+    )
+
+
+class LinearTransition(Transition):
+    """A transition `x' = A x + B u`.
+
+    The state vector `x` is made of the values of `states` (flattened
+    and concatenated). The input vector `u` is made of the values of
+    `inputs` in the same way, or by `make_input` if it is given.
+    The matrices can be nodes, NumPy arrays, scalars or anything with
+    `@` (e.g., SciPy sparse matrices).
+
+    Arguments:
+    states      -- A state or a sequence of states.
+    A           -- The matrix of the states.
+    B           -- The matrix of the inputs (None if there are no
+                   inputs).
+    inputs      -- The input nodes.
+    make_input  -- A function that takes the values of the inputs and
+                   returns the input vector.
+
+    See `Function` for the rest of the keyword arguments.
+    """
+
+    def __init__(
+        self,
+        *,
+        states : Union[State, Sequence[State]],
+        A : Any,
+        B : Any = None,
+        inputs : Sequence[Node] = (),
+        make_input : Callable = None,
+        **kwargs
+    ) -> None:
+        if isinstance(states, State):
+            states = (states,)
+        states = tuple(states)
+        inputs = tuple(inputs)
+        self._A = A
+        self._B = B
+        self._make_input = make_input
+        self._num_states = len(states)
+        self._num_inputs = len(inputs)
+        parents = states + tuple(
+            m for m in (A, B) if isinstance(m, Node)
+        ) + inputs
+        super().__init__(
+            func=self._step,
+            parents=parents,
+            children=states,
+            **kwargs
+        )
+
+    @property
+    def states(self) -> Tuple[State]:
+        """Get the states that the transition updates."""
+        return tuple(self.parents[:self._num_states])
+
+    @property
+    def inputs(self) -> Tuple[Node]:
+        """Get the input nodes."""
+        return tuple(self.parents[len(self.parents) - self._num_inputs:])
+
+    def _matrix(self, m : Any) -> Any:
+        return m.value if isinstance(m, Node) else m
+
+    @property
+    def A(self) -> Any:
+        """Get the current value of A."""
+        return self._matrix(self._A)
+
+    @property
+    def B(self) -> Any:
+        """Get the current value of B."""
+        return self._matrix(self._B)
+
+    def _join(self, values : Sequence[Any]) -> np.ndarray:
+        if len(values) == 1:
+            return np.ravel(values[0])
+        return np.concatenate([np.ravel(v) for v in values])
+
+    def _split(self, x : np.ndarray) -> Tuple[Any]:
+        """Split the state vector to the values of the states."""
+        res = []
+        i = 0
+        for s in self.states:
+            old = s.value
+            size = np.size(old)
+            xi = x[i:i + size]
+            if isinstance(old, np.ndarray):
+                res.append(xi.reshape(old.shape))
+            elif isinstance(old, np.generic):
+                res.append(xi[0])
+            else:
+                res.append(xi[0].item())
+            i += size
+        return tuple(res)
+
+    def get_x(self) -> np.ndarray:
+        """Get the state vector."""
+        return self._join([s.value for s in self.states])
+
+    def get_u(self) -> np.ndarray:
+        """Get the input vector."""
+        values = [i.value for i in self.inputs]
+        if self._make_input is not None:
+            return np.ravel(self._make_input(*values))
+        if not values:
+            return np.zeros(0)
+        return self._join(values)
+
+    def get_b(self) -> np.ndarray:
+        """Get the constant term `B u`."""
+        B = self.B
+        if B is None or self._num_inputs == 0:
+            return 0.0
+        u = self.get_u()
+        return np.ravel(B) * u if _is_scalar(B) else B @ u
+
+    def _step(self, *args) -> Tuple[Any]:
+        """Do one step."""
+        x = self.get_x()
+        A = self.A
+        x = (np.ravel(A) * x if _is_scalar(A) else A @ x) + self.get_b()
+        return self._split(np.asarray(x, dtype=np.float64))
+
+    def k_steps(self, k : int) -> Tuple[Any]:
+        """Get the values of the states after `k` steps with the current
+        matrices and inputs.
+
+        Dense matrices use the cached powers of `lti_powers()`. Other
+        matrices (e.g., sparse) are applied `k` times.
+        """
+        x = self.get_x().astype(np.float64)
+        A = self.A
+        b = self.get_b()
+        if _is_scalar(A):
+            Ak, Sk = lti_powers(np.reshape(A, (1, 1)), k)
+            x = Ak[0, 0] * x + Sk[0, 0] * b
+        elif isinstance(A, np.ndarray):
+            Ak, Sk = lti_powers(A, k)
+            x = Ak @ x + Sk @ np.broadcast_to(b, x.shape)
+        else:
+            for _ in range(k):
+                x = A @ x + b
+        return self._split(np.asarray(x, dtype=np.float64))
+
+
+def declare_k_steps(k_steps : Callable) -> Callable:
+    """Declare how a transition function does `k` steps at once.
+
+    Use it as a decorator on the function of a `Transition`. The
+    function `k_steps` takes the same arguments as the decorated
+    function and the keyword argument `k`.
+    """
+    def declare(func : Callable) -> Callable:
+        setattr(func, K_STEPS_ATTR, k_steps)
+        return func
+    return declare
+
+
+def _k_steps_of(t : Transition) -> Callable:
+    """Get a function that gives the states of `t` after `k` steps."""
+    if isinstance(t, LinearTransition):
+        return t.k_steps
+    k_steps = getattr(t.func, K_STEPS_ATTR, None)
+    if k_steps is None:
+        return None
+
+    def res(k):
+        return k_steps(*(p.value for p in t.parents), k=k)
+    return res
+
+
+def can_fast_forward(system : System) -> bool:
+    """Check if all the transitions of `system` can skip steps."""
+    return all(_k_steps_of(t) is not None for t in system.transitions)
+
+
+def fast_forward(system : System, k : int) -> None:
+    """Advance `system` by `k` steps in closed form.
+
+    This is the same as calling `system.forward()` and
+    `system.transition()` `k` times, if the inputs of the transitions
+    do not change during these steps. The functions are evaluated once
+    at the beginning. Every transition must be a `LinearTransition` or
+    have a function declared with `declare_k_steps()`. States that are
+    not updated by a transition and have a `skip(k)` method (e.g., the
+    cursors of data systems) are moved with it.
+    """
+    assert k >= 0, "The number of steps must be nonnegative."
+    if k == 0:
+        return
+    k_steps = []
+    updated = set()
+    for t in system.transitions:
+        f = _k_steps_of(t)
+        if f is None:
+            raise ValueError(
+                f"The transition `{t.absname}` cannot skip steps. "
+                + "Make it a `LinearTransition` or use `declare_k_steps()`."
+            )
+        k_steps.append((t, f))
+        updated.update(id(s) for s in t.children)
+    system.forward()
+    # Compute everything before changing any state
+    results = [(t, f(k)) for t, f in k_steps]
+    for t, res in results:
+        if not isinstance(res, tuple):
+            res = (res,)
+        for value, state in zip(res, t.children):
+            state.value = value
+    for s in system.states:
+        if id(s) not in updated and hasattr(s, "skip"):
+            s.skip(k)
@@ -165,6 +165,7 @@ class Node:
     def owner(self, new_owner : Any) -> None:
         """Set the owner of this object."""
         self._owner = new_owner
+        self._invalidate_absname()
 
     @property
     def name(self) -> str:
@@ -179,12 +180,30 @@ class Node:
             f"{name} is not a string. Names must be strings!"
         )
         self._name = name
+        self._invalidate_absname()
+        # The paths of the owners go through the name
+        owner = self.__dict__.get("_owner")
+        if hasattr(owner, "_invalidate_path_index"):
+            owner._invalidate_path_index()
 
     @property
     def absname(self) -> str:
-        if self.owner is not None:
-            return self.owner.absname + '/' + self.name
-        return self.name
+        """Get the absolute name of the object.
+
+        This is the path from the top owner to the object. It is cached
+        and recomputed only after the name or the owner of the object
+        (or of one of its owners) changes.
+        """
+        if self._absname is None:
+            if self.owner is not None:
+                self._absname = self.owner.absname + '/' + self.name
+            else:
+                self._absname = self.name
+        return self._absname
+
+    def _invalidate_absname(self) -> None:
+        """Forget the cached absolute name."""
+        self._absname = None
 
     @property
     def description(self) -> str:
@@ -0,0 +1,290 @@
+"""Policies that decide which values of a tracked variable are saved.
+
+By default, a `SimulationSaver` writes every tracked variable at every
+step. A save policy replaces this for the variables it is assigned to
+(see the `policies` argument of `SimulationSaver`). A policy writes one
+or more datasets. Their names are the name of the variable followed by
+a suffix (e.g., `"x.max"`). Policies that do not write a row at every
+step also write the companion dataset `"x.steps"` with the step number
+of each row.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "SavePolicy",
+    "EveryKSteps",
+    "OnChange",
+    "WindowStats",
+    "TriggeredWindow",
+    "STEPS_SUFFIX"
+]
+
+
+import copy
+import numpy as np
+from collections import deque
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+from . import Node
+
+
+# The suffix of the dataset with the step numbers of the saved rows
+STEPS_SUFFIX = ".steps"
+
+
+class SavePolicy(object):
+    """The interface of the save policies.
+
+    A policy object keeps the state of a single variable. The saver
+    makes a copy of the policy for every variable that it applies to
+    (see `copy()`).
+    """
+
+    # The name recorded in the `save_policy` attribute of the datasets
+    name = "every_step"
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        """Get the attributes that are added to the datasets."""
+        return {}
+
+    def reset(self) -> None:
+        """Forget everything about the values recorded so far."""
+        pass
+
+    def copy(self) -> "SavePolicy":
+        """Get a copy of the policy with a fresh state.
+
+        The arguments of the policy (e.g., a trigger node) are shared.
+        """
+        policy = copy.copy(self)
+        policy.reset()
+        return policy
+
+    def get_datasets(
+        self,
+        shape : Tuple[int],
+        dtype : Any
+    ) -> List[Tuple[str, Tuple[int], Any]]:
+        """Get the datasets written for values of `shape` and `dtype`.
+
+        Returns a list of `(suffix, shape, dtype)`. The empty suffix
+        refers to the path of the variable.
+        """
+        return [("", shape, dtype)]
+
+    def record(self, step : int, value : Any) -> List[tuple]:
+        """Get the rows to save after `step` at which the variable has
+        `value`.
+
+        Every row is a tuple with one entry per dataset in the order of
+        `get_datasets()`.
+        """
+        return [(value,)]
+
+    def finish(self) -> List[tuple]:
+        """Get the rows to save when the saver is closed."""
+        return []
+
+
+class EveryKSteps(SavePolicy):
+    """Saves every `k`-th step starting at step `offset`.
+
+    Row `i` is step `offset + i * k`. The datasets have the attributes
+    `stride` and `offset`.
+    """
+
+    name = "every_k_steps"
+
+    def __init__(self, k : int, offset : int = 0):
+        assert k >= 1, "The stride must be at least 1."
+        assert 0 <= offset < k, "The offset must be in [0, k)."
+        self.k = k
+        self.offset = offset
+
+    @property
+    def attrs(self):
+        return {"stride": self.k, "offset": self.offset}
+
+    def record(self, step, value):
+        if step % self.k == self.offset:
+            return [(value,)]
+        return []
+
+
+class OnChange(SavePolicy):
+    """Saves a value only if it differs from the last saved value.
+
+    The first value is always saved. The values are compared with
+    `numpy.allclose(value, last, rtol, atol)`, or exactly if both
+    tolerances are zero.
+    """
+
+    name = "on_change"
+
+    def __init__(self, atol : float = 0.0, rtol : float = 0.0):
+        self.atol = atol
+        self.rtol = rtol
+        self.reset()
+
+    @property
+    def attrs(self):
+        return {"atol": self.atol, "rtol": self.rtol}
+
+    def reset(self):
+        self._last = None
+
+    def get_datasets(self, shape, dtype):
+        return [("", shape, dtype), (STEPS_SUFFIX, (), np.int64)]
+
+    def _changed(self, value) -> bool:
+        if self._last is None:
+            return True
+        if self.atol == 0.0 and self.rtol == 0.0:
+            return not np.array_equal(value, self._last)
+        return not np.allclose(value, self._last, self.rtol, self.atol)
+
+    def record(self, step, value):
+        if not self._changed(value):
+            return []
+        self._last = np.array(value, copy=True)
+        return [(value, step)]
+
+
+class WindowStats(SavePolicy):
+    """Saves statistics of consecutive windows of `window` steps.
+
+    Row `i` summarizes steps `i * window` to `(i + 1) * window`. The
+    last window may be shorter. The companion dataset has the first step
+    of each window.
+
+    Arguments:
+    window  -- The number of steps in a window.
+    stats   -- The statistics to save. Any of `"min"`, `"max"`,
+               `"mean"`. The statistics are computed elementwise.
+    """
+
+    name = "window_stats"
+
+    STATS = ("min", "max", "mean")
+
+    def __init__(
+        self,
+        window : int,
+        stats : Sequence[str] = ("min", "max", "mean")
+    ):
+        assert window >= 1, "The window must have at least one step."
+        for s in stats:
+            if s not in self.STATS:
+                raise ValueError(f"Unknown statistic `{s}`. "
+                                 + f"Pick from {self.STATS}.")
+        self.window = window
+        self.stats = tuple(stats)
+        self.reset()
+
+    @property
+    def attrs(self):
+        return {"window": self.window}
+
+    def reset(self):
+        self._start = None
+        self._num = 0
+
+    def get_datasets(self, shape, dtype):
+        mean_dtype = np.result_type(dtype, np.float64)
+        return [
+            ("." + s, shape, mean_dtype if s == "mean" else dtype)
+            for s in self.stats
+        ] + [(STEPS_SUFFIX, (), np.int64)]
+
+    def _emit(self) -> List[tuple]:
+        row = tuple(
+            self._sum / self._num if s == "mean" else getattr(self, "_" + s)
+            for s in self.stats
+        ) + (self._start,)
+        self._num = 0
+        return [row]
+
+    def record(self, step, value):
+        value = np.asarray(value)
+        if self._num == 0:
+            self._start = step
+            self._min = value.copy()
+            self._max = value.copy()
+            self._sum = value.astype(np.float64)
+        else:
+            np.minimum(self._min, value, out=self._min)
+            np.maximum(self._max, value, out=self._max)
+            self._sum = self._sum + value
+        self._num += 1
+        if self._num == self.window:
+            return self._emit()
+        return []
+
+    def finish(self):
+        if self._num > 0:
+            return self._emit()
+        return []
+
+
+class TriggeredWindow(SavePolicy):
+    """Saves the steps around the steps at which a trigger fires.
+
+    When the trigger fires, the `before` preceding steps, the current
+    step and the `after` following steps are saved. Windows that
+    overlap are merged.
+
+    Arguments:
+    trigger -- A callable with no arguments that returns True when an
+               event happens, or a node whose value is tested for
+               truth (e.g., a flag set by a fault model).
+    before  -- The number of steps to save before the event.
+    after   -- The number of steps to save after the event.
+    """
+
+    name = "triggered_window"
+
+    def __init__(
+        self,
+        trigger : Union[Callable[[], bool], Node],
+        before : int = 10,
+        after : int = 10
+    ):
+        assert before >= 0 and after >= 0, \
+            "The window sizes must be nonnegative."
+        self.trigger = trigger
+        self.before = before
+        self.after = after
+        self.reset()
+
+    @property
+    def attrs(self):
+        return {"before": self.before, "after": self.after}
+
+    def reset(self):
+        self._history = deque(maxlen=self.before)
+        self._remaining = 0
+
+    def get_datasets(self, shape, dtype):
+        return [("", shape, dtype), (STEPS_SUFFIX, (), np.int64)]
+
+    def _fired(self) -> bool:
+        if isinstance(self.trigger, Node):
+            return bool(self.trigger.value)
+        return bool(self.trigger())
+
+    def record(self, step, value):
+        rows = []
+        if self._fired():
+            rows = [(v, s) for s, v in self._history]
+            self._history.clear()
+            self._remaining = self.after + 1
+        if self._remaining > 0:
+            rows.append((value, step))
+            self._remaining -= 1
+        elif self.before > 0:
+            self._history.append((step, np.array(value, copy=True)))
+        return rows
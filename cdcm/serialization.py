@@ -0,0 +1,155 @@
+"""Fast binary serialization of complete systems.
+
+A saved system contains its topology (owners, parents, children), the
+values, units and track flags of its variables, and references to the
+callables of its functions. Functions that can be imported are stored
+by their qualified name. Everything else (e.g., the closures made by
+`make_function` inside `define_internal_nodes`) is stored by value
+using `cloudpickle`. Optionally, the compiled evaluation plan (the
+cached `dag`, `evaluation_order`, etc.) is stored as well, so that a
+loaded system can be simulated right away.
+
+Loading does not call `define_internal_nodes()`. The nodes are
+restored exactly as they were saved.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = ["save_system", "load_system"]
+
+
+import pickle
+import cloudpickle
+from functools import cached_property
+from typing import BinaryIO, Dict, List, Union
+from . import Node, System
+
+
+# Written at the beginning of every file
+MAGIC = b"CDCMSYS\x01"
+
+# Attributes of a system that make up its compiled evaluation plan
+PLAN_ATTRIBUTES = ("evaluation_order",)
+
+
+def _collect_nodes(system : System) -> List[Node]:
+    """Return `system` followed by all the nodes it owns (recursively)."""
+    nodes = [system]
+    for n in system.direct_nodes:
+        if isinstance(n, System):
+            nodes.extend(_collect_nodes(n))
+        else:
+            nodes.append(n)
+    return nodes
+
+
+def _cached_attributes(obj : Node) -> set:
+    """Return the names of the cached properties of `obj`."""
+    return {
+        k
+        for klass in type(obj).__mro__
+        for k, v in vars(klass).items()
+        if isinstance(v, cached_property)
+    }
+
+
+def _node_state(node : Node, include_plan : bool) -> Dict:
+    """Get the attributes of `node` that need to be stored."""
+    state = dict(vars(node))
+    if not include_plan:
+        for k in _cached_attributes(node):
+            state.pop(k, None)
+    return state
+
+
+class _SystemPickler(cloudpickle.CloudPickler):
+    """Pickles references to indexed nodes as integers."""
+
+    def __init__(self, file : BinaryIO, index : Dict[Node, int]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._index = index
+
+    def persistent_id(self, obj):
+        if isinstance(obj, Node):
+            return self._index.get(obj)
+        return None
+
+
+class _SystemUnpickler(pickle.Unpickler):
+    """Resolves the integer references written by `_SystemPickler`."""
+
+    def __init__(self, file : BinaryIO, nodes : List[Node]):
+        super().__init__(file)
+        self._nodes = nodes
+
+    def persistent_load(self, pid):
+        return self._nodes[pid]
+
+
+def _dump(system : System, fd : BinaryIO, include_plan : bool) -> None:
+    if include_plan:
+        for attr in PLAN_ATTRIBUTES:
+            getattr(system, attr)
+    nodes = _collect_nodes(system)
+    index = {n: i for i, n in enumerate(nodes)}
+    fd.write(MAGIC)
+    pickle.dump(
+        [type(n) for n in nodes],
+        fd,
+        protocol=pickle.HIGHEST_PROTOCOL
+    )
+    _SystemPickler(fd, index).dump(
+        [_node_state(n, include_plan) for n in nodes]
+    )
+
+
+def _load(fd : BinaryIO) -> System:
+    magic = fd.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError("This is not a file made by `save_system()`.")
+    types = pickle.load(fd)
+    nodes = [NodeType.__new__(NodeType) for NodeType in types]
+    states = _SystemUnpickler(fd, nodes).load()
+    for n, state in zip(nodes, states):
+        n.__dict__.update(state)
+    return nodes[0]
+
+
+def save_system(
+    system : System,
+    file : Union[str, BinaryIO],
+    include_plan : bool = True
+) -> None:
+    """Save a system to a binary file.
+
+    Nodes that do not belong to `system` but are referenced by it (e.g.,
+    a placeholder parent) are stored by value.
+
+    Arguments:
+    system          -- The system to save.
+    file            -- A filename or a file opened for binary writing.
+                       An existing file is overwritten.
+    include_plan    -- If True, the evaluation order of `system` is
+                       computed (if needed) and stored together with the
+                       other cached properties of the systems.
+    """
+    if isinstance(file, str):
+        with open(file, "wb") as fd:
+            _dump(system, fd, include_plan)
+    else:
+        _dump(system, file, include_plan)
+
+
+def load_system(file : Union[str, BinaryIO]) -> System:
+    """Load a system saved with `save_system()`.
+
+    Arguments:
+    file    -- A filename or a file opened for binary reading.
+    """
+    if isinstance(file, str):
+        with open(file, "rb") as fd:
+            return _load(fd)
+    return _load(file)
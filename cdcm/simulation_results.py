@@ -0,0 +1,644 @@
+"""Read the output of simulations.
+
+`SimulationResults` opens the output of a `SimulationSaver` written with
+any of the storage backends. Nothing is loaded when it is opened. Every
+dataset is exposed as a lazy, sliceable array. Uncompressed and
+contiguous data (raw memmap files and contiguous HDF5 datasets) are
+memory-mapped. Data are read only when they are sliced or when they are
+turned into pandas/xarray objects.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = ["SimulationResults", "SimulationTail", "LazyArray"]
+
+
+import os
+import json
+import time
+import h5py
+import numpy as np
+from contextlib import AbstractContextManager
+from typing import Any, Dict, List, Optional, Sequence, Union
+from .system import _match_path
+from .storage_backends import (
+    HDF5Backend,
+    ZarrBackend,
+    ParquetBackend,
+    MemmapBackend,
+    MEMMAP_METADATA,
+    PARQUET_METADATA_KEY,
+    VALID_LENGTH,
+    get_backend_type
+)
+
+
+class LazyArray(object):
+    """A lazy view of the first `num_steps` steps of a dataset.
+
+    Slicing returns NumPy arrays. Only the requested entries are read.
+
+    Arguments:
+    data        -- Anything that has `shape`, `dtype` and supports NumPy
+                   style slicing (e.g., an h5py dataset, a Zarr array or
+                   a `numpy.memmap`).
+    num_steps   -- The number of valid steps. If None, all the steps of
+                   `data` are valid.
+    """
+
+    def __init__(self, data : Any, num_steps : Optional[int] = None):
+        self._data = data
+        if num_steps is None:
+            num_steps = data.shape[0]
+        self._num_steps = min(num_steps, data.shape[0])
+
+    @property
+    def data(self) -> Any:
+        """Get the underlying array."""
+        return self._data
+
+    @property
+    def shape(self) -> tuple:
+        return (self._num_steps,) + tuple(self._data.shape[1:])
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self._data.dtype)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def __len__(self) -> int:
+        return self._num_steps
+
+    def _fix_time_index(self, idx : Any) -> Any:
+        """Make the index of the time axis refer to the valid steps."""
+        if isinstance(idx, slice):
+            return slice(*idx.indices(self._num_steps))
+        if isinstance(idx, (int, np.integer)):
+            if not -self._num_steps <= idx < self._num_steps:
+                raise IndexError(
+                    f"Step {idx} is out of range ({self._num_steps} steps)."
+                )
+            return idx % self._num_steps
+        if idx is Ellipsis:
+            return slice(0, self._num_steps)
+        idx = np.asarray(idx)
+        if idx.dtype == bool:
+            if idx.shape != (self._num_steps,):
+                raise IndexError(
+                    f"A mask of shape {idx.shape} does not match the"
+                    f" {self._num_steps} steps."
+                )
+            return np.flatnonzero(idx)
+        out = (idx < -self._num_steps) | (idx >= self._num_steps)
+        if np.any(out):
+            raise IndexError(
+                f"Steps {idx[out].tolist()} are out of range"
+                f" ({self._num_steps} steps)."
+            )
+        return np.where(idx < 0, idx + self._num_steps, idx)
+
+    def __getitem__(self, key : Any) -> np.ndarray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        if key and key[0] is not Ellipsis:
+            key = (self._fix_time_index(key[0]),) + key[1:]
+        else:
+            key = (slice(0, self._num_steps),) + key
+        return np.asarray(self._data[key])
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        res = self[:]
+        return res if dtype is None else res.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f"LazyArray(shape={self.shape}, dtype={self.dtype})"
+
+
+class _ParquetColumn(object):
+    """A column of a Parquet file that is read on first access."""
+
+    def __init__(self, parquet_file, name : str, dtype : str, shape : tuple):
+        self._file = parquet_file
+        self._name = name
+        self._values = None
+        self.dtype = np.dtype(dtype)
+        self.shape = (parquet_file.metadata.num_rows,) + shape
+
+    def _read(self) -> np.ndarray:
+        if self._values is None:
+            col = self._file.read(columns=[self._name]).column(0)
+            col = col.combine_chunks()
+            if len(self.shape) > 1:
+                col = col.flatten()
+            self._values = col.to_numpy().reshape(self.shape)
+        return self._values
+
+    def __getitem__(self, key : Any) -> np.ndarray:
+        return self._read()[key]
+
+
+class _PackedColumn(object):
+    """A column of a packed `(time, column)` dataset."""
+
+    def __init__(self, data : Any, column : int):
+        self._data = data
+        self._column = column
+        self.dtype = data.dtype
+        self.shape = (data.shape[0],)
+
+    def __getitem__(self, key : Any) -> np.ndarray:
+        if isinstance(key, tuple):
+            key = key[0]
+        return self._data[key, self._column]
+
+
+def _open_hdf5(target : Union[str, h5py.Group]) -> tuple:
+    if isinstance(target, str):
+        file_handler = h5py.File(target, "r")
+        group = file_handler["/"]
+    else:
+        file_handler = None
+        group = target
+    datasets, attrs = {}, {"": dict(group.attrs)}
+
+    def visit(name, obj):
+        if name == VALID_LENGTH:
+            # Written in SWMR mode. Used if the saver did not finish.
+            attrs[""].setdefault("num_steps", int(obj[0]))
+            return
+        attrs[name] = dict(obj.attrs)
+        if isinstance(obj, h5py.Dataset):
+            datasets[name] = _memmap_hdf5(obj)
+
+    group.visititems(visit)
+    return datasets, attrs, file_handler
+
+
+def _memmap_hdf5(dset : h5py.Dataset) -> Any:
+    """Memory-map a contiguous HDF5 dataset if possible."""
+    offset = dset.id.get_offset()
+    if (dset.chunks is not None or dset.compression is not None
+        or offset is None or dset.dtype.hasobject):
+        return dset
+    return np.memmap(
+        dset.file.filename,
+        mode="r",
+        dtype=dset.dtype,
+        offset=offset,
+        shape=dset.shape
+    )
+
+
+def _open_zarr(path : str) -> tuple:
+    import zarr
+    root = zarr.open_group(path, mode="r")
+    datasets, attrs = {}, {"": dict(root.attrs)}
+
+    def visit(prefix, grp):
+        for name, arr in grp.arrays():
+            datasets[prefix + name] = arr
+            attrs[prefix + name] = dict(arr.attrs)
+        for name, sub in grp.groups():
+            attrs[prefix + name] = dict(sub.attrs)
+            visit(prefix + name + "/", sub)
+
+    visit("", root)
+    return datasets, attrs, None
+
+
+def _open_parquet(path : str) -> tuple:
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path, memory_map=True)
+    meta = json.loads(pf.metadata.metadata[PARQUET_METADATA_KEY])
+    datasets = {}
+    attrs = {k.lstrip("/"): v for k, v in meta["groups"].items()}
+    for path, info in meta["datasets"].items():
+        name = path.lstrip("/")
+        datasets[name] = _ParquetColumn(
+            pf,
+            name,
+            info["dtype"],
+            tuple(info["shape"])
+        )
+        attrs[name] = info["attrs"]
+    return datasets, attrs, None
+
+
+def _open_memmap(path : str) -> tuple:
+    with open(os.path.join(path, MEMMAP_METADATA)) as fd:
+        meta = json.load(fd)
+    datasets = {}
+    attrs = {k.lstrip("/"): v for k, v in meta["groups"].items()}
+    for dpath, info in meta["datasets"].items():
+        name = dpath.lstrip("/")
+        shape = (info["num_steps"],) + tuple(info["shape"])
+        if info["num_steps"] == 0:
+            datasets[name] = np.empty(shape, dtype=info["dtype"])
+        else:
+            datasets[name] = np.memmap(
+                os.path.join(path, info["file"]),
+                mode="r",
+                dtype=info["dtype"],
+                shape=shape
+            )
+        attrs[name] = info["attrs"]
+    return datasets, attrs, None
+
+
+READERS = {
+    HDF5Backend: _open_hdf5,
+    ZarrBackend: _open_zarr,
+    ParquetBackend: _open_parquet,
+    MemmapBackend: _open_memmap,
+}
+
+
+class SimulationResults(AbstractContextManager):
+    """The results of a simulation saved by a `SimulationSaver`.
+
+    Datasets are accessed by their path (e.g., `results["sys/x"]`; a
+    leading "/" is optional) and are returned as `LazyArray`s. If the
+    saver recorded the number of saved steps, the arrays only expose
+    those steps. Nodes that were packed into a `(time, column)` dataset
+    are accessed by their own paths as well. Datasets written with a
+    save policy have fewer rows. Use `steps()` or `get_time(path)` to
+    find out when they were saved.
+
+    Arguments:
+    file_or_group   -- A filename or URI as accepted by `open_backend()`,
+                       or a group of an already opened HDF5 file.
+    time            -- The path of the dataset with the simulation time,
+                       used as the index of pandas/xarray objects. If
+                       None, a dataset named "t" in a system named
+                       "clock" is used if there is exactly one.
+                       Otherwise, the step number is used.
+    """
+
+    def __init__(
+        self,
+        file_or_group : Union[str, h5py.Group],
+        time : Optional[str] = None
+    ):
+        if isinstance(file_or_group, h5py.Group):
+            reader = _open_hdf5
+            target = file_or_group
+        else:
+            BackendType, target = get_backend_type(file_or_group)
+            reader = READERS[BackendType]
+        datasets, self._attrs, self._file_handler = reader(target)
+        self._unpack(datasets)
+        num_steps = self._attrs[""].get("num_steps", None)
+        self._datasets = {
+            k: LazyArray(v, num_steps) for k, v in sorted(datasets.items())
+        }
+        if time is None:
+            clocks = self.select("**/clock/t") + self.select("clock/t")
+            time = clocks[0] if len(clocks) == 1 else None
+        self._time = None if time is None else time.lstrip("/")
+
+    def _unpack(self, datasets : Dict[str, Any]) -> None:
+        """Add the columns of packed datasets as datasets of their own."""
+        for name, data in list(datasets.items()):
+            attrs = self._attrs[name]
+            if "columns" not in attrs:
+                continue
+            for j, column in enumerate(attrs["columns"]):
+                datasets[str(column)] = _PackedColumn(data, j)
+                self._attrs[str(column)] = {
+                    "units": str(attrs["units"][j]),
+                    "description": str(attrs["descriptions"][j]),
+                    "packed_in": name
+                }
+
+    @property
+    def paths(self) -> List[str]:
+        """Get the paths of all datasets.
+
+        Packed datasets are not listed. Their columns are.
+        """
+        return [p for p in self._datasets if "columns" not in self._attrs[p]]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Get the attributes of the root group (e.g., `num_steps`)."""
+        return self._attrs[""]
+
+    @property
+    def num_steps(self) -> int:
+        """Get the number of saved steps."""
+        if "num_steps" in self.metadata:
+            return int(self.metadata["num_steps"])
+        return max((len(d) for d in self._datasets.values()), default=0)
+
+    def attrs(self, path : str) -> Dict[str, Any]:
+        """Get the attributes of a dataset or group."""
+        return self._attrs[path.strip("/")]
+
+    def __contains__(self, path : str) -> bool:
+        return path.lstrip("/") in self._datasets
+
+    def __getitem__(self, path : str) -> LazyArray:
+        try:
+            return self._datasets[path.lstrip("/")]
+        except KeyError:
+            raise KeyError(f"There is no dataset `{path}` in the results.")
+
+    def select(self, pattern : str) -> List[str]:
+        """Get the paths of the datasets that match a glob `pattern`.
+
+        The pattern is matched one component at a time (see
+        `System.select()`). A leading `"**/"` matches any number of
+        components.
+        """
+        pattern = pattern.strip("/")
+        if pattern.startswith("**/"):
+            tail = pattern[3:].split("/")
+            return [
+                p for p in self.paths
+                if any(
+                    _match_path(p.split("/")[i:], tail)
+                    for i in range(1, len(p.split("/")))
+                )
+            ]
+        parts = pattern.split("/")
+        return [p for p in self.paths if _match_path(p.split("/"), parts)]
+
+    def _get_paths(self, paths : Union[None, str, Sequence[str]]) -> List[str]:
+        if paths is None:
+            paths = self.paths
+        elif isinstance(paths, str):
+            paths = self.select(paths)
+        else:
+            return [p.lstrip("/") for p in paths]
+        return [p for p in paths if "steps_of" not in self.attrs(p)]
+
+    def _is_sparse(self, path : str) -> bool:
+        """Check if a dataset does not have a row for every step."""
+        attrs = self.attrs(path)
+        return "steps" in attrs or "stride" in attrs or "steps_of" in attrs
+
+    def steps(self, path : str) -> np.ndarray:
+        """Get the step numbers of the rows of a dataset.
+
+        These are `0, 1, ...` unless the dataset was written with a save
+        policy (see `save_policies`).
+        """
+        attrs = self.attrs(path)
+        if "steps_of" in attrs:
+            return self[path][:]
+        if "steps" in attrs:
+            return self[attrs["steps"]][:]
+        n = len(self[path])
+        if "stride" in attrs:
+            return attrs["offset"] + attrs["stride"] * np.arange(n)
+        return np.arange(n)
+
+    def get_time(self, path : Optional[str] = None) -> np.ndarray:
+        """Get the simulation time (or the step numbers).
+
+        If `path` is given, get the times of the rows of that dataset.
+        """
+        steps = np.arange(self.num_steps) if path is None else self.steps(path)
+        return self._time_at(steps)
+
+    def _time_at(self, steps : np.ndarray) -> np.ndarray:
+        """Get the simulation time (or the step numbers) at `steps`.
+
+        If the time was saved with a save policy, it is interpolated
+        linearly between the saved steps.
+        """
+        if self._time is None:
+            return steps
+        if self._is_sparse(self._time):
+            return np.interp(
+                steps,
+                self.steps(self._time),
+                self[self._time][:]
+            )
+        return self[self._time][:][steps]
+
+    def _load(self, path : str, time_slice : slice) -> tuple:
+        """Load the rows of a dataset that fall in `time_slice`.
+
+        Returns the data and their step numbers.
+        """
+        if not self._is_sparse(path):
+            data = self[path][time_slice]
+            return data, np.arange(self.num_steps)[time_slice][:len(data)]
+        steps = self.steps(path)
+        keep = np.isin(steps, np.arange(self.num_steps)[time_slice])
+        return self[path][:][keep], steps[keep]
+
+    def to_pandas(
+        self,
+        paths : Union[None, str, Sequence[str]] = None,
+        time_slice : slice = slice(None)
+    ) -> "pandas.DataFrame":
+        """Load datasets into a time-indexed `pandas.DataFrame`.
+
+        Arrays are flattened into one column per entry, named like
+        `"sys/A[0, 1]"`. Datasets written with a save policy are aligned
+        on the steps at which they were saved and are missing (NaN) at
+        the other steps. The companion step datasets are skipped unless
+        they are asked for explicitly.
+
+        Arguments:
+        paths       -- A glob pattern, a list of paths, or None for all
+                       datasets.
+        time_slice  -- The steps to load.
+        """
+        import pandas as pd
+        columns = {}
+        for p in self._get_paths(paths):
+            data, steps = self._load(p, time_slice)
+            if data.ndim == 1:
+                columns[p] = pd.Series(data, index=steps)
+            else:
+                flat = data.reshape(data.shape[0], -1)
+                for j, idx in enumerate(np.ndindex(*data.shape[1:])):
+                    columns[f"{p}[{', '.join(map(str, idx))}]"] = pd.Series(
+                        flat[:, j],
+                        index=steps
+                    )
+        df = pd.DataFrame(columns)
+        if not columns:
+            df.index = np.arange(self.num_steps)[time_slice]
+        df.index = pd.Index(
+            self._time_at(df.index.to_numpy(dtype=int)),
+            name=self._time or "step"
+        )
+        return df
+
+    def to_xarray(
+        self,
+        paths : Union[None, str, Sequence[str]] = None,
+        time_slice : slice = slice(None)
+    ) -> "xarray.Dataset":
+        """Load datasets into a time-indexed `xarray.Dataset`.
+
+        See `to_pandas()` for the arguments. Every dataset becomes a
+        data variable with dimensions `("time", "<path>_dim_1", ...)`.
+        Datasets written with a save policy have their own time
+        dimension `"<path>_time"`.
+        """
+        import xarray as xr
+        data_vars = {}
+        coords = {"time": self.get_time()[time_slice]}
+        for p in self._get_paths(paths):
+            data, steps = self._load(p, time_slice)
+            time = "time"
+            if self._is_sparse(p):
+                time = f"{p}_time"
+                coords[time] = self._time_at(steps)
+            dims = (time,) + tuple(
+                f"{p}_dim_{i}" for i in range(1, data.ndim)
+            )
+            data_vars[p] = xr.Variable(dims, data, attrs=self.attrs(p))
+        return xr.Dataset(data_vars, coords=coords, attrs=self.metadata)
+
+    def close(self) -> None:
+        """Close the underlying file (if any)."""
+        self._datasets = {}
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
+
+    def __exit__(self, typ, value, traceback):
+        self.close()
+
+
+class SimulationTail(AbstractContextManager):
+    """Follow an HDF5 file that a `SimulationSaver` is writing.
+
+    The saver must run with `swmr=True`. The file is opened once in
+    single-writer/multiple-reader mode. Every call to `poll()` reads the
+    number of valid steps published by the saver and returns only the
+    rows that are new. Only datasets with a row for every step are
+    followed (i.e., not those of save policies). Packed nodes are
+    followed by their own paths.
+
+    Arguments:
+    filename    -- The HDF5 file.
+    paths       -- A glob pattern or a list of the paths to follow. If
+                   None, all datasets are followed.
+    """
+
+    def __init__(
+        self,
+        filename : str,
+        paths : Union[None, str, Sequence[str]] = None
+    ):
+        self._file_handler = h5py.File(
+            filename,
+            "r",
+            libver="latest",
+            swmr=True
+        )
+        if VALID_LENGTH not in self._file_handler:
+            self._file_handler.close()
+            raise ValueError(f"`{filename}` was not written in SWMR mode.")
+        self._valid_length = self._file_handler[VALID_LENGTH]
+        # Map each followed path to its dataset and column (or None)
+        columns = {}
+
+        def visit(name, obj):
+            if not isinstance(obj, h5py.Dataset) or name == VALID_LENGTH:
+                return
+            attrs = obj.attrs
+            if "steps" in attrs or "stride" in attrs or "steps_of" in attrs:
+                return
+            if "columns" in attrs:
+                for j, column in enumerate(attrs["columns"]):
+                    columns[str(column)] = (obj, j)
+            else:
+                columns[name] = (obj, None)
+
+        self._file_handler.visititems(visit)
+        if paths is None:
+            paths = sorted(columns)
+        elif isinstance(paths, str):
+            parts = paths.strip("/").split("/")
+            paths = [
+                p for p in sorted(columns)
+                if _match_path(p.split("/"), parts)
+            ]
+        else:
+            paths = [p.lstrip("/") for p in paths]
+        self._columns = {p: columns[p] for p in paths}
+        self._position = 0
+        self._finished = False
+
+    @property
+    def paths(self) -> List[str]:
+        """Get the paths that are followed."""
+        return list(self._columns.keys())
+
+    @property
+    def position(self) -> int:
+        """Get the number of steps returned so far."""
+        return self._position
+
+    @property
+    def finished(self) -> bool:
+        """Check if the saver was closed (as of the last poll)."""
+        return self._finished
+
+    def poll(self) -> Dict[str, np.ndarray]:
+        """Get the steps that were published since the last poll.
+
+        Returns a dictionary from paths to arrays with the new steps.
+        The arrays are empty if there is nothing new.
+        """
+        self._valid_length.refresh()
+        num_steps, finished = (int(v) for v in self._valid_length[:])
+        start, self._position = self._position, max(self._position, num_steps)
+        self._finished = bool(finished)
+        blocks = {}
+        res = {}
+        for p, (dset, j) in self._columns.items():
+            if dset.name not in blocks:
+                dset.refresh()
+                blocks[dset.name] = dset[start:self._position]
+            block = blocks[dset.name]
+            res[p] = block if j is None else block[:, j]
+        return res
+
+    def follow(
+        self,
+        interval : float = 1.0,
+        timeout : Optional[float] = None
+    ):
+        """Yield the new steps (see `poll()`) until the saver is closed.
+
+        Arguments:
+        interval    -- The number of seconds to wait between polls.
+        timeout     -- Stop if there are no new steps for this many
+                       seconds. If None, wait forever.
+        """
+        last = time.monotonic()
+        while True:
+            start = self._position
+            new = self.poll()
+            if self._position > start:
+                last = time.monotonic()
+                yield new
+            if self._finished:
+                return
+            if timeout is not None and time.monotonic() - last > timeout:
+                return
+            time.sleep(interval)
+
+    def close(self) -> None:
+        """Close the file."""
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
+
+    def __exit__(self, typ, value, traceback):
+        self.close()
@@ -1,4 +1,4 @@
-"""Offers data saving functionality using HDF5.
+"""Offers data saving functionality using HDF5 (or other storage backends).
 
 Author:
     Ilias Bilionis
@@ -18,14 +18,28 @@ __all__ = ["SimulationSaver"]
 
 import h5py
 import os
+import queue
+import threading
 import numpy as np
 import jax
 import jaxlib
-from typing import Union
+from datetime import datetime
+from contextlib import AbstractContextManager
+from typing import Union, Optional, Any, Dict
 from . import System, Node, State, Parameter, Variable
+from .system import _match_path
+from .storage_backends import StorageBackend, HDF5Backend, open_backend
+from .save_policies import SavePolicy, STEPS_SUFFIX
 
 
-class SimulationSaver(object):
+# The initial length of resizable datasets
+INITIAL_NUM_STEPS = 1024
+
+# The prefix of the names of datasets with packed scalar nodes
+PACKED_PREFIX = "__packed_"
+
+
+class SimulationSaver(AbstractContextManager):
     """A class that offers data saving functionality for a single
     simulation.
 
@@ -35,59 +49,265 @@ class SimulationSaver(object):
                        created. If the file exists already an exception
                        will be thrown. If the file does not exist
                        already, it will be created and the data will be
-                       written in the root ("/") group. Otherwise, this
-                       must be a group of an already opened HDF5 file.
-                       Then the data will be written on that group.
+                       written in the root ("/") group. The storage
+                       backend is picked from the URI scheme or the
+                       extension of the file (see `open_backend()`).
+                       HDF5 is the default. This can also be a group of
+                       an already opened HDF5 file. Then the data will
+                       be written on that group.
                        The group can contain other datasets and
                        attributes. However, it cannot contain attributes
                        and datasets that are to be tracked by system.
+                       Finally, this can be a `StorageBackend`.
     system          -- The system to keep track of. To track a node
                        set its `track` flag to `True`.
     max_steps       -- The maximum number of simulation steps. Default
-                       is 1000.
+                       is 10000. If None, the datasets are resizable.
+                       They grow geometrically as needed and they are
+                       trimmed to the number of saved steps by
+                       `close()`.
+    overwrite       -- If True, an existing file is replaced.
+    buffer_size     -- The number of steps that are kept in memory before
+                       they are written to the file with a single write
+                       per dataset. The default (1) writes every step
+                       immediately. Call `flush()` to write the steps
+                       that are still in memory.
+    chunks          -- The chunk length (number of steps) of the
+                       datasets. If None, the datasets are contiguous,
+                       unless a filter is requested in which case the
+                       backend guesses the chunks. If True, the backend
+                       guesses the chunks. Resizable datasets are always
+                       chunked.
+    compression     -- The compression filter (e.g., "gzip" or "lzf"
+                       for HDF5). Default is no compression. What is
+                       available depends on the backend.
+    compression_opts-- Options for the compression filter, e.g., the
+                       gzip level (0-9).
+    shuffle         -- If True, the shuffle filter is applied before
+                       compression. It usually improves compression of
+                       floating point data.
+    asynchronous    -- If True, the data are written by a background
+                       thread. Then, `save()` only copies the values of
+                       the tracked nodes into a ring of `num_buffers`
+                       preallocated buffers of `buffer_size` steps each.
+                       Full buffers are handed to the writer thread.
+                       If all buffers are waiting to be written, `save()`
+                       blocks until one is free. Errors of the writer
+                       are raised by the next call to `save()`,
+                       `flush()` or `close()`. Do not access the datasets
+                       before calling `flush()`.
+    num_buffers     -- The number of buffers in the ring (only used if
+                       `asynchronous` is True). Default is 4.
+    policies        -- A dictionary from glob patterns to save policies
+                       (see `save_policies`). A pattern is matched
+                       against the path of each tracked node (e.g.,
+                       `"building/rc/A"`) and against the paths of the
+                       systems that own it (e.g., `"building/*"`). The
+                       first pattern that matches wins. Nodes that are
+                       not matched are saved at every step. Each node
+                       with a policy is written to resizable datasets
+                       of its own.
+    pack            -- If "subsystem", the scalar tracked nodes of each
+                       subsystem that have the same data type and no
+                       save policy are saved as the columns of a single
+                       `(time, column)` dataset of the subsystem. If
+                       "system", this is done for all scalar tracked
+                       nodes of the system. The default (None) saves
+                       every node in a dataset of its own. This saves a
+                       lot of metadata and writes for systems with many
+                       scalar nodes. `SimulationResults` exposes the
+                       columns by the paths of the nodes.
+    swmr            -- If True, the HDF5 file is written in
+                       single-writer/multiple-reader mode, so that it
+                       can be read while the simulation runs (see
+                       `SimulationTail`). Every `flush()` publishes the
+                       number of valid steps in the dataset
+                       `VALID_LENGTH` of the root group. Requires a
+                       filename.
+    flush_every     -- If not None, `flush()` is called every
+                       `flush_every` steps.
 
+    The saver can be used as a context manager. On exit, it is closed
+    (see `close()`).
     """
 
     def __init__(
         self,
-        file_or_group : Union[str, h5py.Group],
+        file_or_group : Union[str, h5py.Group, StorageBackend],
         system : System,
-        max_steps : int = 10000,
+        max_steps : Optional[int] = 10000,
         overwrite: bool=False,
+        buffer_size : int = 1,
+        chunks : Union[None, bool, int] = None,
+        compression : Optional[str] = None,
+        compression_opts : Any = None,
+        shuffle : bool = False,
+        asynchronous : bool = False,
+        num_buffers : int = 4,
+        policies : Optional[Dict[str, SavePolicy]] = None,
+        pack : Optional[str] = None,
+        swmr : bool = False,
+        flush_every : Optional[int] = None,
     ):
-        if isinstance(file_or_group, str):
-            file = os.path.abspath(file_or_group)
-            if os.path.exists(file) and overwrite:
-                os.remove(file)
-            else:
-                assert not os.path.exists(file), f"File '{file}' already exists!"
-
-            file_handler = h5py.File(file, "w")
-            group = file_handler["/"]
-        else:
-            group = file_or_group
-            assert isinstance(group, h5py.Group), \
-                f"{group} is not an h5py.Group of an already openned file!"
-            file_handler = None
-        self._file_handler = file_handler
-        self._group = group
+        self._backend = open_backend(
+            file_or_group,
+            overwrite=overwrite,
+            swmr=swmr
+        )
+        if swmr and not isinstance(self.backend, HDF5Backend):
+            raise ValueError("SWMR mode is only available for HDF5 files.")
+        assert flush_every is None or flush_every >= 1, \
+            "Flush at least every step."
+        self._flush_every = flush_every
         self._max_steps = max_steps
+        assert buffer_size >= 1, "The buffer size must be at least 1."
+        self._buffer_size = buffer_size
+        self._chunks = chunks
+        self._compression = compression
+        self._compression_opts = compression_opts
+        self._shuffle = shuffle
+        self._policies = [
+            (pattern.strip("/").split("/"), policy)
+            for pattern, policy in (policies or {}).items()
+        ]
+        if self._policies and self.backend.single_table:
+            raise ValueError(
+                f"{type(self.backend).__name__} cannot save variables "
+                + "with save policies."
+            )
+        if pack not in (None, "subsystem", "system"):
+            raise ValueError("`pack` must be None, 'subsystem' or 'system'.")
+        self._pack = pack
+        self._packing = {}
+        self._root_path = "/" + system.name
         self._tracked_nodes = []
+        if max_steps is None:
+            capacity = max(buffer_size, INITIAL_NUM_STEPS)
+        else:
+            capacity = max_steps
+        self._stream = _Stream(capacity, resizable=max_steps is None)
+        self._policy_streams = []
         self._count = 0
-        self._create_h5_structure(group, system)
+        self._closed = False
+        self._create_structure("", system)
+        self._create_packed_datasets()
+        self.backend.set_attrs("", {"start_time": datetime.now().isoformat()})
+        if swmr:
+            self.backend.start_swmr()
+        self._streams = [self._stream] + [s for _, _, s in self._policy_streams]
+        self._writer = None
+        if asynchronous:
+            assert num_buffers >= 2, "I need at least two buffers."
+            self._start_writer(num_buffers)
+
+    def _start_writer(self, num_buffers : int):
+        """Make the rings of buffers and start the writer thread."""
+        for stream in self._streams:
+            stream.make_ring(num_buffers)
+        self._jobs = queue.Queue()
+        self._writer_error = None
+        self._writer = threading.Thread(
+            target=self._write_in_background,
+            name="SimulationSaver writer",
+            daemon=True
+        )
+        self._writer.start()
+
+    def _write_in_background(self):
+        """The loop of the writer thread.
+
+        It writes the buffers it receives and returns them to their
+        ring. After an error, it keeps returning buffers without writing
+        them, so that the simulation thread does not block.
+        """
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                return
+            stream, k, start, stop = job
+            try:
+                if self._writer_error is None:
+                    self._write(stream, stream.buffer_sets[k], start, stop)
+            except BaseException as error:
+                self._writer_error = error
+            finally:
+                stream.free_sets.put(k)
+                self._jobs.task_done()
+
+    def _check_writer(self):
+        """Raise the error of the writer thread (if any)."""
+        if self._writer is not None and self._writer_error is not None:
+            raise RuntimeError(
+                "The writer thread of the SimulationSaver failed."
+            ) from self._writer_error
+
+    def _stop_writer(self):
+        """Stop the writer thread (if any)."""
+        if self._writer is not None and self._writer.is_alive():
+            self._jobs.put(None)
+            self._writer.join()
+
+    def _get_policy(self, path : str) -> Optional[SavePolicy]:
+        """Get a copy of the policy of the node at `path` (if any).
+
+        The first pattern that matches the path of the node, or the path
+        of one of the systems that own it, wins.
+        """
+        parts = path.strip("/").split("/")
+        for pattern, policy in self._policies:
+            if any(
+                _match_path(parts[:i], pattern)
+                for i in range(len(parts), 0, -1)
+            ):
+                return policy.copy()
+        return None
 
-    def _create_h5_structure(
+    def _create_dataset(
         self,
-        group : h5py.Group,
+        path : str,
+        shape : tuple,
+        dtype : Any,
+        stream : "_Stream",
+        attrs : Dict[str, Any]
+    ):
+        """Create a dataset that is written with the other datasets of
+        `stream`."""
+        dst = self.backend.create_dataset(
+            path,
+            shape=shape,
+            dtype=dtype,
+            num_steps=stream.capacity,
+            resizable=stream.resizable,
+            chunks=self._get_chunks(shape, stream),
+            compression=self._compression,
+            compression_opts=self._compression_opts,
+            shuffle=self._shuffle,
+            attrs=attrs
+        )
+        stream.datasets.append(dst)
+        stream.buffers.append(
+            np.empty((self.buffer_size,) + shape, dtype=dtype)
+        )
+
+    def _create_structure(
+        self,
+        path : str,
         system_or_node : Union[System, Node]
     ):
-        """Creates the necessary tables to save the system or the node."""
+        """Creates the necessary tables to save the system or the node.
+
+        `path` is the path of the group in which they are created.
+        """
         if isinstance(system_or_node, System):
             system = system_or_node
-            sg = group.create_group(system.name)
-            sg.attrs["description"] = system.description
+            sg = path + "/" + system.name
+            self.backend.create_group(
+                sg,
+                {"description": system.description}
+            )
             for n in system.direct_nodes:
-                self._create_h5_structure(sg, n)
+                self._create_structure(sg, n)
         else:
             node = system_or_node
             if (not isinstance(node, Variable)) or (not node.track):
@@ -117,54 +337,277 @@ class SimulationSaver(object):
             except (ValueError, AttributeError) as error:
                 raise ValueError(f"Node {node.name} has an unsupported type {node_type}")
 
-            maxshape = (self.max_steps,) + shape
-            # Create the dataset
-            dst = group.create_dataset(
-                node.name,
-                shape=maxshape,
-                dtype=dtype
-            )
             # Add some metadata to the dataset
-            dst.attrs["units"] = node.units if node.units is not None else ""
-            dst.attrs["description"] = (
-                node.description if node.description is not None else ""
-            )
+            attrs = {
+                "units": node.units if node.units is not None else "",
+                "description": (
+                    node.description if node.description is not None
+                    else ""
+                )
+            }
+            node_path = path + "/" + node.name
             self.tracked_nodes.append(node)
+            policy = self._get_policy(node_path)
+            if policy is None and self._pack is not None and shape == ():
+                group = path if self._pack == "subsystem" else self._root_path
+                self._packing.setdefault((group, np.dtype(dtype)), []).append(
+                    (node, node_path, attrs)
+                )
+                return
+            if policy is None:
+                self._create_dataset(
+                    node_path, shape, dtype, self._stream, attrs
+                )
+                self._stream.nodes.append(node)
+                return
+            # The rows of a policy are written to datasets of their own
+            capacity = INITIAL_NUM_STEPS
+            if self.max_steps is not None:
+                capacity = min(capacity, self.max_steps)
+            stream = _Stream(max(capacity, self.buffer_size), resizable=True)
+            datasets = policy.get_datasets(shape, dtype)
+            has_steps = any(s == STEPS_SUFFIX for s, _, _ in datasets)
+            attrs.update(policy.attrs, save_policy=policy.name)
+            for suffix, d_shape, d_dtype in datasets:
+                if suffix == STEPS_SUFFIX:
+                    d_attrs = {"steps_of": node_path.lstrip("/")}
+                else:
+                    d_attrs = dict(attrs)
+                    if has_steps:
+                        d_attrs["steps"] = (node_path + STEPS_SUFFIX).lstrip("/")
+                self._create_dataset(
+                    node_path + suffix, d_shape, d_dtype, stream, d_attrs
+                )
+            self._policy_streams.append((node, policy, stream))
+
+    def _create_packed_datasets(self):
+        """Create the `(time, column)` datasets of the packed nodes.
+
+        The datasets are called `"__packed_<dtype>"` and are created in
+        the group of the subsystem (or of the whole system). Their
+        attributes `columns`, `units` and `descriptions` list the paths,
+        units and descriptions of the nodes in column order.
+        """
+        for (group, dtype), columns in self._packing.items():
+            nodes, paths, attrs = zip(*columns)
+            self._create_dataset(
+                group + "/" + PACKED_PREFIX + dtype.name,
+                (len(nodes),),
+                dtype,
+                self._stream,
+                {
+                    "columns": [p.lstrip("/") for p in paths],
+                    "units": [a["units"] for a in attrs],
+                    "descriptions": [a["description"] for a in attrs]
+                }
+            )
+            self._stream.packed.append(list(nodes))
+
+    def _get_chunks(
+        self,
+        shape : tuple,
+        stream : "_Stream"
+    ) -> Union[None, bool, tuple]:
+        """Get the chunks of a dataset of `stream` storing values of
+        `shape`."""
+        if isinstance(self._chunks, bool) or self._chunks is None:
+            if (self._compression is not None or self._shuffle
+                or stream.resizable):
+                return True
+            return self._chunks
+        return (min(self._chunks, stream.capacity),) + shape
 
     @property
     def max_steps(self):
-        """Get the maximu number of steps that can be saved."""
+        """Get the maximum number of steps that can be saved.
+
+        This is None if the datasets are resizable.
+        """
         return self._max_steps
+
+    @property
+    def count(self):
+        """Get the number of steps saved so far."""
+        return self._count
+
+    @property
+    def closed(self):
+        """Check if the saver has been closed."""
+        return self._closed
     
+    @property
+    def buffer_size(self):
+        """Get the number of steps kept in memory before writing."""
+        return self._buffer_size
+
     @property
     def tracked_nodes(self):
         """Get the tracked nodes."""
         return self._tracked_nodes
 
+    @property
+    def backend(self):
+        """Get the storage backend."""
+        return self._backend
+
     @property
     def file_handler(self):
         """Get the HDF5 filehandler (if there is one)."""
-        return self._file_handler
+        return getattr(self.backend, "file_handler", None)
 
     @property
     def group(self):
-        """Get the HDF5 group on which we are writing the data."""
-        return self._group
+        """Get the HDF5 group on which we are writing the data (if any)."""
+        return getattr(self.backend, "group", None)
 
-    def _save_node(self, node : Variable):
-        """Save the current state of the system to the file.
+    def _write(self, stream : "_Stream", buffers, start : int, stop : int):
+        """Write rows `start` to `stop` from `buffers` to the datasets of
+        `stream`.
 
-        This a recursive function. The data are saved at index `count`.
+        Each dataset is written with a single hyperslab write.
         """
-        if self.file_handler is None:
-            dset = self.group[node.absname]
-            dset[self._count] = node.value
+        if stop > stream.capacity and stream.resizable:
+            self._resize(stream, max(2 * stream.capacity, stop))
+        self.backend.write(stream.datasets, buffers, start, stop)
+
+    def _dispatch(self, stream : "_Stream"):
+        """Write the rows of `stream` kept in memory or hand them to the
+        writer."""
+        if stream.count == stream.flushed:
+            return
+        if self._writer is None:
+            self._write(stream, stream.buffers, stream.flushed, stream.count)
         else:
-            dset = self.file_handler[node.absname]
-            dset[self._count] = node.value
+            self._jobs.put(
+                (stream, stream.current_set, stream.flushed, stream.count)
+            )
+            stream.current_set = stream.free_sets.get()
+            stream.buffers = stream.buffer_sets[stream.current_set]
+        stream.flushed = stream.count
+
+    def flush(self):
+        """Write the steps kept in memory to the file.
+
+        The backend is asked to write everything to disk and to publish
+        the number of saved steps to readers. If the saver is
+        asynchronous, this waits for the writer thread to write
+        everything.
+        """
+        self._check_writer()
+        for stream in self._streams:
+            self._dispatch(stream)
+        if self._writer is not None:
+            self._jobs.join()
+            self._check_writer()
+        self.backend.flush()
+        self.backend.publish(self._count)
+
+    def _resize(self, stream : "_Stream", num_steps : int):
+        """Resize all datasets of `stream` to `num_steps` rows."""
+        self.backend.resize(stream.datasets, num_steps)
+        stream.capacity = num_steps
+
+    def close(self):
+        """Close the saver.
+
+        Saves the last rows of the save policies, writes the steps kept
+        in memory, trims resizable datasets to the number of saved
+        rows, and records the run metadata (`num_steps`, `start_time`,
+        `end_time`) as attributes of the root group. If the saver opened
+        the file, the file is closed. Closing a closed saver does
+        nothing.
+        """
+        if self._closed:
+            return
+        try:
+            for _, policy, stream in self._policy_streams:
+                for row in policy.finish():
+                    self._append(stream, row)
+            self.flush()
+            for stream in self._streams:
+                if stream.resizable:
+                    self._resize(stream, stream.count)
+            self.backend.publish(self._count, finished=True)
+            self.backend.set_attrs("", {
+                "num_steps": self._count,
+                "end_time": datetime.now().isoformat()
+            })
+        finally:
+            self._stop_writer()
+            self.backend.close()
+            self._closed = True
+
+    def __exit__(self, typ, value, traceback):
+        """Close the saver."""
+        self.close()
+
+    def _append(self, stream : "_Stream", row : tuple):
+        """Append a row to the buffers of `stream`."""
+        i = stream.count - stream.flushed
+        for v, buf in zip(row, stream.buffers):
+            buf[i] = v
+        stream.count += 1
+        if i + 1 == self.buffer_size:
+            self._dispatch(stream)
 
     def save(self):
-        """Save the current state of the system to the file."""
-        for n in self.tracked_nodes:
-            self._save_node(n)
+        """Save the current state of the system.
+
+        The values are copied to the in-memory buffers and written to
+        the file every `buffer_size` steps. Variables with a save policy
+        are saved when their policy says so.
+        """
+        self._check_writer()
+        stream = self._stream
+        i = stream.count - stream.flushed
+        buffers = stream.buffers
+        for n, buf in zip(stream.nodes, buffers):
+            buf[i] = n.value
+        for nodes, buf in zip(stream.packed, buffers[len(stream.nodes):]):
+            buf[i] = [n.value for n in nodes]
+        stream.count += 1
+        if i + 1 == self.buffer_size:
+            self._dispatch(stream)
+        for n, policy, stream in self._policy_streams:
+            for row in policy.record(self._count, n.value):
+                self._append(stream, row)
         self._count += 1
+        if self._flush_every is not None and \
+            self._count % self._flush_every == 0:
+            self.flush()
+
+
+class _Stream(object):
+    """Datasets that are written together.
+
+    All datasets of a stream have the same number of rows. The tracked
+    variables without a save policy form one stream and each variable
+    with a save policy forms a stream of its own. The datasets of
+    `nodes` come first, followed by one packed dataset for each list of
+    nodes in `packed`.
+
+    Arguments:
+    capacity    -- The initial length of the datasets.
+    resizable   -- If True, the datasets grow as needed.
+    """
+
+    def __init__(self, capacity : int, resizable : bool):
+        self.capacity = capacity
+        self.resizable = resizable
+        self.nodes = []
+        self.packed = []
+        self.datasets = []
+        self.buffers = []
+        self.count = 0
+        self.flushed = 0
+
+    def make_ring(self, num_buffers : int):
+        """Make a ring of `num_buffers` sets of buffers."""
+        self.buffer_sets = [self.buffers] + [
+            [np.empty_like(buf) for buf in self.buffers]
+            for _ in range(num_buffers - 1)
+        ]
+        self.current_set = 0
+        self.free_sets = queue.Queue()
+        for k in range(1, num_buffers):
+            self.free_sets.put(k)
@@ -0,0 +1,79 @@
+"""Snapshots of the values of the nodes of a system.
+
+A snapshot copies the current and next values of the states and the
+values of the variables of a system. Restoring it puts the system back
+where it was, e.g., after simulating a few steps ahead to try a control
+sequence.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = ["Snapshot", "take_snapshot"]
+
+
+from copy import deepcopy
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from . import Variable, Parameter, State, System, DataCursor
+
+
+def _copy(value : Any) -> Any:
+    """Copy a value. Arrays are copied with NumPy."""
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, (int, float, bool, str, np.generic)) or value is None:
+        return value
+    return deepcopy(value)
+
+
+class Snapshot(object):
+    """The values of the nodes of a system at some point.
+
+    Arguments:
+    system      -- The system.
+    parameters  -- Whether to include the parameters (default: False).
+    """
+
+    def __init__(self, system : System, parameters : bool = False):
+        self.system = system
+        self._states : List[Tuple[State, Any, Any]] = []
+        self._variables : List[Tuple[Variable, Any]] = []
+        for n in system.nodes:
+            if isinstance(n, State):
+                self._states.append(
+                    (n, _copy(n._value), _copy(n._next_value))
+                )
+            elif isinstance(n, Variable) and "_value" in n.__dict__:
+                if isinstance(n, Parameter) and not parameters:
+                    continue
+                self._variables.append((n, _copy(n._value)))
+
+    def restore(self) -> None:
+        """Put the values of the snapshot back.
+
+        The snapshot can be restored many times. All functions are
+        evaluated at the next `forward()`.
+        """
+        for n, value in self._variables:
+            n._value = _copy(value)
+        for n, value, next_value in self._states:
+            n._value = _copy(value)
+            n._next_value = _copy(next_value)
+            if isinstance(n, DataCursor):
+                n.seek(n._value)
+        for f in self.system.functions:
+            f.parents_changed = True
+
+    def values(self) -> Dict[str, Any]:
+        """Get the saved values by the absolute names of the nodes."""
+        res = {n.absname: v for n, v in self._variables}
+        res.update({n.absname: v for n, v, _ in self._states})
+        return res
+
+
+def take_snapshot(system : System, parameters : bool = False) -> Snapshot:
+    """Take a snapshot of `system` (see `Snapshot`)."""
+    return Snapshot(system, parameters)
@@ -0,0 +1,670 @@
+"""Storage backends for the output of simulations.
+
+A backend stores a tree of groups and datasets. Every dataset has a
+leading time axis and stores the values of a single tracked node. The
+`SimulationSaver` creates the tree and then writes blocks of steps
+(the same range of steps for all datasets at once).
+
+The available backends are:
+
+    HDF5Backend     -- An HDF5 file (h5py). This is the default.
+    ZarrBackend     -- A Zarr directory store. Chunked and friendly to
+                       parallel writes. Requires `zarr>=3`.
+    ParquetBackend  -- A single Parquet file with one column per
+                       dataset. Convenient for analytics with pandas or
+                       polars. Requires `pyarrow`.
+    MemmapBackend   -- A directory with one raw binary file per dataset
+                       and a JSON file with the metadata. It has no
+                       dependencies and appending is as fast as it gets.
+                       The files can be opened with `numpy.memmap`.
+
+Use `open_backend()` to pick the backend from a URI scheme (e.g.,
+`"zarr://run.out"`) or from the file extension (e.g., `"run.parquet"`).
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "StorageBackend",
+    "HDF5Backend",
+    "ZarrBackend",
+    "ParquetBackend",
+    "MemmapBackend",
+    "open_backend",
+    "MEMMAP_METADATA",
+    "PARQUET_METADATA_KEY",
+    "VALID_LENGTH",
+]
+
+
+import os
+import json
+import shutil
+import h5py
+import numpy as np
+from typing import Any, Dict, Sequence, Tuple, Union, Optional
+
+
+# Name of the metadata file of a MemmapBackend directory
+MEMMAP_METADATA = "metadata.json"
+
+# Key of the metadata stored in the footer of Parquet files
+PARQUET_METADATA_KEY = b"cdcm"
+
+# Name of the dataset in which HDF5 files written in SWMR mode publish
+# the number of valid steps and whether the saver is finished
+VALID_LENGTH = "__valid_length__"
+
+
+def _to_builtin(value : Any) -> Any:
+    """Turn NumPy scalars and arrays into JSON friendly objects."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def _check_target(path : str, overwrite : bool) -> str:
+    """Remove `path` if `overwrite`. Else make sure it does not exist."""
+    path = os.path.abspath(path)
+    if os.path.exists(path) and overwrite:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    else:
+        assert not os.path.exists(path), f"File '{path}' already exists!"
+    return path
+
+
+class StorageBackend(object):
+    """The interface of the storage backends.
+
+    Paths of groups and datasets look like `"/sys/subsys/x"`. The root
+    group has path `""`. Dataset handles are whatever
+    `create_dataset()` returns and are passed back to `write()` and
+    `resize()`.
+    """
+
+    # If True, all datasets are written together and have the same
+    # number of steps.
+    single_table = False
+
+    def create_group(self, path : str, attrs : Dict[str, Any]) -> None:
+        """Create the group at `path` and set its attributes."""
+        raise NotImplementedError("Implement me in a subclass.")
+
+    def create_dataset(
+        self,
+        path : str,
+        shape : Tuple[int],
+        dtype : Any,
+        num_steps : int,
+        resizable : bool = False,
+        chunks : Union[None, bool, Tuple[int]] = None,
+        compression : Optional[str] = None,
+        compression_opts : Any = None,
+        shuffle : bool = False,
+        attrs : Dict[str, Any] = {}
+    ) -> Any:
+        """Create a dataset storing values of `shape` and `dtype`.
+
+        Arguments:
+        path        -- The path of the dataset.
+        shape       -- The shape of a single value.
+        dtype       -- The data type of the values.
+        num_steps   -- The initial length of the time axis.
+        resizable   -- If True, the time axis can grow.
+        chunks      -- None (no chunks if possible), True (guess the
+                       chunks), or the shape of the chunks.
+        compression -- The name of the compression filter.
+        compression_opts -- Options of the compression filter.
+        shuffle     -- If True, apply the shuffle filter.
+        attrs       -- The attributes of the dataset.
+
+        Returns a handle to the dataset.
+        """
+        raise NotImplementedError("Implement me in a subclass.")
+
+    def write(
+        self,
+        datasets : Sequence[Any],
+        buffers : Sequence[np.ndarray],
+        start : int,
+        stop : int
+    ) -> None:
+        """Write steps `start` to `stop` of all `datasets`.
+
+        The data of each dataset are in the first `stop - start` entries
+        of the corresponding buffer.
+        """
+        raise NotImplementedError("Implement me in a subclass.")
+
+    def resize(self, datasets : Sequence[Any], num_steps : int) -> None:
+        """Change the length of the time axis of resizable datasets."""
+        raise NotImplementedError("Implement me in a subclass.")
+
+    def set_attrs(self, path : str, attrs : Dict[str, Any]) -> None:
+        """Set attributes of the group at `path`."""
+        raise NotImplementedError("Implement me in a subclass.")
+
+    def flush(self) -> None:
+        """Make sure that everything written so far is on disk."""
+        pass
+
+    def publish(self, num_steps : int, finished : bool = False) -> None:
+        """Tell readers that the first `num_steps` steps are on disk.
+
+        Called after `flush()`. Only backends that can be read while
+        they are written do something.
+        """
+        pass
+
+    def close(self) -> None:
+        """Close the backend."""
+        pass
+
+
+class HDF5Backend(StorageBackend):
+    """Stores the data in an HDF5 file.
+
+    Arguments:
+    file_or_group   -- A filename or a group of an already opened HDF5
+                       file. A file is created and the data are written
+                       in its root group. A group is used as is and it
+                       is not closed by `close()`.
+    overwrite       -- If True, an existing file is replaced.
+    swmr            -- If True, the file is created so that it can be
+                       switched to single-writer/multiple-reader mode
+                       by `start_swmr()`. Requires a filename.
+    """
+
+    def __init__(
+        self,
+        file_or_group : Union[str, h5py.Group],
+        overwrite : bool = False,
+        swmr : bool = False
+    ):
+        self._valid_length = None
+        if isinstance(file_or_group, str):
+            file = _check_target(file_or_group, overwrite)
+            if swmr:
+                file_handler = h5py.File(file, "w", libver="latest")
+            else:
+                file_handler = h5py.File(file, "w")
+            group = file_handler["/"]
+        elif swmr:
+            raise ValueError("SWMR mode requires the name of a file.")
+        else:
+            group = file_or_group
+            assert isinstance(group, h5py.Group), \
+                f"{group} is not an h5py.Group of an already openned file!"
+            file_handler = None
+        self._file_handler = file_handler
+        self._group = group
+
+    @property
+    def file_handler(self):
+        """Get the HDF5 filehandler (if there is one)."""
+        return self._file_handler
+
+    @property
+    def group(self):
+        """Get the HDF5 group on which we are writing the data."""
+        return self._group
+
+    def _get_group(self, path : str) -> h5py.Group:
+        return self.group[path.lstrip("/")] if path else self.group
+
+    def create_group(self, path, attrs):
+        self.group.create_group(path.lstrip("/")).attrs.update(attrs)
+
+    def create_dataset(
+        self,
+        path,
+        shape,
+        dtype,
+        num_steps,
+        resizable=False,
+        chunks=None,
+        compression=None,
+        compression_opts=None,
+        shuffle=False,
+        attrs={}
+    ):
+        dst = self.group.create_dataset(
+            path.lstrip("/"),
+            shape=(num_steps,) + shape,
+            maxshape=(None,) + shape if resizable else None,
+            dtype=dtype,
+            chunks=chunks,
+            compression=compression,
+            compression_opts=compression_opts,
+            shuffle=shuffle
+        )
+        dst.attrs.update(attrs)
+        return dst
+
+    def write(self, datasets, buffers, start, stop):
+        for dset, buf in zip(datasets, buffers):
+            dset[start:stop] = buf[:stop - start]
+
+    def resize(self, datasets, num_steps):
+        for dset in datasets:
+            dset.resize(num_steps, axis=0)
+
+    def set_attrs(self, path, attrs):
+        self._get_group(path).attrs.update(attrs)
+
+    def flush(self):
+        if self.file_handler is not None:
+            self.file_handler.flush()
+
+    def start_swmr(self):
+        """Switch the file to single-writer/multiple-reader mode.
+
+        The dataset `VALID_LENGTH` is created in the group. It holds the
+        number of valid steps and a flag that is set when the saver is
+        finished. Attributes cannot be changed safely while readers are
+        active, which is why this is a dataset. No groups or datasets
+        can be created afterwards.
+        """
+        self._valid_length = self.group.create_dataset(
+            VALID_LENGTH,
+            data=np.zeros(2, dtype=np.int64)
+        )
+        self.file_handler.swmr_mode = True
+
+    def publish(self, num_steps, finished=False):
+        if self._valid_length is None:
+            return
+        self._valid_length[:] = [num_steps, int(finished)]
+        self._valid_length.flush()
+
+    def close(self):
+        if self.file_handler is not None:
+            self.file_handler.close()
+
+
+class ZarrBackend(StorageBackend):
+    """Stores the data in a Zarr directory store.
+
+    Supported compression filters are "gzip", "zstd" and "blosc". The
+    shuffle filter is only available with "blosc". Asking for it with
+    another filter raises a ValueError.
+
+    Arguments:
+    path        -- The directory of the store.
+    overwrite   -- If True, an existing store is replaced.
+    """
+
+    def __init__(self, path : str, overwrite : bool = False):
+        import zarr
+        path = _check_target(path, overwrite)
+        self._zarr = zarr
+        self._root = zarr.open_group(path, mode="w")
+
+    @property
+    def root(self):
+        """Get the root group of the store."""
+        return self._root
+
+    def _get_group(self, path : str):
+        return self.root[path.strip("/")] if path else self.root
+
+    def _get_compressors(self, compression, compression_opts, shuffle):
+        codecs = self._zarr.codecs
+        if shuffle and compression != "blosc":
+            raise ValueError(
+                "Zarr applies the shuffle filter only with `blosc` compression."
+            )
+        if compression is None:
+            return None
+        if compression == "gzip":
+            return codecs.GzipCodec(
+                level=5 if compression_opts is None else compression_opts
+            )
+        if compression == "zstd":
+            return codecs.ZstdCodec(
+                level=0 if compression_opts is None else compression_opts
+            )
+        if compression == "blosc":
+            return codecs.BloscCodec(
+                cname="zstd",
+                clevel=5 if compression_opts is None else compression_opts,
+                shuffle="shuffle" if shuffle else "noshuffle"
+            )
+        raise ValueError(f"Zarr does not support `{compression}` compression.")
+
+    def create_group(self, path, attrs):
+        grp = self.root.require_group(path.strip("/"))
+        grp.attrs.update({k: _to_builtin(v) for k, v in attrs.items()})
+
+    def create_dataset(
+        self,
+        path,
+        shape,
+        dtype,
+        num_steps,
+        resizable=False,
+        chunks=None,
+        compression=None,
+        compression_opts=None,
+        shuffle=False,
+        attrs={}
+    ):
+        parent, name = os.path.split(path)
+        arr = self._get_group(parent).create_array(
+            name,
+            shape=(num_steps,) + shape,
+            dtype=dtype,
+            chunks="auto" if chunks in (None, True) else chunks,
+            compressors=self._get_compressors(
+                compression,
+                compression_opts,
+                shuffle
+            ),
+            fill_value=0
+        )
+        arr.attrs.update({k: _to_builtin(v) for k, v in attrs.items()})
+        return arr
+
+    def write(self, datasets, buffers, start, stop):
+        for arr, buf in zip(datasets, buffers):
+            arr[start:stop] = buf[:stop - start]
+
+    def resize(self, datasets, num_steps):
+        for arr in datasets:
+            arr.resize((num_steps,) + arr.shape[1:])
+
+    def set_attrs(self, path, attrs):
+        self._get_group(path).attrs.update(
+            {k: _to_builtin(v) for k, v in attrs.items()}
+        )
+
+
+class ParquetBackend(StorageBackend):
+    """Stores the data in a single Parquet file.
+
+    Each dataset becomes a column named after its path (without the
+    leading "/"). Values that are arrays are stored as fixed size lists
+    of their flattened entries. Every call to `write()` appends a row
+    group, so the buffer size of the saver is the row group size. The
+    attributes, shapes and data types are stored as JSON in the footer
+    of the file under the key `PARQUET_METADATA_KEY`.
+
+    Parquet files can only be appended to. The steps must be written in
+    order and the datasets cannot be trimmed.
+
+    Arguments:
+    path        -- The filename.
+    overwrite   -- If True, an existing file is replaced.
+    """
+
+    single_table = True
+
+    def __init__(self, path : str, overwrite : bool = False):
+        import pyarrow
+        import pyarrow.parquet
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._path = _check_target(path, overwrite)
+        self._columns = []
+        self._metadata = {"groups": {"": {}}, "datasets": {}}
+        self._compression = None
+        self._compression_opts = None
+        self._writer = None
+        self._num_steps = 0
+
+    def _make_writer(self):
+        pa = self._pa
+        fields = []
+        for name, dtype, shape in self._columns:
+            typ = pa.from_numpy_dtype(dtype)
+            if shape != ():
+                typ = pa.list_(typ, int(np.prod(shape)))
+            fields.append(pa.field(name, typ, nullable=False))
+        self._schema = pa.schema(fields)
+        self._writer = self._pq.ParquetWriter(
+            self._path,
+            self._schema,
+            compression=self._compression or "none",
+            compression_level=self._compression_opts
+        )
+
+    def create_group(self, path, attrs):
+        self._metadata["groups"][path] = {
+            k: _to_builtin(v) for k, v in attrs.items()
+        }
+
+    def create_dataset(
+        self,
+        path,
+        shape,
+        dtype,
+        num_steps,
+        resizable=False,
+        chunks=None,
+        compression=None,
+        compression_opts=None,
+        shuffle=False,
+        attrs={}
+    ):
+        assert self._writer is None, \
+            "All datasets must be created before writing."
+        if compression == "lzf":
+            raise ValueError("Parquet does not support `lzf` compression.")
+        self._compression = compression
+        self._compression_opts = compression_opts
+        dtype = np.dtype(dtype)
+        self._columns.append((path.lstrip("/"), dtype, shape))
+        self._metadata["datasets"][path] = {
+            "dtype": dtype.str,
+            "shape": list(shape),
+            "attrs": {k: _to_builtin(v) for k, v in attrs.items()}
+        }
+        return len(self._columns) - 1
+
+    def write(self, datasets, buffers, start, stop):
+        assert start == self._num_steps, \
+            "Parquet files can only be written in order."
+        if self._writer is None:
+            self._make_writer()
+        pa = self._pa
+        num_steps = stop - start
+        arrays = []
+        for i, buf in zip(datasets, buffers):
+            _, _, shape = self._columns[i]
+            data = buf[:num_steps]
+            if shape == ():
+                arrays.append(pa.array(data))
+            else:
+                arrays.append(
+                    pa.FixedSizeListArray.from_arrays(
+                        pa.array(data.reshape(-1)),
+                        int(np.prod(shape))
+                    )
+                )
+        self._writer.write_batch(
+            pa.record_batch(arrays, schema=self._schema)
+        )
+        self._num_steps = stop
+
+    def resize(self, datasets, num_steps):
+        # The length of the columns is the number of written steps.
+        pass
+
+    def set_attrs(self, path, attrs):
+        self._metadata["groups"].setdefault(path, {}).update(
+            {k: _to_builtin(v) for k, v in attrs.items()}
+        )
+
+    def close(self):
+        if self._writer is None:
+            self._make_writer()
+        self._writer.add_key_value_metadata(
+            {PARQUET_METADATA_KEY: json.dumps(self._metadata)}
+        )
+        self._writer.close()
+
+
+class MemmapBackend(StorageBackend):
+    """Stores the data as raw binary files in a directory.
+
+    The dataset at path `"/sys/x"` is stored in `"<directory>/sys/x.dat"`
+    in C order. The data types, shapes, number of written steps and
+    attributes are kept in `"<directory>/metadata.json"`, which is
+    updated by `flush()` and `close()`. A dataset can be opened with:
+    ```
+    np.memmap(filename, dtype=dtype, mode="r", shape=(num_steps,) + shape)
+    ```
+
+    Arguments:
+    path        -- The directory.
+    overwrite   -- If True, an existing directory is replaced.
+    """
+
+    def __init__(self, path : str, overwrite : bool = False):
+        self._path = _check_target(path, overwrite)
+        os.makedirs(self._path)
+        self._metadata = {"groups": {"": {}}, "datasets": {}}
+        self._files = {}
+
+    def create_group(self, path, attrs):
+        os.makedirs(os.path.join(self._path, path.strip("/")), exist_ok=True)
+        self._metadata["groups"][path] = {
+            k: _to_builtin(v) for k, v in attrs.items()
+        }
+
+    def create_dataset(
+        self,
+        path,
+        shape,
+        dtype,
+        num_steps,
+        resizable=False,
+        chunks=None,
+        compression=None,
+        compression_opts=None,
+        shuffle=False,
+        attrs={}
+    ):
+        dtype = np.dtype(dtype)
+        filename = path.strip("/") + ".dat"
+        self._metadata["datasets"][path] = {
+            "file": filename,
+            "dtype": dtype.str,
+            "shape": list(shape),
+            "num_steps": 0,
+            "attrs": {k: _to_builtin(v) for k, v in attrs.items()}
+        }
+        self._files[path] = open(os.path.join(self._path, filename), "w+b")
+        return path
+
+    def write(self, datasets, buffers, start, stop):
+        for path, buf in zip(datasets, buffers):
+            fd = self._files[path]
+            meta = self._metadata["datasets"][path]
+            data = np.ascontiguousarray(buf[:stop - start])
+            row_size = data.itemsize * data[0].size
+            if fd.tell() != start * row_size:
+                fd.seek(start * row_size)
+            fd.write(data.data)
+            meta["num_steps"] = max(meta["num_steps"], stop)
+
+    def resize(self, datasets, num_steps):
+        # The files grow as they are written. Only shrinking matters.
+        for path in datasets:
+            meta = self._metadata["datasets"][path]
+            if num_steps < meta["num_steps"]:
+                fd = self._files[path]
+                row_size = (
+                    np.dtype(meta["dtype"]).itemsize
+                    * int(np.prod(meta["shape"]))
+                )
+                fd.truncate(num_steps * row_size)
+                meta["num_steps"] = num_steps
+
+    def set_attrs(self, path, attrs):
+        self._metadata["groups"].setdefault(path, {}).update(
+            {k: _to_builtin(v) for k, v in attrs.items()}
+        )
+
+    def flush(self):
+        for fd in self._files.values():
+            fd.flush()
+        with open(os.path.join(self._path, MEMMAP_METADATA), "w") as fd:
+            json.dump(self._metadata, fd)
+
+    def close(self):
+        self.flush()
+        for fd in self._files.values():
+            fd.close()
+
+
+# URI schemes and file extensions of the backends
+BACKEND_SCHEMES = {
+    "hdf5": HDF5Backend,
+    "h5": HDF5Backend,
+    "zarr": ZarrBackend,
+    "parquet": ParquetBackend,
+    "memmap": MemmapBackend,
+}
+
+BACKEND_EXTENSIONS = {
+    ".h5": HDF5Backend,
+    ".hdf5": HDF5Backend,
+    ".zarr": ZarrBackend,
+    ".parquet": ParquetBackend,
+    ".pq": ParquetBackend,
+    ".mmap": MemmapBackend,
+    ".memmap": MemmapBackend,
+}
+
+
+def get_backend_type(target : str) -> Tuple[type, str]:
+    """Get the backend class and the path that a string refers to."""
+    if "://" in target:
+        scheme, path = target.split("://", 1)
+        if scheme not in BACKEND_SCHEMES:
+            raise ValueError(
+                f"The supported schemes are {tuple(BACKEND_SCHEMES.keys())}."
+            )
+        return BACKEND_SCHEMES[scheme], path
+    ext = os.path.splitext(target.rstrip("/"))[1].lower()
+    return BACKEND_EXTENSIONS.get(ext, HDF5Backend), target
+
+
+def open_backend(
+    target : Union[str, h5py.Group, StorageBackend],
+    overwrite : bool = False,
+    swmr : bool = False
+) -> StorageBackend:
+    """Open a storage backend for writing.
+
+    Arguments:
+    target      -- A backend (returned as is), an h5py group, or a
+                   string. Strings may start with a scheme
+                   (`"hdf5://"`, `"zarr://"`, `"parquet://"`,
+                   `"memmap://"`). Otherwise, the backend is picked by
+                   the extension (`.h5`, `.hdf5`, `.zarr`, `.parquet`,
+                   `.pq`, `.mmap`, `.memmap`). HDF5 is used for all other
+                   extensions.
+    overwrite   -- If True, existing files are replaced.
+    swmr        -- If True, an HDF5 file is created that can be read
+                   while it is written (see `HDF5Backend.start_swmr()`).
+    """
+    if isinstance(target, StorageBackend):
+        return target
+    if isinstance(target, h5py.Group):
+        return HDF5Backend(target, swmr=swmr)
+    BackendType, path = get_backend_type(target)
+    if swmr:
+        if BackendType is not HDF5Backend:
+            raise ValueError("SWMR mode is only available for HDF5 files.")
+        return HDF5Backend(path, overwrite=overwrite, swmr=True)
+    return BackendType(path, overwrite=overwrite)
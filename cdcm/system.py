@@ -30,6 +30,7 @@ from . import (
 from typing import Any, Dict, Callable, Sequence, Tuple, List
 from functools import partial, partialmethod, cached_property
 from contextlib import AbstractContextManager, nullcontext
+from fnmatch import fnmatchcase
 import networkx as nx
 
 
@@ -144,6 +145,7 @@ f"While trying to add `{obj.name}` to `{self.name}`, I discovered that\n"
         self._nodes.append(obj)
         obj.owner = self
         self.__dict__[name] = obj
+        self._invalidate_path_index()
 
     @property
     def direct_nodes(self):
@@ -193,6 +195,67 @@ f"While trying to add `{obj.name}` to `{self.name}`, I discovered that\n"
         """
         self._nodes.remove(obj)
         del self.__dict__[obj.name]
+        self._invalidate_path_index()
+
+    def _invalidate_absname(self) -> None:
+        """Forget the cached absolute names of the system and its nodes."""
+        if self.__dict__.get("_absname") is None:
+            # No node below this system can have a cached absname
+            self._absname = None
+            return
+        self._absname = None
+        for n in self.__dict__.get("_nodes", ()):
+            n._invalidate_absname()
+
+    def _invalidate_path_index(self) -> None:
+        """Forget the path index of the system and of its owners."""
+        self.__dict__.pop("path_index", None)
+        if isinstance(self.owner, System):
+            self.owner._invalidate_path_index()
+
+    @cached_property
+    def path_index(self) -> Dict[str, Node]:
+        """Get a dictionary from paths to nodes.
+
+        The paths are relative to this system, e.g., `"zone_1/T_room"`.
+        Subsystems are included. The index is rebuilt when nodes are
+        added to or removed from the system (or its subsystems).
+        """
+        index = {}
+        for n in self.direct_nodes:
+            index[n.name] = n
+            if isinstance(n, System):
+                for path, m in n.path_index.items():
+                    index[n.name + "/" + path] = m
+        return index
+
+    def lookup(self, path : str) -> Node:
+        """Get the node found at `path`.
+
+        The path is relative to this system, e.g., `"zone_1/T_room"`.
+        Absolute names (see `Node.absname`) are also accepted.
+        """
+        index = self.path_index
+        if path in index:
+            return index[path]
+        prefix = self.absname + "/"
+        if path.startswith(prefix) and path[len(prefix):] in index:
+            return index[path[len(prefix):]]
+        raise KeyError(f"There is no node `{path}` in `{self.absname}`.")
+
+    def select(self, pattern : str) -> List[Node]:
+        """Get the nodes whose paths match a glob `pattern`.
+
+        The pattern is matched one path component at a time, so `*`
+        does not match across `/`. For example,
+        `system.select("*/zone_*/T_room")`.
+        """
+        parts = pattern.split("/")
+        return [
+            n
+            for path, n in self.path_index.items()
+            if _match_path(path.split("/"), parts)
+        ]
 
     @cached_property
     def states(self) -> List[State]:
@@ -301,6 +364,13 @@ f"While trying to add `{obj.name}` to `{self.name}`, I discovered that\n"
             t.transition()
 
 
+def _match_path(path : List[str], pattern : List[str]) -> bool:
+    """Check if the components of `path` match those of `pattern`."""
+    return len(path) == len(pattern) and all(
+        fnmatchcase(p, q) for p, q in zip(path, pattern)
+    )
+
+
 def make_system(func):
     signature = get_default_args(func)
     parents = signature.values()
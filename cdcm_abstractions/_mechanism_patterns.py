@@ -44,6 +44,16 @@ def maybe_make_system(name_or_system: Union[str, System], clstype=System, **kwar
 
 def polynomial(order: int, _clip: bool=True, lval: Number=0.0, uval: Number=1.0):
     """A polynominal function"""
+    def k_steps(state, dt, rate, *args, k, **kwargs):
+        # After the first step the state is within the bounds and
+        # clipping k - 1 shifts is the same as clipping their sum
+        rate_term = [rate ** i for i in range(1, order + 1)]
+        if not _clip:
+            return state - k * dt * sum(rate_term)
+        state = f(state, dt, rate, *args, **kwargs)
+        return clip(state - (k - 1) * dt * sum(rate_term), lval, uval)
+
+    @declare_k_steps(k_steps)
     def f(state, dt, rate, *args, **kwargs):
         rate_term = [rate ** i for i in range(1, order + 1)]
         new_state = state - dt * sum(rate_term)
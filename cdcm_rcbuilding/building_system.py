@@ -18,6 +18,7 @@ from yabml import *
 
 from hvac_system import HVACSystem
 from rc_system import RCBuildingSystem
+from rc_extraction import extract_rc_parameters
 
 Q_ = ureg().Quantity
 
@@ -168,7 +169,8 @@ def make_building_cdcm_system(building, weather_sys, clock):
                          the building given. It is a list.
     """
     building_cdcm_system = []
-    for z, n in zip(building.zones, building.neighbor):
+    rc_parameters = extract_rc_parameters(building)
+    for p in rc_parameters.itertuples():
         Q_int = Variable(
             name="Q_int",
             units="W",
@@ -193,16 +195,14 @@ def make_building_cdcm_system(building, weather_sys, clock):
                                        Q_int,
                                        u_t,
                                        name="zone_rc_system")
-        Cp_room, Cp_env, Cp_genv, R_rc, R_oe, R_er, R_gr, R_ge = \
-            make_rc_of_cdcm(z, n)
-        zone_rc_sys.C_room.value = Cp_room
-        zone_rc_sys.C_env.value = Cp_env
-        zone_rc_sys.C_genv.value = Cp_genv
-        zone_rc_sys.R_rc.value = R_rc
-        zone_rc_sys.R_oe.value = R_oe
-        zone_rc_sys.R_er.value = R_er
-        zone_rc_sys.R_gr.value = R_gr
-        zone_rc_sys.R_ge.value = R_ge
+        zone_rc_sys.C_room.value = p.C_room
+        zone_rc_sys.C_env.value = p.C_env
+        zone_rc_sys.C_genv.value = p.C_genv
+        zone_rc_sys.R_rc.value = p.R_rc
+        zone_rc_sys.R_oe.value = p.R_oe
+        zone_rc_sys.R_er.value = p.R_er
+        zone_rc_sys.R_gr.value = p.R_gr
+        zone_rc_sys.R_ge.value = p.R_ge
 
         zone_cdcm_sys = System(
             name="zone_cdcm_system",
@@ -0,0 +1,222 @@
+"""Batched rollouts of RC zones and HVAC plants for model-predictive
+control.
+
+An `RCRollout` reads the current states, matrices and inputs of an
+`RCBuildingSystem` (or a `MultiZoneRCSystem`) and of the parameters of
+its controllers. It then simulates many candidate sequences of ideal
+loads over a horizon at once and returns their costs. The simulation
+is not touched.
+
+The candidates go through the same control logic and HVAC plant as
+`SmartThermostat` and `HVACSystem` (see `control_logic_kernel()` and
+`hvac_plant_kernel()`). So, the ideal loads of the PID controller are
+replaced by the candidates.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = ["RCRollout", "CONTROL_PARAMETERS", "PLANT_PARAMETERS"]
+
+
+from typing import Any, Dict, Sequence, Tuple, Union
+import numpy as np
+
+from cdcm import *
+from rc_system import RCBuildingSystem
+from multizone_rc_system import MultiZoneRCSystem
+from multizone_hvac_system import control_logic_kernel, hvac_plant_kernel
+
+
+# The parameters of the control logic (in the order of the kernel)
+CONTROL_PARAMETERS = (
+    "u_max_h", "u_max_c", "m_dot_max", "m_dot_min", "T_sup", "cp_air"
+)
+
+# The parameters of the HVAC plant (in the order of the kernel)
+PLANT_PARAMETERS = (
+    "Tlvc", "COPh", "EFc", "c_FAN", "m_design", "dP", "e_tot", "rho_air"
+)
+
+# The inputs of a zone (the columns of the input matrix)
+INPUTS = ("T_out", "T_gd", "Q_sg", "Q_int", "T_cor", "u")
+
+
+def _per_step(value : Any, horizon : int, num_zones : int) -> np.ndarray:
+    """Broadcast a scalar, an array (horizon,) or an array
+    (horizon, num_zones) to (horizon, num_zones)."""
+    value = np.asarray(value, dtype=np.float64)
+    if value.ndim == 1:
+        value = value[:, None]
+    return np.broadcast_to(value, (horizon, num_zones))
+
+
+class RCRollout(object):
+    """Rollouts of candidate control sequences.
+
+    Arguments:
+    rc          --  An `RCBuildingSystem` or a `MultiZoneRCSystem`.
+    controllers --  The systems with the parameters of the control
+                    logic and the HVAC plants (e.g., a
+                    `SmartThermostat` and an `HVACSystem`, or a
+                    `MultiZoneHVACSystem`). The first system that has
+                    a parameter is used.
+    """
+
+    def __init__(
+        self,
+        rc : Union[RCBuildingSystem, MultiZoneRCSystem],
+        controllers : Sequence[System]
+    ):
+        self.rc = rc
+        self.controllers = tuple(controllers)
+        self.dt = get_default_args(rc.make_matrices.func)["dt"]
+        if isinstance(rc, MultiZoneRCSystem):
+            self.num_zones = rc.num_zones
+            self._inputs = rc.transition_zones.inputs
+        else:
+            self.num_zones = 1
+            args = get_default_args(rc.transition_room.func)
+            self._inputs = tuple(args[k] for k in INPUTS)
+        self._parameters = {
+            k: self._find_parameter(k)
+            for k in CONTROL_PARAMETERS + PLANT_PARAMETERS
+        }
+
+    def _find_parameter(self, name : str) -> Parameter:
+        for s in self.controllers:
+            p = getattr(s, name, None)
+            if isinstance(p, Parameter):
+                return p
+        raise ValueError(f"None of the controllers has the parameter `{name}`.")
+
+    def get_state(self) -> np.ndarray:
+        """Get the current states as an array (num_zones, 3)."""
+        if isinstance(self.rc, MultiZoneRCSystem):
+            return np.array(self.rc.T.value, dtype=np.float64)
+        return np.array([[
+            self.rc.T_env.value, self.rc.T_genv.value, self.rc.T_room.value
+        ]], dtype=np.float64)
+
+    def get_matrices(self) -> Tuple[Any, Any]:
+        """Get the current discrete matrices `A` and `B`."""
+        # Does nothing unless the parameters have changed
+        self.rc.make_matrices.forward()
+        return self.rc.A.value, self.rc.B.value
+
+    def get_inputs(self) -> np.ndarray:
+        """Get the current inputs as an array (num_zones, 6)."""
+        U = np.empty((self.num_zones, len(INPUTS)))
+        for j, node in enumerate(self._inputs):
+            U[:, j] = node.value
+        return U
+
+    def rollout(
+        self,
+        controls : np.ndarray,
+        T_sp : Union[float, np.ndarray] = 23.0,
+        forecasts : Dict[str, np.ndarray] = None,
+        comfort_weight : float = 1.0,
+        energy_weight : float = 1.0,
+        return_trajectories : bool = False
+    ):
+        """Simulate candidate sequences of ideal loads.
+
+        The cost of a candidate is the sum over the steps and the zones
+        of `comfort_weight * (T_room - T_sp)^2 + energy_weight * energy`,
+        where `T_room` is the room temperature after the step and
+        `energy` is the energy consumed during the step [kWh].
+
+        Arguments:
+        controls            -- The ideal loads [W]. An array
+                               (num_candidates, horizon, num_zones). The
+                               last dimension may be dropped for a
+                               single zone.
+        T_sp                -- The setpoints. A scalar, an array
+                               (horizon,) or an array
+                               (horizon, num_zones).
+        forecasts           -- A dictionary from the names of the
+                               inputs (`T_out`, `T_gd`, `Q_sg`, `Q_int`,
+                               `T_cor`) to their values in the same
+                               shapes as `T_sp`. The missing inputs keep
+                               their current values.
+        comfort_weight      -- The weight of the comfort term.
+        energy_weight       -- The weight of the energy term.
+        return_trajectories -- Also return the room temperatures and the
+                               energy of each step.
+
+        Returns the costs (num_candidates,). If `return_trajectories`
+        is True, it also returns the room temperatures and the
+        energies as arrays (num_candidates, horizon, num_zones).
+        """
+        N = self.num_zones
+        controls = np.asarray(controls, dtype=np.float64)
+        if controls.ndim == 2:
+            controls = controls[:, :, None]
+        K, H = controls.shape[:2]
+        A, B = self.get_matrices()
+        dt = self.dt.value
+        U0 = self.get_inputs()
+        exogenous = np.broadcast_to(U0, (H, N, len(INPUTS))).copy()
+        for k, v in (forecasts or {}).items():
+            exogenous[:, :, INPUTS.index(k)] = _per_step(v, H, N)
+        T_sp = _per_step(T_sp, H, N)
+        control = [self._parameters[k].value for k in CONTROL_PARAMETERS]
+        plant = [self._parameters[k].value for k in PLANT_PARAMETERS]
+
+        X = np.broadcast_to(self.get_state(), (K, N, 3)).reshape(K, 3 * N)
+        U = np.empty((K, N, len(INPUTS)))
+        costs = np.zeros(K)
+        if return_trajectories:
+            T_rooms = np.empty((K, H, N))
+            energies = np.empty((K, H, N))
+        for t in range(H):
+            T_room = X[:, 2::3]
+            m_dot, Q_h, Q_c = control_logic_kernel(
+                controls[:, t], T_room, *control
+            )
+            energy, u_apply = hvac_plant_kernel(
+                Q_h, Q_c, m_dot, dt, exogenous[t, :, 0], *plant
+            )
+            U[:] = exogenous[t]
+            U[:, :, 5] = u_apply
+            X = (A @ X.T + B @ U.reshape(K, -1).T).T
+            T_room = X[:, 2::3]
+            costs += (
+                comfort_weight * np.sum((T_room - T_sp[t]) ** 2, axis=1)
+                + energy_weight * np.sum(energy, axis=1)
+            )
+            if return_trajectories:
+                T_rooms[:, t] = T_room
+                energies[:, t] = energy
+        if return_trajectories:
+            return costs, T_rooms, energies
+        return costs
+
+    def random_shooting(
+        self,
+        num_candidates : int,
+        horizon : int,
+        rng : np.random.Generator = None,
+        **kwargs
+    ) -> Tuple[np.ndarray, float]:
+        """Find the best of random candidate sequences.
+
+        The candidates are uniform between the maximum cooling and
+        heating loads. The keyword arguments are passed to
+        `rollout()`.
+
+        Returns the best sequence (horizon, num_zones) and its cost.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        low = self._parameters["u_max_c"].value
+        high = self._parameters["u_max_h"].value
+        controls = rng.uniform(
+            low, high, size=(num_candidates, horizon, self.num_zones)
+        )
+        costs = self.rollout(controls, **kwargs)
+        i = np.argmin(costs)
+        return controls[i], costs[i]
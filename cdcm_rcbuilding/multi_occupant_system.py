@@ -0,0 +1,356 @@
+"""An occupant behavior model for many occupants in many zones.
+
+The occupants follow the model of `OccupantSystem`. Instead of a system
+per occupant, all occupants are arrays updated by a single function.
+The occupancy schedule is precomputed for a day and looked up by the
+time. The random numbers are drawn in blocks from a seeded generator.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "MultiOccupantSystem",
+    "RandomBlock",
+    "make_office_schedule"
+]
+
+
+from typing import Any, Callable
+import numpy as np
+
+from cdcm import *
+
+
+# The number of seconds in a day
+DAY = 24 * 3600
+
+
+def make_office_schedule(
+    resolution : float,
+    start_hour : float = 8.0,
+    end_hour : float = 17.0
+) -> np.ndarray:
+    """Get the occupancy of an office during a day.
+
+    The day is split in slots of `resolution` seconds. A slot is
+    occupied if its beginning is between `start_hour` and `end_hour`
+    (inclusive), like in `OccupantSystem.check_occ`.
+
+    Returns an array of zeros and ones with a value per slot.
+    """
+    num_slots = DAY / resolution
+    if num_slots != int(num_slots):
+        raise ValueError("The resolution must divide a day.")
+    hour = np.arange(int(num_slots)) * resolution / 3600.0
+    return ((hour >= start_hour) & (hour <= end_hour)).astype(np.float64)
+
+
+class RandomBlock(object):
+    """Random variates drawn in blocks.
+
+    Every call to `next()` returns a row of a block. A new block is
+    drawn when the rows run out, or when the parameters of the
+    distribution change.
+
+    Arguments:
+    rng         -- A `numpy.random.Generator`.
+    sample      -- A function `sample(rng, size, *params)` that returns
+                   an array of shape `size`.
+    shape       -- The shape of a row.
+    block_size  -- The number of rows in a block.
+    """
+
+    def __init__(
+        self,
+        rng : np.random.Generator,
+        sample : Callable,
+        shape : tuple,
+        block_size : int = 1024
+    ):
+        self.rng = rng
+        self.sample = sample
+        self.shape = tuple(shape)
+        self.block_size = block_size
+        self._block = None
+        self._params = None
+        self._i = block_size
+
+    def _params_changed(self, params : tuple) -> bool:
+        return self._params is None or any(
+            not np.array_equal(p, q) for p, q in zip(params, self._params)
+        )
+
+    def next(self, *params : Any) -> np.ndarray:
+        """Get the next row of variates."""
+        if self._i == self.block_size or (
+            params and self._params_changed(params)
+        ):
+            self._block = self.sample(
+                self.rng, (self.block_size,) + self.shape, *params
+            )
+            self._params = tuple(np.array(p, copy=True) for p in params)
+            self._i = 0
+        row = self._block[self._i]
+        self._i += 1
+        return row
+
+
+def _uniform(rng, size):
+    return rng.random(size)
+
+
+def _standard_normal(rng, size):
+    return rng.standard_normal(size)
+
+
+def _poisson(rng, size, mu):
+    return rng.poisson(mu, size)
+
+
+class MultiOccupantSystem(System):
+    """Many occupants in many zones.
+
+    Each occupant is in a zone. Each zone has an occupancy schedule.
+    The occupants are present when the schedule of their zone says so.
+    A present occupant acts with probability `p_action`. Acting means
+    asking for a setpoint below (above) the setpoint of the zone, if
+    the room is warmer (colder) than the preference of the occupant.
+    The change is a Poisson variate. See `OccupantSystem` for the
+    details.
+
+    Arguments:
+    clock           --  The clock system
+    T_room          --  A node with the room air temperatures [C] of the
+                        zones
+    T_room_column   --  If given, the temperatures are this column of
+                        the value of `T_room` (e.g., 2 for the state `T`
+                        of `MultiZoneRCSystem`).
+    zone_of         --  The zone of each occupant (an array of
+                        integers).
+    num_zones       --  The number of zones. Default is the largest
+                        zone in `zone_of` plus one.
+    schedule        --  The occupancy of a day (see
+                        `make_office_schedule()`). An array with a value
+                        per slot, or an array with a row per zone.
+                        Default is the office schedule of
+                        `OccupantSystem`.
+    resolution      --  The number of seconds in a slot of the schedule.
+                        Default is the timestep of the clock.
+    seed            --  The seed of the random number generator.
+    block_size      --  The number of steps for which the random
+                        numbers are drawn at once.
+
+    Parameters:
+    T_p, gamma, mu_heat, mu_cool and ihg_occ_base of `OccupantSystem`
+    with a value per occupant, and T_sp_ub and T_sp_lb with a value
+    per zone. The values can be given as keyword arguments.
+
+    States:
+    T_sp            --  The setpoint temperatures of the zones [C]
+
+    Variables:
+    Occ_t           --  The occupancy indicator of each zone
+    p_action        --  Probability of act of each occupant
+    action          --  The setpoint asked by each occupant (-1 means
+                        no action)
+    IHG_occ         --  The internal heat gain of the occupants of each
+                        zone [W]
+    lgt_on          --  The ON/OFF indicator of the lighting of each zone
+    dev_on          --  The ON/OFF indicator of the devices of each zone
+
+    Function nodes:
+    occupants_step  --  Updates all the variables
+    """
+
+    def define_internal_nodes(
+        self,
+        clock=None,
+        T_room=None,
+        T_room_column=None,
+        zone_of=None,
+        num_zones=None,
+        schedule=None,
+        resolution=None,
+        seed=None,
+        block_size=1024,
+        T_p=20.0,
+        gamma=0.5,
+        mu_heat=2.0,
+        mu_cool=1.5,
+        ihg_occ_base=350.0,
+        T_sp=23.0,
+        T_sp_ub=28.0,
+        T_sp_lb=18.0,
+        **kwargs
+    ):
+        zone_of = np.asarray(zone_of, dtype=np.intp)
+        num_occupants = zone_of.shape[0]
+        if num_zones is None:
+            num_zones = int(zone_of.max()) + 1
+        self.num_occupants = num_occupants
+        self.num_zones = num_zones
+        if resolution is None:
+            resolution = clock.dt.value
+        if schedule is None:
+            schedule = make_office_schedule(resolution)
+        schedule = np.asarray(schedule, dtype=np.float64)
+        schedule = np.ascontiguousarray(
+            np.broadcast_to(schedule, (num_zones, schedule.shape[-1])).T
+        )
+        num_slots = schedule.shape[0]
+        assert num_slots * resolution == DAY, \
+            "The schedule must cover a day."
+
+        def per_occupant(value):
+            return np.broadcast_to(
+                np.asarray(value, dtype=np.float64), (num_occupants,)
+            ).copy()
+
+        def per_zone(value):
+            return np.broadcast_to(
+                np.asarray(value, dtype=np.float64), (num_zones,)
+            ).copy()
+
+        T_sp = State(
+            name="T_sp",
+            value=per_zone(T_sp),
+            units="degC",
+            description="The setpoint temperatures of the zones"
+        )
+
+        T_p = Parameter(
+            name="T_p",
+            value=per_occupant(T_p),
+            units="degC",
+            description="Actual preference temperature of the occupants"
+        )
+
+        gamma = Parameter(
+            name="gamma",
+            value=per_occupant(gamma),
+            units=None,
+            description="occupancy sensitivity of the room temperature"
+        )
+
+        mu_heat = Parameter(
+            name="mu_heat",
+            value=per_occupant(mu_heat),
+            units=None,
+            description="heating mode action parameter of the occupants"
+        )
+
+        mu_cool = Parameter(
+            name="mu_cool",
+            value=per_occupant(mu_cool),
+            units=None,
+            description="cooling mode action parameter of the occupants"
+        )
+
+        ihg_occ_base = Parameter(
+            name="ihg_occ_base",
+            value=per_occupant(ihg_occ_base),
+            units="W",
+            description="The base internal heat gain of the occupants"
+        )
+
+        T_sp_ub = Parameter(
+            name="T_sp_ub",
+            value=per_zone(T_sp_ub),
+            units="degC",
+            description="upper bound of thermal control"
+        )
+
+        T_sp_lb = Parameter(
+            name="T_sp_lb",
+            value=per_zone(T_sp_lb),
+            units="degC",
+            description="lower bound of thermal control"
+        )
+
+        Occ_t = Variable(
+            name="Occ_t",
+            value=np.zeros(num_zones),
+            units=None,
+            description="The occupancy indicators of the zones"
+        )
+
+        p_action = Variable(
+            name="p_action",
+            value=np.full(num_occupants, 0.1),
+            units=None,
+            description="The probabilities of the occupants to act"
+        )
+
+        action = Variable(
+            name="action",
+            value=np.full(num_occupants, -1.0),
+            units="degC",
+            description="The setpoints asked by the occupants"
+        )
+
+        IHG_occ = Variable(
+            name="IHG_occ",
+            value=np.zeros(num_zones),
+            units="W",
+            description="The internal heat gain caused by the occupants"
+        )
+
+        lgt_on = Variable(
+            name="lgt_on",
+            value=np.zeros(num_zones),
+            units=None,
+            description="The use percentage of lighting"
+        )
+
+        dev_on = Variable(
+            name="dev_on",
+            value=np.zeros(num_zones),
+            units=None,
+            description="The use percentage of devices"
+        )
+
+        rng = np.random.default_rng(seed)
+        self.rng = rng
+        shape = (num_occupants,)
+        uniforms = RandomBlock(rng, _uniform, shape, block_size)
+        normals = RandomBlock(rng, _standard_normal, shape, block_size)
+        cool = RandomBlock(rng, _poisson, shape, block_size)
+        heat = RandomBlock(rng, _poisson, shape, block_size)
+
+        @make_function(Occ_t, p_action, action, IHG_occ, lgt_on, dev_on)
+        def occupants_step(
+            time=clock.t,
+            T_room=T_room,
+            T_sp=T_sp,
+            T_p=T_p,
+            gamma=gamma,
+            mu_heat=mu_heat,
+            mu_cool=mu_cool,
+            ihg_occ_base=ihg_occ_base,
+            T_sp_ub=T_sp_ub,
+            T_sp_lb=T_sp_lb
+        ):
+            """Updates the occupants of all zones."""
+            if T_room_column is not None:
+                T_room = T_room[:, T_room_column]
+            T_room = np.broadcast_to(T_room, (num_zones,))
+            occ = schedule[int(time // resolution) % num_slots].copy()
+            present = occ[zone_of]
+            T = T_room[zone_of]
+            p = 1.0 / (1.0 + np.exp(-gamma * (T - T_p) ** 2))
+            acts = (present == 1.0) & (uniforms.next() <= p)
+            setpoint = T_sp[zone_of]
+            # The room temperature if it is at the preference
+            change = np.where(
+                T > T_p,
+                setpoint - cool.next(mu_cool),
+                np.where(T < T_p, setpoint + heat.next(mu_heat), T)
+            )
+            change = np.clip(change, T_sp_lb[zone_of], T_sp_ub[zone_of])
+            new_action = np.where(acts, change, -1.0)
+            ihg = ihg_occ_base * (1.0 + 0.25 * normals.next()) * present
+            IHG = np.bincount(zone_of, weights=ihg, minlength=num_zones)
+            return occ, p, new_action, IHG, occ, occ
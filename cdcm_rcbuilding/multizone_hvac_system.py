@@ -0,0 +1,341 @@
+"""A fused thermostat and HVAC model for many zones.
+
+It computes the same things as `SmartThermostat` followed by
+`HVACSystem`, but for all zones at once and with a single function per
+step. The values of the variables are arrays with a value per zone.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "MultiZoneHVACSystem",
+    "thermostat_hvac_kernel",
+    "control_logic_kernel",
+    "hvac_plant_kernel"
+]
+
+
+import numpy as np
+
+from cdcm import *
+from multi_occupant_system import DAY, make_office_schedule
+
+
+def control_logic_kernel(
+    u_ideal, T_room, u_max_h, u_max_c, m_dot_max, m_dot_min, T_sup, cp_air
+):
+    """Turn the ideal loads to the mass flow rates and the heating and
+    cooling loads (see `SmartThermostat.control_logic`).
+
+    Returns `m_dot`, `Q_h` and `Q_c`.
+    """
+    u = np.where(u_ideal > u_max_h, u_max_h, u_ideal)
+    u = np.where(u <= u_max_c, u_max_c, u)
+    cooling = u <= 0
+    Q_c = np.where(cooling, u, m_dot_min * cp_air * (T_sup - T_room))
+    Q_h = np.where(cooling, 0.0, u)
+    m_dot = np.where(
+        cooling, (m_dot_max - m_dot_min) * (-u / 2000) + m_dot_min, m_dot_min
+    )
+    return m_dot, Q_h, Q_c
+
+
+def hvac_plant_kernel(
+    Q_h, Q_c, m_dot, dt, T_out,
+    Tlvc, COPh, EFc, c_FAN, m_design, dP, e_tot, rho_air
+):
+    """Get the energy consumed by the HVAC plants and the loads applied
+    to the rooms (see `HVACSystem.f_u`).
+
+    Returns `energy` and `u_apply`.
+    """
+    COPc = (
+        EFc[0] + T_out * EFc[1] + Tlvc * EFc[2]
+        + (T_out ** 2) * EFc[3]
+        + (Tlvc ** 2) * EFc[4] + T_out * Tlvc * EFc[5]
+    )
+    f_flow = m_dot / m_design
+    f_pl = c_FAN[0] + f_flow * (
+        c_FAN[1] + f_flow * (c_FAN[2] + f_flow * (c_FAN[3] + f_flow * c_FAN[4]))
+    )
+    Q_fan = f_pl * m_design * dP / (e_tot * rho_air)
+    energy = (Q_h / COPh + Q_c / COPc + Q_fan) / 1000 * (dt / 3600)
+    return energy, Q_h + Q_c
+
+
+def thermostat_hvac_kernel(
+    T_sp, T_room, error_past, integral_past, dt, T_out,
+    Kp, Ki, Kd, u_max_h, u_max_c, m_dot_max, m_dot_min, T_sup, cp_air,
+    Tlvc, COPh, EFc, c_FAN, m_design, dP, e_tot, rho_air
+):
+    """Do a step of the PID controllers, the control logic and the HVAC
+    plants of all zones.
+
+    All arguments are scalars or arrays with a value per zone, except
+    the coefficients `EFc` (6) and `c_FAN` (5).
+
+    Returns `error`, `integral`, `derivative`, `u_ideal`, `m_dot`,
+    `Q_h`, `Q_c`, `energy` and `u_apply`.
+    """
+    error = T_sp - T_room
+    integral = integral_past + error * dt
+    derivative = (error - error_past) / dt
+    u_ideal = Kp * error + Ki * integral + Kd * derivative
+    m_dot, Q_h, Q_c = control_logic_kernel(
+        u_ideal, T_room, u_max_h, u_max_c, m_dot_max, m_dot_min, T_sup, cp_air
+    )
+    energy, u_apply = hvac_plant_kernel(
+        Q_h, Q_c, m_dot, dt, T_out,
+        Tlvc, COPh, EFc, c_FAN, m_design, dP, e_tot, rho_air
+    )
+    return (
+        error, integral, derivative, u_ideal, m_dot, Q_h, Q_c,
+        energy, u_apply
+    )
+
+
+class MultiZoneHVACSystem(System):
+    """Smart thermostats and HVAC systems of many zones.
+
+    The thermostats follow a setpoint schedule that the occupants can
+    override. See `SmartThermostat` and `HVACSystem` for the details.
+
+    Arguments:
+    clock           --  The clock system
+    num_zones       --  The number of zones
+    T_sp_occ        --  Setpoints overridden by the occupants. -1: no
+                        change. A scalar or an array with a value per
+                        zone.
+    T_room_sensor   --  The sensed room air temperatures [C]
+    T_out           --  Outdoor air temperature [C]
+    T_sp_occupied   --  The setpoint when the zone is occupied
+    T_sp_unoccupied --  The setpoint when the zone is not occupied
+    schedule        --  The occupancy of a day (see
+                        `make_office_schedule()`). Default is the
+                        schedule of `SmartThermostat`.
+    resolution      --  The number of seconds in a slot of the schedule.
+                        Default is the timestep of the clock.
+
+    States:
+    integral_past   --  Intergral storage of past time step
+    error_past      --  Portional storage of past time step
+
+    Variables (a value per zone):
+    T_sp            --  The setpoint temperature [C]
+    error           --  Difference between setpoint and room temperature
+    integral        --  Intergral storage of the PID controller
+    derivative      --  The derivative of the error
+    u_ideal         --  Ideal input heat flux to hvac system [W]
+    m_dot           --  The required mass flow rate [kg/s]
+    Q_c             --  The required cooling load [W]
+    Q_h             --  The required heating load [W]
+    measured_energy --  measured consumed energy [W]
+    u_apply         --  applied u to the rc model [W]
+
+    Parameters:
+    Those of `SmartThermostat` and `HVACSystem`. They can be given as
+    keyword arguments. They can be scalars or arrays with a value per
+    zone (except `EFc` and `c_FAN`).
+
+    Function nodes:
+    control_step    --  Evaluates the controllers and the plants
+    f_past          --  Stores the error and the integral
+    """
+
+    def define_internal_nodes(
+        self,
+        clock=None,
+        num_zones=None,
+        T_sp_occ=None,
+        T_room_sensor=None,
+        T_out=None,
+        T_sp_occupied=23.0,
+        T_sp_unoccupied=18.0,
+        schedule=None,
+        resolution=None,
+        **kwargs
+    ):
+        if resolution is None:
+            resolution = clock.dt.value
+        if schedule is None:
+            schedule = make_office_schedule(resolution)
+        schedule = np.asarray(schedule, dtype=np.float64)
+        num_slots = schedule.shape[-1]
+        assert num_slots * resolution == DAY, \
+            "The schedule must cover a day."
+        # The scheduled setpoints of each slot of the day
+        setpoints = np.ascontiguousarray(np.broadcast_to(
+            np.where(schedule == 1.0, T_sp_occupied, T_sp_unoccupied),
+            (num_zones, num_slots)
+        ).T)
+
+        def zeros():
+            return np.zeros(num_zones)
+
+        parameters = dict(
+            Kp=(20, None, "proportional coefficient of PID controller"),
+            Ki=(0.1, None, "integral coefficient of PID controller"),
+            Kd=(0.0, None, "derivative coefficient of PID controller"),
+            u_max_h=(1500, "W", "maximum heating loads"),
+            u_max_c=(-1500, "W", "maximum cooling loads"),
+            m_dot_max=(0.080938984 * 550 / 140, "kg/s",
+                       "maximum fan design air mass flow rate"),
+            m_dot_min=(0.080938984, "kg/s",
+                       "minimum fan design air mass flow rate"),
+            T_sup=(16.5, "C", "supply air temperature"),
+            cp_air=(1004, "J/kg", "specific heat of air"),
+            Tlvc=(7.0, "C", "heatpump leaving water temperature"),
+            COPh=(0.9, None, "heatpump heating efficiency coefficient"),
+            EFc=(np.array([14.8187, -0.2538, 0.1814, -0.0003, -0.0021, 0.002]),
+                 None, "heatpump cooling efficiency coefficient"),
+            c_FAN=(np.array(
+                      [0.040759894, 0.08804497, -0.07292612, 0.943739823, 0]
+                   ), None, "fan efficiency coefficient"),
+            m_design=(0.9264 * 0.4, "kg/s", "fan design air mass flow rate"),
+            dP=(500, "kg/m/s**2", "fan design pressure rise"),
+            e_tot=(0.6045, None, "fan total efficiency"),
+            rho_air=(1.225, "kg/m**3", "density of air")
+        )
+        p = {
+            name: Parameter(
+                name=name,
+                value=kwargs.get(name, value),
+                units=units,
+                description=description
+            )
+            for name, (value, units, description) in parameters.items()
+        }
+
+        T_sp = Variable(
+            name="T_sp",
+            value=np.full(num_zones, float(T_sp_occupied)),
+            units="degC",
+            description="The setpoint temperature to hvac system"
+        )
+
+        error = Variable(
+            name="error",
+            units="degC",
+            value=zeros(),
+            description="Difference between setpoint and room temperature"
+        )
+
+        error_past = State(
+            name="error_past",
+            value=zeros(),
+            units="degC",
+            description="The error in the previous step."
+        )
+
+        integral = Variable(
+            name="integral",
+            value=zeros(),
+            units="degC * seconds",
+            description="Intergral storage of the PID controller"
+        )
+
+        integral_past = State(
+            name="integral_past",
+            value=zeros(),
+            units="degC * seconds",
+            description="Keeps track of the intgral in the previous timestep"
+        )
+
+        derivative = Variable(
+            name="derivative",
+            value=zeros(),
+            description="The derivative of the error",
+        )
+
+        u_ideal = Variable(
+            name="u_ideal",
+            value=zeros(),
+            units="W",
+            description="Ideal input heat fluxto hvac system"
+        )
+
+        m_dot = Variable(
+            name="m_dot",
+            value=zeros(),
+            units="kg/s",
+            description="Required mass flow rate"
+        )
+
+        Q_h = Variable(
+            name="Q_h",
+            value=zeros(),
+            units="W",
+            description="Required heating loads"
+        )
+
+        Q_c = Variable(
+            name="Q_c",
+            value=zeros(),
+            units="W",
+            description="Required cooling loads"
+        )
+
+        measured_energy = Variable(
+            name="measured_energy",
+            value=zeros(),
+            units="W",
+            track=True,
+            description="measured energy"
+        )
+
+        u_apply = Variable(
+            name="u_apply",
+            value=zeros(),
+            units="W",
+            description="applied u to the rc model"
+        )
+
+        @make_function(T_sp, error, integral, derivative, u_ideal, m_dot,
+                       Q_h, Q_c, measured_energy, u_apply)
+        def control_step(
+            time=clock.t,
+            dt=clock.dt,
+            T_sp_occ=T_sp_occ,
+            T_room=T_room_sensor,
+            T_out=T_out,
+            error_past=error_past,
+            integral_past=integral_past,
+            Kp=p["Kp"],
+            Ki=p["Ki"],
+            Kd=p["Kd"],
+            u_max_h=p["u_max_h"],
+            u_max_c=p["u_max_c"],
+            m_dot_max=p["m_dot_max"],
+            m_dot_min=p["m_dot_min"],
+            T_sup=p["T_sup"],
+            cp_air=p["cp_air"],
+            Tlvc=p["Tlvc"],
+            COPh=p["COPh"],
+            EFc=p["EFc"],
+            c_FAN=p["c_FAN"],
+            m_design=p["m_design"],
+            dP=p["dP"],
+            e_tot=p["e_tot"],
+            rho_air=p["rho_air"]
+        ):
+            """Evaluates the thermostats and the HVAC systems."""
+            scheduled = setpoints[int(time // resolution) % num_slots]
+            T_sp = np.where(T_sp_occ == -1, scheduled, T_sp_occ)
+            return (T_sp,) + thermostat_hvac_kernel(
+                T_sp, T_room, error_past, integral_past, dt, T_out,
+                Kp, Ki, Kd, u_max_h, u_max_c, m_dot_max, m_dot_min, T_sup,
+                cp_air, Tlvc, COPh, EFc, c_FAN, m_design, dP, e_tot, rho_air
+            )
+
+        @make_function(error_past, integral_past)
+        def f_past(
+            error_past=error_past,
+            integral_past=integral_past,
+            error=error,
+            integral=integral
+        ):
+            """Keeps track of the previous step error and integral."""
+            return error, integral
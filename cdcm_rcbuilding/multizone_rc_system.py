@@ -0,0 +1,518 @@
+"""An RC model for a whole building with many zones.
+
+All zones are stepped together with a single sparse matrix-vector
+product. The zones are 5R3C models like `RCBuildingSystem`. Zones
+exchange heat through conductances between their room nodes.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "MultiZoneRCSystem",
+    "StateVector",
+    "ZoneVariable",
+    "make_multizone_matrices"
+]
+
+
+from typing import Any, Dict, Union
+import numpy as np
+from scipy import sparse
+
+from cdcm import *
+from rc_discretization import RC_PARAMETERS, discretize_rc_batch
+
+
+# The defaults of the parameters (same as in `RCBuildingSystem`)
+RC_DEFAULTS = dict(
+    R_oe=0.02707,
+    R_er=0.00369,
+    R_rc=0.00706,
+    R_gr=np.inf,
+    R_ge=0.00369,
+    C_room=3.5187e5,
+    C_env=3.1996e6,
+    C_genv=np.inf,
+    a_sol_env=0.90303,
+    a_sol_room=0.90303,
+    a_IHG=0.90303
+)
+
+RC_UNITS = dict(
+    R_oe="C/W",
+    R_er="C/W",
+    R_rc="C/W",
+    R_gr="C/W",
+    R_ge="C/W",
+    C_room="J/C",
+    C_env="J/C",
+    C_genv="J/C",
+    a_sol_env="",
+    a_sol_room="",
+    a_IHG=""
+)
+
+RC_DESCRIPTIONS = dict(
+    R_oe="Thermal resistance between outdoor and envelope",
+    R_er="Thermal resistance between room and envelope",
+    R_rc="Thermal resistance between room and corridor",
+    R_gr="Thermal resistance between room and ground envelope",
+    R_ge="Thermal resistance between ground envelope and ground",
+    C_room="Capacitance of the room air",
+    C_env="Capacitance of the envelope",
+    C_genv="Capacitance of the ground envelope",
+    a_sol_env="Absorptance of envelope with respect to solar gain",
+    a_sol_room="Absorptance of room with respect to solar irradiance",
+    a_IHG="Absorptance of room with respect to internal heatgain"
+)
+
+# The states of a zone (the columns of the state vector)
+ZONE_STATES = ("T_env", "T_genv", "T_room")
+
+ZONE_STATE_DESCRIPTIONS = (
+    "Temperature of envelope inner surface",
+    "Temperature of ground envelope inner surface",
+    "Temperature of room"
+)
+
+# The number of inputs of a zone: T_out, T_gd, Q_sg, Q_int, T_cor, u
+NUM_ZONE_INPUTS = 6
+
+
+class StateVector(State):
+    """A state whose value is an array with elements exposed as
+    variables.
+
+    When the state changes, it tells the functions that read its
+    elements (see `ZoneVariable`) that their parents have changed. The
+    set of these functions is kept until a variable gains or loses a
+    child.
+
+    See `State` for the keyword arguments.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        self._views = []
+        self._downstream = None
+        super().__init__(**kwargs)
+
+    @property
+    def views(self):
+        """Get the variables that read the elements of the state."""
+        return self._views
+
+    @property
+    def downstream(self):
+        """Get the functions that read the elements of the state."""
+        if self._downstream is None:
+            downstream = {}
+            for v in self._views:
+                for f in v.children:
+                    downstream[id(f)] = f
+            self._downstream = list(downstream.values())
+        return self._downstream
+
+    def add_view(self, view : Variable) -> None:
+        """Add a variable that reads an element of the state."""
+        self._views.append(view)
+        self._invalidate_downstream()
+
+    def _invalidate_downstream(self) -> None:
+        """Forget the functions that read the elements of the state."""
+        self._downstream = None
+
+    def tell_my_children_I_have_changed(self) -> None:
+        super().tell_my_children_I_have_changed()
+        if self._views:
+            for f in self.downstream:
+                f.parents_changed = True
+
+
+class ZoneVariable(Variable):
+    """A variable whose value is an element of a `StateVector`.
+
+    The value is read from the state when it is accessed. Setting the
+    value writes it in the current value of the state (e.g., to set
+    an initial condition).
+
+    Arguments:
+    state   -- A `StateVector`.
+    index   -- The index of the element.
+
+    See `Variable` for the rest of the keyword arguments.
+    """
+
+    def __init__(
+        self,
+        *,
+        state : StateVector,
+        index : Union[int, tuple],
+        **kwargs
+    ) -> None:
+        self._state = state
+        self._index = index
+        super().__init__(**kwargs)
+        state.add_view(self)
+
+    @property
+    def value(self) -> Any:
+        """Get the element of the state."""
+        return self._state._value[self._index]
+
+    @value.setter
+    def value(self, new_value : Any):
+        """Write the element of the state."""
+        if new_value is None:
+            return
+        self._state._value[self._index] = new_value
+        self.tell_my_children_I_have_changed()
+
+    def add_child(self, obj : Node, reflexive : bool = True) -> None:
+        super().add_child(obj, reflexive)
+        self._state._invalidate_downstream()
+
+    def remove_child(self, obj : Node, reflexive : bool = True) -> None:
+        super().remove_child(obj, reflexive)
+        self._state._invalidate_downstream()
+
+
+def make_multizone_matrices(
+    parameters : Dict[str, np.ndarray],
+    conductances : sparse.spmatrix,
+    dt : float
+):
+    """Get the sparse discrete matrices of a building.
+
+    The state vector has the states `(T_env, T_genv, T_room)` of each
+    zone one after the other. The input vector has the inputs
+    `(T_out, T_gd, Q_sg, Q_int, T_cor, u)` of each zone one after the
+    other.
+
+    The heat flows between zones are treated like the heat flow to the
+    corridor. Zone `i` sees the conductance `g_i = 1 / R_rc_i + sum_j
+    G_ij` to the weighted temperature `(T_cor_i / R_rc_i + sum_j G_ij
+    T_room_j) / g_i` which is held constant during a step. So, every
+    zone is discretized exactly on its own and the matrices have the
+    sparsity of the conductances. This is the same as coupling the
+    `T_cor` of `RCBuildingSystem`s to the rooms of their neighbors.
+
+    Arguments:
+    parameters      -- A dictionary from the names in `RC_PARAMETERS`
+                       to arrays with a value per zone.
+    conductances    -- A sparse (num_zones, num_zones) matrix with
+                       the conductances between rooms [W/C]. The
+                       diagonal is ignored.
+    dt              -- The time step.
+
+    Returns sparse matrices `A` (3N x 3N) and `B` (3N x 6N) in CSR
+    format.
+    """
+    parameters = {
+        k: np.asarray(parameters[k], dtype=np.float64) for k in RC_PARAMETERS
+    }
+    num_zones = parameters["R_rc"].shape[0]
+    G = sparse.coo_matrix(conductances)
+    off_diagonal = G.row != G.col
+    G_row = G.row[off_diagonal]
+    G_col = G.col[off_diagonal]
+    G_data = G.data[off_diagonal].astype(np.float64)
+    with np.errstate(divide="ignore"):
+        g_rc = 1.0 / parameters["R_rc"]
+    g = g_rc + np.bincount(G_row, weights=G_data, minlength=num_zones)
+    with np.errstate(divide="ignore"):
+        R_eff = 1.0 / g
+    As, Bs = discretize_rc_batch(dict(parameters, R_rc=R_eff), dt)
+    # The fraction of the corridor flow that comes from the corridor
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w_cor = np.where(g > 0.0, g_rc / g, 0.0)
+        w_cor = np.where(np.isinf(g_rc), 1.0, w_cor)
+    b_cor = Bs[:, :, 4].copy()
+    Bs = Bs.copy()
+    Bs[:, :, 4] *= w_cor[:, None]
+
+    # Block diagonal part of A
+    zones = np.arange(num_zones)
+    r, c = np.meshgrid(np.arange(3), np.arange(3), indexing="ij")
+    rows = [(3 * zones[:, None, None] + r).ravel()]
+    cols = [(3 * zones[:, None, None] + c).ravel()]
+    data = [As.ravel()]
+    # Coupling to the rooms of the other zones
+    k = np.arange(3)
+    rows.append((3 * G_row[:, None] + k).ravel())
+    cols.append(np.repeat(3 * G_col + 2, 3))
+    data.append(
+        (b_cor[G_row] * (G_data / g[G_row])[:, None]).ravel()
+    )
+    A = sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(3 * num_zones, 3 * num_zones)
+    )
+
+    r, c = np.meshgrid(np.arange(3), np.arange(NUM_ZONE_INPUTS), indexing="ij")
+    B = sparse.csr_matrix(
+        (
+            Bs.ravel(),
+            (
+                (3 * zones[:, None, None] + r).ravel(),
+                (NUM_ZONE_INPUTS * zones[:, None, None] + c).ravel()
+            )
+        ),
+        shape=(3 * num_zones, NUM_ZONE_INPUTS * num_zones)
+    )
+    A.eliminate_zeros()
+    B.eliminate_zeros()
+    return A, B
+
+
+class MultiZoneRCSystem(System):
+    """An RC model for many zones stepped with sparse matrices.
+
+    The zones are 5R3C models like `RCBuildingSystem` that exchange
+    heat through conductances between their rooms (see
+    `make_multizone_matrices()`). The states of all zones are in the
+    state `T` with one row `(T_env, T_genv, T_room)` per zone. Each
+    zone has a subsystem with the variables `T_env`, `T_genv` and
+    `T_room` that read its row of `T`. These are not tracked by
+    default. Track `T` instead.
+
+    Arguments:
+
+    dt              --  The timestep to use (must be a node.)
+    weather_system  --  A weather system that includes:
+                        Tout: outdoor air temperature
+                        Qsg:  solar irradiance
+    parameters      --  A dictionary (or a DataFrame) from the names of
+                        the parameters of `RCBuildingSystem` to arrays
+                        with a value per zone. Missing parameters take
+                        the defaults of `RCBuildingSystem`.
+    conductances    --  The conductances between rooms [W/C]. Anything
+                        that `scipy.sparse.csr_matrix` accepts. None
+                        means that the zones are not coupled.
+    T_cor           --  The temperature of the corridor of each zone.
+                        A node with a scalar or an array with a value
+                        per zone. A plain value (or None for 23 C) is
+                        held by a new variable of the system.
+    Q_int           --  Internal heat gain of each zone. A node or a
+                        plain value (None for 0 W) like `T_cor`.
+    u               --  Input heat loads of each zone. A node or a
+                        plain value (None for 0 W) like `T_cor`.
+    zone_names      --  The names of the zone subsystems. Default is
+                        `zone_<i>`.
+    T0              --  The initial temperatures. A scalar, a row for
+                        all zones, or an array with a row per zone.
+
+    Functions:
+    make_matrices   -- Make the sparse discrete matrices A and B
+    transition_zones -- Transition function of the states
+    g_T_room_sensor -- Sensor function of adding noise to the rooms
+
+    Paramters:
+    The parameters of `RCBuildingSystem` holding an array with a value
+    per zone, and:
+    G               -- The conductances between rooms [W/C]
+    T_room_sensor_sigma -- Standard deviation of the measurement noise
+
+    Variables:
+    T_room_sensor   -- Temperature sensors at the rooms [C]
+    A               -- Discretized sparse state space A matrix
+    B               -- Discretized sparse state space B matrix
+
+    The sparse `G`, `A` and `B` are not tracked, because a
+    `SimulationSaver` cannot store sparse matrices.
+    """
+
+    def define_internal_nodes(
+        self,
+        *,
+        dt=None,
+        weather_system=None,
+        parameters=None,
+        conductances=None,
+        T_cor=None,
+        Q_int=None,
+        u=None,
+        zone_names=None,
+        T0=(20.0, 23.0, 23.0),
+        **kwargs
+    ):
+        if parameters is None:
+            raise ValueError("The parameters of the zones are required.")
+        num_zones = len(np.asarray(parameters[next(iter(parameters.keys()))]))
+        self.num_zones = num_zones
+        if zone_names is None:
+            zone_names = [f"zone_{i}" for i in range(num_zones)]
+        assert len(zone_names) == num_zones, \
+            "There must be a name per zone."
+        if conductances is None:
+            conductances = sparse.csr_matrix((num_zones, num_zones))
+
+        rc_parameters = {}
+        for k in RC_PARAMETERS:
+            value = parameters[k] if k in parameters else RC_DEFAULTS[k]
+            rc_parameters[k] = Parameter(
+                name=k,
+                value=np.broadcast_to(
+                    np.asarray(value, dtype=np.float64), (num_zones,)
+                ).copy(),
+                units=RC_UNITS[k],
+                description=RC_DESCRIPTIONS[k]
+            )
+
+        G = Parameter(
+            name="G",
+            value=sparse.csr_matrix(conductances, dtype=np.float64),
+            units="W/C",
+            track=False,
+            description="Conductances between the rooms of the zones"
+        )
+
+        T = StateVector(
+            name="T",
+            value=np.broadcast_to(
+                np.asarray(T0, dtype=np.float64), (num_zones, 3)
+            ).copy(),
+            units="degC",
+            track=True,
+            description="Temperatures of the envelopes, ground envelopes "
+                        + "and rooms of the zones"
+        )
+
+        # Plain inputs are held by variables of the system
+        inputs = {}
+        for name, value, default, units, dsc in [
+            ("T_cor", T_cor, 23.0, "degC", "The temperature of corridor."),
+            ("Q_int", Q_int, 0.0, "W", "Internal heat gain."),
+            ("u", u, 0.0, "W", "Input heat loads.")
+        ]:
+            if not isinstance(value, Node):
+                value = Variable(
+                    name=name,
+                    value=default if value is None else value,
+                    units=units,
+                    description=dsc
+                )
+            inputs[name] = value
+
+        T_gd = Variable(
+            name="T_gd",
+            value=18,
+            units="degC",
+            description="The temperature of ground. "
+        )
+
+        A = Variable(
+            name="A",
+            value=sparse.csr_matrix((3 * num_zones, 3 * num_zones)),
+            track=False,
+            description="The matrix of the dynamical system (discretized)."
+        )
+
+        B = Variable(
+            name="B",
+            value=sparse.csr_matrix(
+                (3 * num_zones, NUM_ZONE_INPUTS * num_zones)
+            ),
+            track=False,
+            description="The B matrix (discretized)."
+        )
+
+        @make_function(A, B)
+        def make_matrices(
+            dt=dt,
+            G=G,
+            R_oe=rc_parameters["R_oe"],
+            R_er=rc_parameters["R_er"],
+            R_rc=rc_parameters["R_rc"],
+            R_gr=rc_parameters["R_gr"],
+            R_ge=rc_parameters["R_ge"],
+            C_room=rc_parameters["C_room"],
+            C_env=rc_parameters["C_env"],
+            C_genv=rc_parameters["C_genv"],
+            a_sol_env=rc_parameters["a_sol_env"],
+            a_sol_room=rc_parameters["a_sol_room"],
+            a_IHG=rc_parameters["a_IHG"]
+        ):
+            """Makes the sparse matrices of all zones."""
+            return make_multizone_matrices(
+                dict(
+                    R_oe=R_oe, R_er=R_er, R_rc=R_rc, R_gr=R_gr, R_ge=R_ge,
+                    C_room=C_room, C_env=C_env, C_genv=C_genv,
+                    a_sol_env=a_sol_env, a_sol_room=a_sol_room, a_IHG=a_IHG
+                ),
+                G,
+                dt
+            )
+
+        U = np.empty((num_zones, NUM_ZONE_INPUTS))
+
+        def make_input(T_out, T_gd, Q_sg, Q_int, T_cor, u):
+            """Stacks the inputs of all zones."""
+            U[:, 0] = T_out
+            U[:, 1] = T_gd
+            U[:, 2] = Q_sg
+            U[:, 3] = Q_int
+            U[:, 4] = T_cor
+            U[:, 5] = u
+            return U.ravel()
+
+        LinearTransition(
+            name="transition_zones",
+            description="Transitions all the zones.",
+            states=T,
+            A=A,
+            B=B,
+            inputs=(
+                weather_system.Tout,
+                T_gd,
+                weather_system.Qsg,
+                inputs["Q_int"],
+                inputs["T_cor"],
+                inputs["u"]
+            ),
+            make_input=make_input
+        )
+
+        T_room_sensor = Variable(
+            name="T_room_sensor",
+            units="degC",
+            value=T.value[:, 2].copy(),
+            description="Temperature sensors at the rooms"
+        )
+
+        T_room_sensor_sigma = Parameter(
+            name="T_room_sensor_sigma",
+            units="degC",
+            value=0.01,
+            description="Standard deviation of the measurement noise"
+        )
+
+        @make_function(T_room_sensor)
+        def g_T_room_sensor(
+            T=T,
+            T_room_sensor_sigma=T_room_sensor_sigma
+        ):
+            """Get sensor measurements."""
+            return (
+                T[:, 2]
+                + T_room_sensor_sigma * np.random.randn(num_zones)
+            )
+
+        for i, zone_name in enumerate(zone_names):
+            with System(
+                name=zone_name,
+                description=f"The states of zone {i}."
+            ) as zone:
+                for j, (state, dsc) in enumerate(
+                    zip(ZONE_STATES, ZONE_STATE_DESCRIPTIONS)
+                ):
+                    ZoneVariable(
+                        name=state,
+                        state=T,
+                        index=(i, j),
+                        units="degC",
+                        track=False,
+                        description=dsc
+                    )
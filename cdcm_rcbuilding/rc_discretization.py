@@ -0,0 +1,170 @@
+"""Discretization of the 5R3C model of a zone.
+
+The continuous time model is `dx/dt = cA x + cB u` with states
+`x = (T_env, T_genv, T_room)` and inputs
+`u = (T_out, T_gd, Q_sg, Q_int, T_cor, u)`. The zero-order hold
+discretization with time step `dt` is read from the exponential of the
+augmented matrix:
+
+    expm(dt * [[cA, cB], [0, 0]]) = [[A, B], [0, I]].
+
+Absent nodes are modeled with infinite capacitances and resistances.
+An infinite capacitance means that the temperature of the node does not
+change. So, every term divided by it is zero, even if the conductance
+it multiplies is infinite (e.g., a zero resistance placeholder). An
+infinite resistance means that there is no heat flow. None of these
+cases gives NaNs.
+
+Discretizations are cached by the parameters and the time step. Many
+zones can be discretized at once with `discretize_rc_batch()`.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "RC_PARAMETERS",
+    "continuous_rc_matrices",
+    "discretize_zoh",
+    "discretize_rc",
+    "discretize_rc_batch"
+]
+
+
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+import numpy as np
+from scipy.linalg import expm
+
+
+# The parameters of the 5R3C model (in this order)
+RC_PARAMETERS = (
+    "R_oe",
+    "R_er",
+    "R_rc",
+    "R_gr",
+    "R_ge",
+    "C_room",
+    "C_env",
+    "C_genv",
+    "a_sol_env",
+    "a_sol_room",
+    "a_IHG"
+)
+
+
+def _inv(x : np.ndarray) -> np.ndarray:
+    """Get `1 / x` with `1 / inf = 0` and `1 / 0 = inf`."""
+    with np.errstate(divide="ignore"):
+        return 1.0 / np.asarray(x, dtype=np.float64)
+
+
+def _mul(x : np.ndarray, y : np.ndarray) -> np.ndarray:
+    """Get `x * y` with `0 * inf = 0`."""
+    with np.errstate(invalid="ignore"):
+        return np.where((x == 0.0) | (y == 0.0), 0.0, x * y)
+
+
+def continuous_rc_matrices(
+    R_oe, R_er, R_rc, R_gr, R_ge,
+    C_room, C_env, C_genv,
+    a_sol_env, a_sol_room, a_IHG
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the continuous time matrices `cA` and `cB` of the model.
+
+    The parameters may be arrays of the same shape `s`. Then, the
+    matrices have shapes `s + (3, 3)` and `s + (3, 6)`.
+    """
+    g_oe, g_er, g_rc, g_gr, g_ge = map(_inv, (R_oe, R_er, R_rc, R_gr, R_ge))
+    i_room, i_env, i_genv = map(_inv, (C_room, C_env, C_genv))
+    a_sol_env, a_sol_room, a_IHG = np.broadcast_arrays(
+        *map(np.asarray, (a_sol_env, a_sol_room, a_IHG))
+    )
+    shape = np.broadcast(g_oe, g_er, g_rc, g_gr, g_ge,
+                         i_room, i_env, i_genv, a_sol_env).shape
+    cA = np.zeros(shape + (3, 3))
+    cA[..., 0, 0] = -_mul(i_env, g_er + g_oe)
+    cA[..., 0, 2] = _mul(i_env, g_er)
+    cA[..., 1, 1] = -_mul(i_genv, g_ge + g_gr)
+    cA[..., 1, 2] = _mul(i_genv, g_gr)
+    cA[..., 2, 0] = _mul(i_room, g_er)
+    cA[..., 2, 1] = _mul(i_room, g_gr)
+    cA[..., 2, 2] = -_mul(i_room, g_er + g_gr + g_rc)
+
+    cB = np.zeros(shape + (3, 6))
+    cB[..., 0, 1] = _mul(i_env, g_oe)
+    cB[..., 0, 2] = _mul(i_env, a_sol_env)
+    cB[..., 0, 3] = _mul(i_env, 1.0 - a_IHG)
+    cB[..., 1, 1] = _mul(i_genv, g_ge)
+    cB[..., 2, 2] = _mul(i_room, a_sol_room)
+    cB[..., 2, 3] = _mul(i_room, a_IHG)
+    cB[..., 2, 4] = _mul(i_room, g_rc)
+    cB[..., 2, 5] = i_room
+    return cA, cB
+
+
+def discretize_zoh(
+    cA : np.ndarray,
+    cB : np.ndarray,
+    dt : float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Discretize `dx/dt = cA x + cB u` with a zero-order hold.
+
+    Uses a single exponential of the augmented matrix. Stacks of
+    matrices (shapes `s + (n, n)` and `s + (n, m)`) are discretized at
+    once.
+    """
+    n, m = cB.shape[-2:]
+    M = np.zeros(cA.shape[:-2] + (n + m, n + m))
+    M[..., :n, :n] = cA * dt
+    M[..., :n, n:] = cB * dt
+    E = expm(M)
+    return E[..., :n, :n], E[..., :n, n:]
+
+
+@lru_cache(maxsize=4096)
+def _discretize_rc_cached(parameters : tuple, dt : float) -> tuple:
+    A, B = discretize_zoh(*continuous_rc_matrices(*parameters), dt)
+    A.setflags(write=False)
+    B.setflags(write=False)
+    return A, B
+
+
+def discretize_rc(
+    R_oe, R_er, R_rc, R_gr, R_ge,
+    C_room, C_env, C_genv,
+    a_sol_env, a_sol_room, a_IHG,
+    dt
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the discrete matrices `A` (3x3) and `B` (3x6) of a zone.
+
+    The results are cached by the parameters and `dt`. The returned
+    arrays are read-only.
+    """
+    parameters = tuple(float(p) for p in (
+        R_oe, R_er, R_rc, R_gr, R_ge,
+        C_room, C_env, C_genv,
+        a_sol_env, a_sol_room, a_IHG
+    ))
+    return _discretize_rc_cached(parameters, float(dt))
+
+
+def discretize_rc_batch(
+    parameters : Dict[str, Sequence[float]],
+    dt : float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Discretize many zones at once.
+
+    Arguments:
+    parameters  -- A dictionary (or a DataFrame) from the names in
+                   `RC_PARAMETERS` to arrays with a value per zone.
+    dt          -- The time step.
+
+    Returns arrays of shapes `(N, 3, 3)` and `(N, 3, 6)`.
+    """
+    cA, cB = continuous_rc_matrices(
+        *(np.asarray(parameters[k], dtype=np.float64) for k in RC_PARAMETERS)
+    )
+    return discretize_zoh(cA, cB, dt)
@@ -0,0 +1,197 @@
+"""Vectorized extraction of the RC parameters of a YABML building.
+
+The zones, edges, segments and layers of a building are flattened to
+arrays once. The parameters of all zones are then computed with NumPy
+reductions. The rules are the same as in `make_rc_of_cdcm()`.
+
+The building is only accessed through the attributes that
+`make_rc_of_cdcm()` uses, so any object with the same structure works.
+
+Date:
+    10/19/2026
+
+"""
+
+
+__all__ = [
+    "flatten_building",
+    "extract_rc_parameters",
+    "FILM_RESISTANCE"
+]
+
+
+from typing import Any, Dict, Sequence
+import numpy as np
+import pandas as pd
+
+
+# The film resistance times the area [C m^2 / W]
+FILM_RESISTANCE = 0.87 * 5.678
+
+CP_AIR = 1006  # J/Kg-C
+RHO_AIR = 1.2  # Kg/m^3
+
+# The number of edges of a zone. The first five are the walls and the
+# ceiling. The last one is the floor.
+NUM_EDGES = 6
+
+
+def flatten_building(
+    zones : Sequence[Any],
+    neighbor : Sequence[Sequence[int]]
+) -> Dict[str, np.ndarray]:
+    """Flatten the zones of a building to arrays.
+
+    Segments that are shared by many edges (e.g., the same wall type)
+    are visited once.
+
+    Arguments:
+    zones       -- The zones of the building (e.g., `building.zones`).
+    neighbor    -- The neighbor list of each zone (e.g.,
+                   `building.neighbor`).
+
+    Returns a dictionary with the arrays:
+    lx, ly          -- The sides of the edges (num_zones, 6).
+    neighbor        -- The neighbors (num_zones, 6).
+    relative_area   -- The relative areas of the segments of the edges.
+    segment_edge    -- The flat index of the edge of each segment.
+    segment_type    -- The index of the type of each segment.
+    r, c, solar_trans -- The resistance, the capacitance and the solar
+                     transmittance (per unit area) of each type of
+                     segment.
+    """
+    lx = np.empty((len(zones), NUM_EDGES))
+    ly = np.empty((len(zones), NUM_EDGES))
+    relative_area = []
+    segment_edge = []
+    segment_type = []
+    types = {}
+    layers = []
+    layer_type = []
+    for i, zone in enumerate(zones):
+        assert len(zone.edges) == NUM_EDGES, \
+            f"Zone {i} does not have {NUM_EDGES} edges."
+        for j, e in enumerate(zone.edges):
+            lx[i, j] = e.lx.value
+            ly[i, j] = e.ly.value
+            for seg in e.segments:
+                relative_area.append(seg.relative_area.value)
+                segment_edge.append(i * NUM_EDGES + j)
+                k = types.get(id(seg.segment))
+                if k is None:
+                    k = types[id(seg.segment)] = len(types)
+                    for layer in seg.segment.layers:
+                        layers.append((
+                            layer.thickness.value,
+                            layer.conductivity.value,
+                            layer.density.value,
+                            layer.specific_heat.value,
+                            layer.solar_transmittance.value
+                        ))
+                        layer_type.append(k)
+                segment_type.append(k)
+
+    layers = np.array(layers, dtype=np.float64).reshape(-1, 5)
+    thickness, conductivity, density, specific_heat, transmittance = layers.T
+    layer_type = np.array(layer_type, dtype=np.intp)
+    num_types = len(types)
+    r = np.bincount(layer_type, thickness / conductivity, num_types)
+    c = np.bincount(layer_type, thickness * density * specific_heat, num_types)
+    # A segment is transparent only if all of its layers are
+    solar_trans = np.ones(num_types)
+    np.minimum.at(solar_trans, layer_type, transmittance)
+    return dict(
+        lx=lx,
+        ly=ly,
+        neighbor=np.array(neighbor, dtype=np.float64).reshape(-1, NUM_EDGES),
+        relative_area=np.array(relative_area, dtype=np.float64),
+        segment_edge=np.array(segment_edge, dtype=np.intp),
+        segment_type=np.array(segment_type, dtype=np.intp),
+        r=r,
+        c=c,
+        solar_trans=solar_trans
+    )
+
+
+def extract_rc_parameters(
+    building : Any = None,
+    *,
+    zones : Sequence[Any] = None,
+    neighbor : Sequence[Sequence[int]] = None
+) -> pd.DataFrame:
+    """Get the RC parameters of all the zones of a building.
+
+    Arguments:
+    building    -- A YABML building. Its `zones` and `neighbor` are
+                   used.
+    zones       -- The zones (if no building is given).
+    neighbor    -- The neighbor lists of the zones (if no building is
+                   given).
+
+    Returns a DataFrame with a row per zone and the columns `C_room`,
+    `C_env`, `C_genv`, `R_rc`, `R_oe`, `R_er`, `R_gr` and `R_ge`. It
+    can be passed as the parameters of `MultiZoneRCSystem` or to
+    `discretize_rc_batch()` (together with the absorptances).
+    """
+    if building is not None:
+        zones = building.zones
+        neighbor = building.neighbor
+    flat = flatten_building(zones, neighbor)
+    num_zones = flat["lx"].shape[0]
+    Area = flat["lx"] * flat["ly"]
+
+    # Resistance and capacitance of each edge
+    seg_area = flat["relative_area"] * Area.ravel()[flat["segment_edge"]]
+    seg_type = flat["segment_type"]
+    num_edges = num_zones * NUM_EDGES
+    U = np.bincount(
+        flat["segment_edge"], seg_area / flat["r"][seg_type], num_edges
+    ).reshape(num_zones, NUM_EDGES)
+    C = np.bincount(
+        flat["segment_edge"], seg_area * flat["c"][seg_type], num_edges
+    ).reshape(num_zones, NUM_EDGES)
+    with np.errstate(divide="ignore"):
+        R = 1.0 / U
+
+    V = flat["lx"][:, 0] * flat["ly"][:, 0] * flat["lx"][:, 1]
+    C_room = V * RHO_AIR * CP_AIR
+
+    n = flat["neighbor"]
+    exterior = n == 0
+    ground = exterior[:, 5]
+    cor = np.any(~exterior, axis=1)
+    out = np.any(exterior[:, :5], axis=1)
+    film = FILM_RESISTANCE / Area
+
+    with np.errstate(divide="ignore"):
+        R_oe = np.where(
+            out,
+            1.0 / np.sum(np.where(exterior[:, :5], 1.0 / R[:, :5], 0.0), axis=1),
+            0.0
+        )
+        C_env = np.where(
+            out, np.sum(np.where(exterior[:, :5], C[:, :5], 0.0), axis=1), np.inf
+        )
+        R_er = np.where(
+            out, np.sum(np.where(exterior[:, :5], film[:, :5], 0.0), axis=1), 0.0
+        )
+        # An interior zone has no ground envelope resistance, even
+        # if it touches the ground.
+        R_gr = np.where(ground & out, film[:, 5], np.inf)
+        R_ge = np.where(ground, R[:, 5], np.inf)
+        C_genv = np.where(ground, C[:, 5], np.inf)
+        R_rc = np.where(
+            cor,
+            1.0 / np.sum(np.where(~exterior, 1.0 / R + film, 0.0), axis=1),
+            np.inf
+        )
+    return pd.DataFrame(dict(
+        C_room=C_room,
+        C_env=C_env,
+        C_genv=C_genv,
+        R_rc=R_rc,
+        R_oe=R_oe,
+        R_er=R_er,
+        R_gr=R_gr,
+        R_ge=R_ge
+    ))
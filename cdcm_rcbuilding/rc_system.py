@@ -18,7 +18,7 @@ __all__ = ["RCBuildingSystem", "make_rc_of_cdcm"]
 
 
 from cdcm import *
-from scipy import signal
+from rc_discretization import discretize_rc
 import numpy as np
 
 
@@ -219,37 +219,33 @@ class RCBuildingSystem(System):
             a_sol_room=a_sol_room,
             a_IHG=a_IHG
         ):
-            """Makes the dynamical system matrices and discretizes them"""
-            cA = np.zeros((3, 3))
-            cA[0, 0] = (-1. / C_env) * (1. / R_er + 1./R_oe)
-            cA[0, 2] = 1. / (C_env * R_er)
-            cA[1, 1] = (-1. / C_genv) * (1. / R_ge + 1. / R_gr)
-            cA[1, 2] = 1. / (C_genv * R_gr)
-            cA[2, 0] = 1. / (C_room * R_er)
-            cA[2, 1] = 1. / (C_room * R_gr)
-            cA[2, 2] = (-1. / C_room) * (1. / R_er + 1. / R_gr + 1. / R_rc)
-
-            cB = np.zeros((3, 6))
-            cB[0, 1] = 1./(C_env * R_oe)
-            cB[0, 2] = a_sol_env / C_env
-            cB[0, 3] = (1 - a_IHG) / C_env
-            cB[1, 1] = 1. / (C_genv * R_ge)
-            cB[2, 2] = a_sol_room / C_room
-            cB[2, 3] = a_IHG / C_room
-            cB[2, 4] = 1. / (C_room * R_rc)
-            cB[2, 5] = 1. / C_room
-
-            cC = np.array([[0, 0, 1]])
-            cD = np.zeros(6)
-
-            tmp = signal.StateSpace(cA, cB, cC, cD)
-            discrete_matrix = tmp.to_discrete(dt=dt)
-            A = discrete_matrix.A
-            B = discrete_matrix.B
+            """Makes the dynamical system matrices and discretizes them.
+
+            The discretization is cached by the parameters and dt.
+            """
+            A, B = discretize_rc(
+                R_oe, R_er, R_rc, R_gr, R_ge,
+                C_room, C_env, C_genv,
+                a_sol_env, a_sol_room, a_IHG,
+                dt
+            )
 
             return A, B
 
+        def transition_room_k_steps(
+            T_env, T_room, T_genv, T_cor, T_gd, u, dt, A, B,
+            T_out, Q_sg, Q_int, *, k
+        ):
+            """Does k steps with the same inputs at once."""
+            Ak, Sk = lti_powers(A, k)
+            res = (
+                Ak @ np.array([T_env, T_genv, T_room])
+                + Sk @ (B @ np.array([T_out, T_gd, Q_sg, Q_int, T_cor, u]))
+            )
+            return res[0], res[1], res[2]
+
         @make_function(T_env, T_genv, T_room)
+        @declare_k_steps(transition_room_k_steps)
         def transition_room(
             T_env=T_env,
             T_room=T_room,
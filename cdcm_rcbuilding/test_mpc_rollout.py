@@ -0,0 +1,165 @@
+"""Tests the MPC rollouts against stepping the systems.
+
+Date:
+    10/19/2026
+
+"""
+
+
+import numpy as np
+import pandas as pd
+
+from cdcm import *
+from rc_system import RCBuildingSystem
+from multizone_rc_system import MultiZoneRCSystem
+from smart_thermostat import SmartThermostat
+from hvac_system import HVACSystem
+from multizone_hvac_system import MultiZoneHVACSystem
+from mpc_rollout import RCRollout
+
+
+df = pd.DataFrame({
+    "Tout": 10.0 + 15.0 * np.sin(np.linspace(0, 6, 200)),
+    "Qsg": 100.0 * np.cos(np.linspace(0, 6, 200)) ** 2
+})
+
+
+def make_system():
+    weather_sys = make_data_system(df, name="weather")
+    clock = make_clock(900)
+    Q_int = Variable(name="Q_int", value=150.0)
+    T_cor = Variable(name="T_cor", value=23.0)
+    T_sp_occ = Variable(name="T_sp_occ", value=-1)
+    u = Variable(name="u", value=0.0)
+    rc = RCBuildingSystem(dt=clock.dt, weather_system=weather_sys,
+                          T_cor=T_cor, Q_int=Q_int, u=u, name="rc")
+    thermostat = SmartThermostat(clock=clock, T_sp_occ=T_sp_occ,
+                                 T_room_sensor=rc.T_room, name="thermostat")
+    hvac = HVACSystem(dt=clock.dt, m_dot=thermostat.m_dot,
+                      Q_h=thermostat.Q_h, Q_c=thermostat.Q_c,
+                      T_out=weather_sys.Tout, name="hvac")
+    # The HVAC drives the room
+    f_u = make_function(u)(lambda u_apply=hvac.u_apply: u_apply)
+    f_u.name = "f_u_rc"
+    sys = System(name="building",
+                 nodes=[clock, weather_sys, Q_int, T_cor, T_sp_occ, u, rc,
+                        thermostat, hvac, f_u])
+    return sys, rc, thermostat, hvac, weather_sys
+
+
+sys, rc, thermostat, hvac, weather_sys = make_system()
+twin, _, _, _, _ = make_system()
+for _ in range(40):
+    for s in (sys, twin):
+        s.forward()
+        s.transition()
+sys.forward()
+twin.forward()
+
+rollout = RCRollout(rc, [thermostat, hvac])
+assert rollout.num_zones == 1
+assert np.allclose(rollout.get_state(),
+                   [[rc.T_env.value, rc.T_genv.value, rc.T_room.value]])
+
+num_candidates = 5
+horizon = 12
+rng = np.random.default_rng(0)
+controls = rng.uniform(-2000.0, 2000.0, size=(num_candidates, horizon))
+T_sp = 22.0 + rng.random(horizon)
+
+# Step the system with each candidate
+snapshot = take_snapshot(sys)
+T_rooms = np.empty((num_candidates, horizon))
+energies = np.empty((num_candidates, horizon))
+T_out = np.empty(horizon)
+Q_sg = np.empty(horizon)
+for k in range(num_candidates):
+    for t in range(horizon):
+        sys.forward()
+        T_out[t] = weather_sys.Tout.value
+        Q_sg[t] = weather_sys.Qsg.value
+        # Replace the output of the PID controller
+        thermostat.u_ideal.value = controls[k, t]
+        sys.forward()
+        energies[k, t] = hvac.measured_energy.value
+        sys.transition()
+        T_rooms[k, t] = rc.T_room.value
+    snapshot.restore()
+
+costs, T_rooms_r, energies_r = rollout.rollout(
+    controls, T_sp=T_sp, forecasts={"T_out": T_out, "Q_sg": Q_sg},
+    comfort_weight=2.0, energy_weight=3.0, return_trajectories=True
+)
+assert costs.shape == (num_candidates,)
+assert np.allclose(T_rooms_r[:, :, 0], T_rooms)
+assert np.allclose(energies_r[:, :, 0], energies)
+assert np.allclose(
+    costs,
+    np.sum(2.0 * (T_rooms - T_sp) ** 2 + 3.0 * energies, axis=1)
+)
+
+# The main simulation was not disturbed
+assert snapshot.values()["building/rc/T_room"] == rc.T_room.value
+for _ in range(20):
+    sys.forward()
+    twin.forward()
+    assert sys.lookup("rc/T_room").value == twin.lookup("rc/T_room").value
+    assert (sys.lookup("hvac/measured_energy").value
+            == twin.lookup("hvac/measured_energy").value)
+    sys.transition()
+    twin.transition()
+sys.forward()
+
+# Without forecasts, the inputs keep their current values
+costs = rollout.rollout(controls[:, :1])
+T_out[0] = weather_sys.Tout.value
+Q_sg[0] = weather_sys.Qsg.value
+assert np.allclose(
+    costs, rollout.rollout(controls[:, :1],
+                           forecasts={"T_out": T_out[:1], "Q_sg": Q_sg[:1]})
+)
+
+best, best_cost = rollout.random_shooting(64, horizon, rng=rng, T_sp=T_sp)
+assert best.shape == (horizon, 1)
+assert np.all(best <= thermostat.u_max_h.value)
+assert np.all(best >= thermostat.u_max_c.value)
+assert np.isclose(best_cost, rollout.rollout(best[None], T_sp=T_sp)[0])
+
+# Uncoupled zones roll out like single zones
+num_zones = 2
+mz_weather = make_data_system(df, name="weather")
+mz_clock = make_clock(900)
+R_rc = np.array([rc.R_rc.value, 2.0 * rc.R_rc.value])
+mz = MultiZoneRCSystem(
+    dt=mz_clock.dt,
+    weather_system=mz_weather,
+    parameters={"R_rc": R_rc},
+    conductances=np.zeros((num_zones, num_zones)),
+    T_cor=Variable(name="T_cor", value=23.0),
+    Q_int=Variable(name="Q_int", value=150.0),
+    u=Variable(name="u", value=0.0),
+    T0=(rc.T_env.value, rc.T_genv.value, rc.T_room.value),
+    name="mz"
+)
+mz_hvac = MultiZoneHVACSystem(
+    clock=mz_clock, num_zones=num_zones,
+    T_sp_occ=Variable(name="T_sp_occ", value=-1.0),
+    T_room_sensor=mz.T_room_sensor, T_out=mz_weather.Tout, name="hvac"
+)
+mz_sys = System(name="mz_sys", nodes=[mz_clock, mz_weather, mz, mz_hvac])
+mz_sys.forward()
+mz_rollout = RCRollout(mz, [mz_hvac])
+assert mz_rollout.num_zones == num_zones
+mz_controls = rng.uniform(-2000.0, 2000.0,
+                          size=(num_candidates, horizon, num_zones))
+forecasts = {"T_out": T_out, "Q_sg": Q_sg}
+mz_costs, mz_T_rooms, _ = mz_rollout.rollout(
+    mz_controls, forecasts=forecasts, return_trajectories=True
+)
+for i in range(num_zones):
+    rc.R_rc.value = R_rc[i]
+    rc.T_env.value, rc.T_genv.value, rc.T_room.value = mz.T.value[i]
+    _, single, _ = rollout.rollout(
+        mz_controls[:, :, i], forecasts=forecasts, return_trajectories=True
+    )
+    assert np.allclose(mz_T_rooms[:, :, i], single[:, :, 0])
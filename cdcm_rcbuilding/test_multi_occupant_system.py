@@ -0,0 +1,87 @@
+"""Tests the vectorized occupant model.
+
+Date:
+    10/19/2026
+
+"""
+
+
+import numpy as np
+
+from cdcm import *
+from occupant_system import OccupantSystem
+from multi_occupant_system import MultiOccupantSystem, make_office_schedule
+
+
+def make(seed, zone_of, T_room_value, dt=900):
+    clock = make_clock(dt)
+    T_room = Variable(name="T_room", value=T_room_value)
+    occ = MultiOccupantSystem(
+        clock=clock,
+        T_room=T_room,
+        zone_of=zone_of,
+        seed=seed,
+        block_size=64,
+        name="occupants"
+    )
+    return System(name="sys", nodes=[clock, T_room, occ]), occ
+
+
+# The schedule is the same as the one of OccupantSystem
+clock = make_clock(900)
+T_room = Variable(name="T_room", value=25.0)
+single = OccupantSystem(clock=clock, T_room=T_room, name="occupant")
+single_sys = System(name="single", nodes=[clock, T_room, single])
+sys, occ = make(0, [0], np.array([25.0]))
+for _ in range(2 * 96):
+    single_sys.forward()
+    sys.forward()
+    assert occ.Occ_t.value[0] == single.Occ_t.value
+    assert np.isclose(occ.p_action.value[0], single.p_action.value)
+    single_sys.transition()
+    sys.transition()
+
+# The same seed gives the same actions
+zone_of = np.repeat(np.arange(20), 10)
+T_rooms = np.linspace(18.0, 28.0, 20)
+runs = []
+for _ in range(2):
+    sys, occ = make(1, zone_of, T_rooms)
+    actions = []
+    for _ in range(200):
+        sys.forward()
+        actions.append(occ.action.value.copy())
+        sys.transition()
+    runs.append(np.array(actions))
+assert np.array_equal(runs[0], runs[1])
+
+# The actions have the right statistics
+sys, occ = make(2, np.zeros(2000, dtype=int), np.array([25.0]))
+# 10 am
+sys.clock.t.value = 10 * 3600.0
+sys.forward()
+a = occ.action.value
+p = 1.0 / (1.0 + np.exp(-0.5 * 25.0))
+assert abs(np.mean(a != -1.0) - p) < 0.05
+# Warm room: the occupants ask for a lower setpoint
+assert np.all(a[a != -1] <= 23.0)
+assert abs(np.mean(23.0 - a[a != -1]) - 1.5) < 0.2
+assert np.isclose(occ.IHG_occ.value[0], 2000 * 350.0, rtol=0.05)
+assert occ.lgt_on.value[0] == 1.0
+
+# Nobody is there at night
+sys.clock.t.value = 2 * 3600.0
+sys.forward()
+assert np.all(occ.action.value == -1.0)
+assert occ.IHG_occ.value[0] == 0.0
+
+# Changing the parameters of the Poisson variates takes effect
+# (the setpoints are clipped at 18 C)
+occ.mu_cool.value = np.full(2000, 5.0)
+sys.clock.t.value = 10 * 3600.0
+sys.forward()
+a = occ.action.value
+expected = np.mean(np.minimum(np.random.default_rng(3).poisson(5.0, 100000), 5))
+assert abs(np.mean(23.0 - a[a != -1]) - expected) < 0.2
+
+assert np.sum(make_office_schedule(900)) == 37
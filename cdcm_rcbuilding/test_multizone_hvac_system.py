@@ -0,0 +1,80 @@
+"""Tests the fused thermostat and HVAC model against `SmartThermostat`
+and `HVACSystem`.
+
+Date:
+    10/19/2026
+
+"""
+
+
+import numpy as np
+
+from cdcm import *
+from smart_thermostat import SmartThermostat
+from hvac_system import HVACSystem
+from multizone_hvac_system import MultiZoneHVACSystem
+
+
+num_zones = 3
+num_steps = 300
+rng = np.random.default_rng(0)
+T_rooms = 20.0 + 3.0 * rng.standard_normal((num_steps, num_zones))
+T_outs = 10.0 + 15.0 * rng.random(num_steps)
+T_sp_occs = np.where(
+    rng.random((num_steps, num_zones)) < 0.1,
+    rng.uniform(18.0, 26.0, size=(num_steps, num_zones)),
+    -1.0
+)
+Kps = np.array([20.0, 100.0, 500.0])
+
+# The reference: a thermostat and an HVAC system per zone
+clock = make_clock(900)
+T_out = Variable(name="T_out", value=T_outs[0])
+nodes = [clock, T_out]
+ref = []
+for i in range(num_zones):
+    T_sp_occ = Variable(name=f"T_sp_occ_{i}", value=-1)
+    T_room = Variable(name=f"T_room_{i}", value=T_rooms[0, i])
+    thermostat = SmartThermostat(clock=clock, T_sp_occ=T_sp_occ,
+                                 T_room_sensor=T_room,
+                                 name=f"thermostat_{i}")
+    thermostat.Kp.value = Kps[i]
+    hvac = HVACSystem(dt=clock.dt, m_dot=thermostat.m_dot,
+                      Q_h=thermostat.Q_h, Q_c=thermostat.Q_c,
+                      T_out=T_out, name=f"hvac_{i}")
+    nodes += [T_sp_occ, T_room, thermostat, hvac]
+    ref.append((T_sp_occ, T_room, thermostat, hvac))
+ref_sys = System(name="reference", nodes=nodes)
+
+# The fused model
+clock = make_clock(900)
+T_out2 = Variable(name="T_out", value=T_outs[0])
+T_sp_occ = Variable(name="T_sp_occ", value=np.full(num_zones, -1.0))
+T_room = Variable(name="T_room", value=T_rooms[0])
+fused = MultiZoneHVACSystem(clock=clock, num_zones=num_zones,
+                            T_sp_occ=T_sp_occ, T_room_sensor=T_room,
+                            T_out=T_out2, Kp=Kps, name="hvac")
+sys = System(name="fused",
+             nodes=[clock, T_out2, T_sp_occ, T_room, fused])
+assert len(sys.functions) == 3
+
+for n in range(num_steps):
+    T_out.value = T_outs[n]
+    T_out2.value = T_outs[n]
+    T_room.value = T_rooms[n].copy()
+    T_sp_occ.value = T_sp_occs[n].copy()
+    for i, (occ, room, _, _) in enumerate(ref):
+        room.value = T_rooms[n, i]
+        occ.value = T_sp_occs[n, i]
+    ref_sys.forward()
+    sys.forward()
+    for i, (_, _, thermostat, hvac) in enumerate(ref):
+        for name in ["T_sp", "error", "integral", "derivative", "u_ideal",
+                     "m_dot", "Q_h", "Q_c"]:
+            assert np.isclose(getattr(fused, name).value[i],
+                              getattr(thermostat, name).value), (n, i, name)
+        for name in ["measured_energy", "u_apply"]:
+            assert np.isclose(getattr(fused, name).value[i],
+                              getattr(hvac, name).value), (n, i, name)
+    ref_sys.transition()
+    sys.transition()
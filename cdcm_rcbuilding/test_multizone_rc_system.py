@@ -0,0 +1,173 @@
+"""Tests the sparse multizone RC model against coupled single zones.
+
+Date:
+    10/19/2026
+
+"""
+
+
+import os
+import numpy as np
+import pandas as pd
+
+from cdcm import *
+from rc_system import RCBuildingSystem
+from multizone_rc_system import MultiZoneRCSystem
+
+
+df = pd.DataFrame({
+    "Tout": 10.0 + 5.0 * np.sin(np.linspace(0, 6, 200)),
+    "Qsg": 100.0 * np.cos(np.linspace(0, 6, 200)) ** 2
+})
+
+# Two zones coupled through a wall with conductance G
+G = 150.0
+R_rc = np.array([0.006, 0.009])
+C_room = np.array([3.5e5, 5.0e5])
+
+
+def make_reference():
+    weather_sys = make_data_system(df, name="weather")
+    clock = make_clock(600)
+    Q_int = Variable(name="Q_int", value=150.0)
+    u = Variable(name="u", value=0.0)
+    T_cor = [Variable(name=f"T_cor{i}", value=23.0) for i in range(2)]
+    zones = []
+    for i in range(2):
+        rc = RCBuildingSystem(dt=clock.dt, weather_system=weather_sys,
+                              T_cor=T_cor[i], Q_int=Q_int, u=u,
+                              name=f"rc_{i}")
+        rc.R_rc.value = 1.0 / (1.0 / R_rc[i] + G)
+        rc.C_room.value = C_room[i]
+        rc.T_room.value = 23.0
+        rc.T_room._next_value = 23.0
+        zones.append(rc)
+
+    # The corridor temperature that zone i sees
+    couplings = []
+    for i, j in [(0, 1), (1, 0)]:
+        g_rc = Parameter(name=f"g_rc{i}", value=1.0 / R_rc[i])
+        f = make_function(T_cor[i])(
+            lambda T=zones[j].T_room, g_rc=g_rc:
+                (g_rc * 23.0 + G * T) / (g_rc + G)
+        )
+        f.name = f"g_T_cor{i}"
+        couplings += [g_rc, f]
+    sys = System(name="reference",
+                 nodes=[clock, weather_sys, Q_int, u] + T_cor + zones
+                 + couplings)
+    return sys, zones
+
+
+def make_multizone():
+    weather_sys = make_data_system(df, name="weather")
+    clock = make_clock(600)
+    Q_int = Variable(name="Q_int", value=150.0)
+    u = Variable(name="u", value=np.zeros(2))
+    T_cor = Variable(name="T_cor", value=23.0)
+    mz = MultiZoneRCSystem(
+        dt=clock.dt,
+        weather_system=weather_sys,
+        parameters={"R_rc": R_rc, "C_room": C_room},
+        conductances=np.array([[0.0, G], [G, 0.0]]),
+        T_cor=T_cor,
+        Q_int=Q_int,
+        u=u,
+        name="building"
+    )
+    sys = System(name="everything",
+                 nodes=[clock, weather_sys, Q_int, u, T_cor, mz])
+    return sys, mz
+
+
+ref_sys, zones = make_reference()
+mz_sys, mz = make_multizone()
+assert mz.A.value.shape == (6, 6)
+for _ in range(100):
+    ref_sys.forward()
+    mz_sys.forward()
+    for i in range(2):
+        assert np.isclose(mz.T.value[i, 2], zones[i].T_room.value)
+        assert np.isclose(mz.T.value[i, 0], zones[i].T_env.value)
+    ref_sys.transition()
+    mz_sys.transition()
+
+# The zone variables read the state
+assert mz.zone_1.T_room.value == mz.T.value[1, 2]
+assert mz.lookup("zone_0/T_env").value == mz.T.value[0, 0]
+assert not mz.zone_0.T_room.track
+
+# Functions of the zone variables are told when the states change
+T_diff = Variable(name="T_diff", value=0.0)
+
+
+@make_function(T_diff)
+def f_T_diff(T0=mz.zone_0.T_room, T1=mz.zone_1.T_room):
+    return T0 - T1
+
+
+for _ in range(3):
+    mz_sys.forward()
+    f_T_diff.forward()
+    assert np.isclose(T_diff.value, mz.T.value[0, 2] - mz.T.value[1, 2])
+    mz_sys.transition()
+
+# The model can be saved (the sparse matrices are not tracked)
+Ts = []
+with SimulationSaver("test_multizone_rc.h5", mz_sys, max_steps=5,
+                     overwrite=True) as saver:
+    for _ in range(5):
+        mz_sys.forward()
+        saver.save()
+        Ts.append(mz.T.value.copy())
+        mz_sys.transition()
+with SimulationResults("test_multizone_rc.h5") as res:
+    assert np.allclose(res["everything/building/T"][:], Ts)
+    assert "everything/building/A" not in res.paths
+os.remove("test_multizone_rc.h5")
+
+# Plain inputs are held by variables
+weather_sys = make_data_system(df, name="weather")
+clock = make_clock(600)
+plain = MultiZoneRCSystem(
+    dt=clock.dt,
+    weather_system=weather_sys,
+    parameters={"R_rc": R_rc, "C_room": C_room},
+    Q_int=150.0,
+    u=np.zeros(2),
+    name="plain"
+)
+assert plain.T_cor.value == 23.0
+assert plain.Q_int.value == 150.0
+plain_sys = System(name="plain_sys", nodes=[clock, weather_sys, plain])
+for _ in range(3):
+    plain_sys.forward()
+    plain_sys.transition()
+assert np.all(np.isfinite(plain.T.value))
+
+# A large campus: ring of zones
+N = 2000
+rng = np.random.default_rng(1)
+ring = np.arange(N)
+conductances = np.zeros((N, N))
+conductances[ring, (ring + 1) % N] = 50.0
+conductances[(ring + 1) % N, ring] = 50.0
+weather_sys = make_data_system(df, name="weather")
+clock = make_clock(600)
+campus = MultiZoneRCSystem(
+    dt=clock.dt,
+    weather_system=weather_sys,
+    parameters={"C_room": rng.uniform(2e5, 6e5, size=N)},
+    conductances=conductances,
+    T_cor=Variable(name="T_cor", value=23.0),
+    Q_int=Variable(name="Q_int", value=rng.uniform(0, 300, size=N)),
+    u=Variable(name="u", value=0.0),
+    name="campus"
+)
+sys = System(name="campus_sys", nodes=[clock, weather_sys, campus])
+assert campus.A.value.shape == (3 * N, 3 * N)
+for _ in range(10):
+    sys.forward()
+    sys.transition()
+assert campus.A.value.nnz <= 9 * N + 3 * 2 * N
+assert np.all(np.isfinite(campus.T.value))
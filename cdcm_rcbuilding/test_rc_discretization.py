@@ -0,0 +1,64 @@
+"""Tests the cached discretization of the 5R3C model.
+
+Date:
+    10/19/2026
+
+"""
+
+
+import numpy as np
+from scipy import signal
+
+from rc_discretization import *
+
+
+params = dict(
+    R_oe=0.0067,
+    R_er=0.0013,
+    R_rc=0.0061,
+    R_gr=0.0089,
+    R_ge=0.0245,
+    C_room=1.5e6,
+    C_env=1.1e7,
+    C_genv=3.2e6,
+    a_sol_env=0.9,
+    a_sol_room=0.1,
+    a_IHG=0.5
+)
+dt = 300.0
+
+# Compare with scipy.signal
+cA, cB = continuous_rc_matrices(**params)
+ss = signal.StateSpace(cA, cB, np.array([[0, 0, 1]]), np.zeros((1, 6)))
+ref = ss.to_discrete(dt=dt)
+A, B = discretize_rc(**params, dt=dt)
+assert np.allclose(A, ref.A)
+assert np.allclose(B, ref.B)
+
+# The result is cached and read-only
+A2, B2 = discretize_rc(**params, dt=dt)
+assert A2 is A and B2 is B
+assert not A.flags.writeable
+
+# Absent ground envelope: no NaNs and T_genv stays put
+for R_ge in [np.inf, 0.0]:
+    p = dict(params, C_genv=np.inf, R_gr=np.inf, R_ge=R_ge)
+    A, B = discretize_rc(**p, dt=dt)
+    assert np.all(np.isfinite(A)) and np.all(np.isfinite(B))
+    assert np.allclose(A[1], [0.0, 1.0, 0.0])
+    assert np.allclose(B[1], 0.0)
+    assert np.allclose(A[2, 1], 0.0)
+
+# Batch discretization
+N = 5
+rng = np.random.default_rng(0)
+batch = {k: np.full(N, v) for k, v in params.items()}
+batch["C_room"] = params["C_room"] * rng.uniform(0.5, 2.0, size=N)
+batch["C_genv"][0] = np.inf
+batch["R_gr"][0] = np.inf
+As, Bs = discretize_rc_batch(batch, dt)
+assert As.shape == (N, 3, 3) and Bs.shape == (N, 3, 6)
+for i in range(N):
+    A, B = discretize_rc(**{k: v[i] for k, v in batch.items()}, dt=dt)
+    assert np.allclose(As[i], A)
+    assert np.allclose(Bs[i], B)
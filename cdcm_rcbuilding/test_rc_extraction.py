@@ -0,0 +1,78 @@
+"""Tests the vectorized extraction of the RC parameters against
+`make_rc_of_cdcm()` on a synthetic building.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from types import SimpleNamespace as NS
+import numpy as np
+
+from rc_system import make_rc_of_cdcm
+from rc_extraction import extract_rc_parameters
+
+
+def q(value):
+    return NS(value=value)
+
+
+def make_layer(rng, transparent=False):
+    return NS(
+        thickness=q(rng.uniform(0.01, 0.3)),
+        conductivity=q(rng.uniform(0.05, 2.0)),
+        density=q(rng.uniform(10, 2500)),
+        specific_heat=q(rng.uniform(500, 1500)),
+        solar_transmittance=q(0.8 if transparent else 0.0)
+    )
+
+
+rng = np.random.default_rng(2)
+# A few segment types shared by all edges
+segment_types = [
+    NS(layers=[make_layer(rng) for _ in range(rng.integers(1, 4))])
+    for _ in range(4)
+] + [NS(layers=[make_layer(rng, transparent=True)])]
+
+
+def make_zone(rng):
+    x, y, z = rng.uniform(3, 10, size=3)
+    sides = [(x, z), (y, z), (x, z), (y, z), (x, y), (x, y)]
+    edges = []
+    for lx, ly in sides:
+        num_segments = rng.integers(1, 3)
+        ratios = rng.dirichlet(np.ones(num_segments))
+        edges.append(NS(
+            lx=q(lx),
+            ly=q(ly),
+            segments=[
+                NS(relative_area=q(a),
+                   segment=segment_types[rng.integers(len(segment_types))])
+                for a in ratios
+            ]
+        ))
+    return NS(edges=edges)
+
+
+num_zones = 200
+zones = [make_zone(rng) for _ in range(num_zones)]
+neighbor = rng.integers(0, 2, size=(num_zones, 6)) * rng.integers(
+    1, num_zones, size=(num_zones, 6)
+)
+# Make sure that all the corner cases are there
+neighbor[0] = 0
+neighbor[1] = 1
+neighbor[2, :5] = 1
+neighbor[2, 5] = 0
+building = NS(zones=zones, neighbor=neighbor.tolist())
+
+table = extract_rc_parameters(building)
+assert len(table) == num_zones
+
+names = ["C_room", "C_env", "C_genv", "R_rc", "R_oe", "R_er", "R_gr", "R_ge"]
+for i in range(num_zones):
+    ref = NS(**{k: q(None) for k in names})
+    make_rc_of_cdcm(zones[i], list(neighbor[i]), ref)
+    for k in names:
+        assert np.isclose(table[k][i], getattr(ref, k).value), (i, k)
@@ -0,0 +1,54 @@
+"""Tests skipping steps of the RC model in closed form.
+
+Date:
+    10/19/2026
+
+"""
+
+
+import numpy as np
+import pandas as pd
+
+from cdcm import *
+from rc_system import RCBuildingSystem
+
+
+# The inputs do not change, so k steps can be done at once
+df = pd.DataFrame({
+    "Tout": np.full(100, 5.0),
+    "Qsg": np.full(100, 80.0)
+})
+
+
+def make_system(name):
+    weather_sys = make_data_system(df, name="weather")
+    clock = make_clock(600)
+    Q_int = Variable(name="Q_int", value=150.0)
+    T_cor = Variable(name="T_cor", value=21.0)
+    u = Variable(name="u", value=500.0)
+    rc = RCBuildingSystem(dt=clock.dt, weather_system=weather_sys,
+                          T_cor=T_cor, Q_int=Q_int, u=u, name="rc")
+    sys = System(name=name,
+                 nodes=[clock, weather_sys, Q_int, T_cor, u, rc])
+    return sys, rc
+
+
+slow, slow_rc = make_system("slow")
+fast, fast_rc = make_system("fast")
+assert can_fast_forward(fast)
+for k in [1, 17, 40]:
+    for _ in range(k):
+        slow.forward()
+        slow.transition()
+    fast_forward(fast, k)
+    for state in ["T_env", "T_genv", "T_room"]:
+        assert np.isclose(getattr(fast_rc, state).value,
+                          getattr(slow_rc, state).value), (k, state)
+    assert np.isclose(fast.clock.t.value, slow.clock.t.value)
+    assert fast.weather.row.value == slow.weather.row.value
+
+# Stepping still works after fast forwarding
+for s in [slow, fast]:
+    s.forward()
+    s.transition()
+assert np.isclose(fast_rc.T_room.value, slow_rc.T_room.value)
@@ -11,8 +11,8 @@ Date:
 
 import yaml
 import numpy.typing as npt
-from typing import Dict, Any
-from cdcm import SimulationSaver
+from typing import Dict, Any, Union
+from cdcm import SimulationSaver, SimulationResults
 
 
 def parse_yaml(filepath: str, **kwargs) -> Dict[str, Dict[str, Any]]:
@@ -25,15 +25,16 @@ def parse_yaml(filepath: str, **kwargs) -> Dict[str, Dict[str, Any]]:
 
 
 def extract_data_from_saver(
-    saver: SimulationSaver, 
+    saver: Union[SimulationSaver, SimulationResults], 
     namedfilehandles: Dict[str, str]
     ) -> Dict[str, npt.NDArray]:
     """Utility to extract data from a `cdcm.SimulationSaver` instance
     
     Arguments
     ---------
-    saver               :   cdcm.SimulationSaver
-        A simulation saver object
+    saver               :   cdcm.SimulationSaver or cdcm.SimulationResults
+        A simulation saver object (HDF5 only) or the results of a saved
+        simulation
     namedfilehandles    :   Dict[str, str]
         Map of shorthand to data to their `filehandles` as in the saver object
 
@@ -46,7 +47,10 @@ def extract_data_from_saver(
     named_data = dict()
     for name, filehandle in namedfilehandles.items():
         try:
-            named_data[name] = saver.file_handler[filehandle][:]
+            if isinstance(saver, SimulationResults):
+                named_data[name] = saver[filehandle][:]
+            else:
+                named_data[name] = saver.file_handler[filehandle][:]
         except:
             msg = f"<< {filehandle} >> not found in saver object"
             raise RuntimeError(msg)
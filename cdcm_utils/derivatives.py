@@ -1,6 +1,16 @@
 """python file containing functions for setting derivatives
 in cdcm
 
+The derivative of a node y w.r.t. a node x is accumulated over the
+graph of the system in one topological pass. Only the Functions that
+are on a path from x to y are visited. In forward mode, the tangents
+dn/dx are pushed from x to y. In reverse mode, the adjoints dy/dn are
+pulled from y to x. Each Function contributes its edge Jacobians
+(`jax.jacfwd`) or, optionally, its `jax.jvp`/`jax.vjp`. The edge
+Jacobians are jitted and cached by function (see `edge_jacobian()`).
+No nodes are added to the system. A `Derivative` is evaluated when its value is
+read.
+
 Author:
     Sreehari Manikkan
 Date:
@@ -9,432 +19,403 @@ Date:
 __all__ = ["set_derivative",
            "update_loss_grad",
            "get_derivative_update_seq",
+           "Derivative",
+           "make_derivative_graph",
+           "EdgeJacobian",
+           "edge_jacobian",
            ]
 
 from cdcm import *
+import jax
 from jax import jacfwd
 import jax.numpy as jnp
 import networkx as nx
-import math
+import numpy as np
+import weakref
+
+
+# The modes of accumulation
+DERIVATIVE_MODES = ("forward", "reverse")
+
 
+def _next(state):
+    """The node of the graph for the next value of a State."""
+    return ("next", state)
 
-def get_sys_nodes_for_grad(sys, sys_nodes_for_grad):
+
+def make_derivative_graph(sys):
     """
-    part of code is adapted from
-    cdcm_execution repo System class
-    defnition
+    Get the graph of the dependencies of the nodes of a system.
+
+    There is an edge from each node to its children. The children of a
+    Transition are the next values of its States (`("next", state)`).
+    So, the graph is acyclic.
+
+    Arguments:
+        sys: CDCM system.
+    Return:
+        g: A networkx DiGraph.
     """
+    g = nx.DiGraph()
+    for n in sys.nodes:
+        g.add_node(n)
+        for c in n.children:
+            g.add_edge(n, _next(c) if isinstance(n, Transition) else c)
+    return g
 
-    for node in sys.direct_nodes:
-        if node not in sys_nodes_for_grad:
-            if isinstance(node, System):
-                sys_nodes_for_grad.update(
-                    get_sys_nodes_for_grad(node, sys_nodes_for_grad)
-                )
-            else:
-                sys_nodes_for_grad.add(node)
-    return sys_nodes_for_grad
+
+def _key(f, c):
+    """The key of the value that `f` writes on its child `c`."""
+    return ("next", id(c)) if isinstance(f, Transition) else id(c)
 
 
-def update_sys_dag_for_grad(sys):
-    """part of code is adapted from
-    cdcm_execution repo System class
-    defnition
+class EdgeJacobian(object):
     """
+    The jitted `jax.jacfwd` of a function w.r.t. some of its arguments.
 
-    sys.sys_dag_for_grad = nx.DiGraph()
-    g = sys.sys_dag_for_grad
-    for n in sys.sys_nodes_for_grad:
-        g.add_node(n)
-        if isinstance(n, State):
-            for c in n.children:
-                if n in c.children:
-                    continue
-                g.add_edge(n, c)
-        else:
-            for c in n.children:
-                g.add_edge(n, c)
+    The result is a tuple with an item per output of the function. Each
+    item is a tuple with the Jacobian w.r.t. each argument of `argnums`.
+    `jax.jit` compiles it once per shapes and dtypes of the arguments.
+    If the function cannot be jitted (e.g., it branches on the values
+    of its arguments), the Jacobian is evaluated without `jax.jit`.
+
+    Arguments:
+        func: The function.
+        argnums: A tuple with the positions of the arguments.
+        jit: Whether to use `jax.jit`.
+    """
+
+    def __init__(self, func, argnums, jit=True):
+        self.func = func
+        self.argnums = tuple(argnums)
+        self._jac = jacfwd(
+            lambda *args: _outputs(func(*args)), argnums=self.argnums
+        )
+        self._jitted = jax.jit(self._jac) if jit else None
+
+    def __call__(self, *args):
+        if self._jitted is not None:
+            try:
+                return self._jitted(*args)
+            except (jax.errors.ConcretizationTypeError,
+                    jax.errors.TracerArrayConversionError,
+                    jax.errors.TracerIntegerConversionError,
+                    TypeError):
+                # Not traceable with jit. Do not try again.
+                self._jitted = None
+        return self._jac(*args)
+
+
+# The edge Jacobians by function and by (argnums, jit)
+_EDGE_JACOBIANS = weakref.WeakKeyDictionary()
+
+
+def edge_jacobian(func, argnums, jit=True):
+    """
+    Get the `EdgeJacobian` of `func` w.r.t. the arguments `argnums`.
+
+    It is cached as long as `func` exists. So, it is traced and compiled
+    once for all the steps and all the Systems that use `func`.
+
+    Arguments:
+        func: The function.
+        argnums: An int or a tuple of ints.
+        jit: Whether to use `jax.jit`.
+    """
+    if isinstance(argnums, int):
+        argnums = (argnums,)
+    key = (tuple(argnums), jit)
+    try:
+        cache = _EDGE_JACOBIANS.setdefault(func, {})
+    except TypeError:
+        # func cannot be weakly referenced
+        return EdgeJacobian(func, argnums, jit)
+    if key not in cache:
+        cache[key] = EdgeJacobian(func, argnums, jit)
+    return cache[key]
 
 
 def edge_jac_fn(y_fn,x):
     posn = y_fn.parents.index(x)
+    jac = edge_jacobian(y_fn.func, posn)
     def wrap_fn(*args):
-        args=[*args]
-        f1 = lambda q1: y_fn.func(*args[:posn],q1,*args[posn+1:])
-        return jacfwd(f1)(args[posn])
+        res = tuple(J[0] for J in jac(*args))
+        return res[0] if len(res) == 1 else res
     return wrap_fn
 
 
-def get_edge_gradient(
-        x,
-        y_fn,
-        sys,
-        sys_nodes_for_grad,
-        grad_edge_name,
-    ):
-    """
-    get the gradient of edge going from x to y with the mapping given by
-    y_fn.
-    """
-    
-    # setting gradients along the edges of path
-    if grad_edge_name not in [i.name for i in sys_nodes_for_grad]:
-        with sys:
-            dydx_edge = Variable(
-                name=grad_edge_name,
-                value=0.,
-                units=None,
-            )
-            calc_dydx_edge = Function(
-                name=f"calc_{dydx_edge.name}",
-                func=edge_jac_fn(y_fn,x),
-                parents=y_fn.parents,
-                children=dydx_edge
-            )
-        sys_nodes_for_grad.add(dydx_edge)
-        sys_nodes_for_grad.add(calc_dydx_edge)
-    else:
-        dydx_edge = [
-            n for n in sys_nodes_for_grad if n.name == grad_edge_name
-        ][0]
-    return dydx_edge
+def _outputs(result):
+    """The outputs of a function as a tuple (like `Function`)."""
+    return result if isinstance(result, tuple) else (result,)
 
 
-def get_simple_path_gradients(
-        path,
-        sys_nodes_for_grad,
-        sys,
-    ):
-    grad_path_edges = []
-    # setting the gradient along the path
-    for idx in range(len(path)-2,-1,-2):
-        dydx_edge = get_edge_gradient(
-            x=path[idx-1],
-            y_fn=path[idx],
-            sys=sys,
-            sys_nodes_for_grad=sys_nodes_for_grad,
-            grad_edge_name=f"pd{path[idx+1].absname}d{path[idx-1].absname}",
-        )
-        grad_path_edges.append(dydx_edge)    
-    return grad_path_edges
+def _as_float(value):
+    """Get a value as a JAX array with a floating point type."""
+    value = jnp.asarray(value)
+    if not jnp.issubdtype(value.dtype, jnp.inexact):
+        value = value.astype(jnp.result_type(float))
+    return value
 
 
-def get_dir_indir_path_gradients(
-        dir_path,
-        indir_path,
-        sys_nodes_for_grad,
-        sys,
-    ):
-    grad_dir_path_edges = []
-    grad_indir_path_edges = []
-    for idx in range(len(dir_path)-2,-1,-2):
-        dydx_edge = get_edge_gradient(
-            x=dir_path[idx-1],
-            y_fn=dir_path[idx],
-            sys=sys,
-            sys_nodes_for_grad=sys_nodes_for_grad,
-            grad_edge_name=f"pd{dir_path[idx+1].name}d{dir_path[idx-1].name}",
-        )
-        grad_dir_path_edges.append(dydx_edge)
-
-    for idx in range(len(indir_path)-2,-1,-2):
-        grad_edge_name=f"pd{indir_path[idx+1].name}d{indir_path[idx-1].name}"
-        dydx_edge = get_edge_gradient(
-            x=indir_path[idx-1],
-            y_fn=indir_path[idx],
-            sys=sys,
-            sys_nodes_for_grad=sys_nodes_for_grad,
-            grad_edge_name=grad_edge_name,
-        )
-        grad_indir_path_edges.append(dydx_edge)
-    return grad_dir_path_edges, grad_indir_path_edges
-
-
-def edi_is_oned(edi,edj):
-    if len(edj.shape)==1:
-        assert edi.shape[0]==edj.shape[0]
-        return edi@edj.T
-    else: #edj is 2d
-        if edj.shape[0] == edi.shape[0]:
-            return edj.T@edi
-        elif edj.shape[1] == edi.shape[0]:
-            return edj@edi
-        else:
-            raise Exception(
-                f"""Dimensions of edge Jacobian should match
-                for matrix multiplication. Detected edge
-                dimensions are {edi.shape} and {edj.shape}
-                """
-            )
+def _identity(shape):
+    """Get the identity as an array of shape `shape + shape`."""
+    size = int(np.prod(shape, dtype=int))
+    return jnp.eye(size).reshape(tuple(shape) + tuple(shape))
 
 
-def edge_jac_prod(ed1,ed2):
-    if not hasattr(ed1, "__len__"):
-        # ed1 is scalar
-        return ed1*ed2
-    elif not hasattr(ed2, "__len__"):
-        # ed2 is scalar, ed1 not
-        return ed1*ed2
-    elif len(ed1.shape)>2 or len(ed2.shape)>2:
-        raise Exception(
-            f"""Jacobian matrix of dimension upto 2 is allowed
-                for edge derivative. detected shapes are {ed1.shape},
-                {ed2.shape}"""
-        )
-    elif len(ed1.shape)==0:
-        return ed1*ed2
-    elif len(ed2.shape)==0:
-        return ed1*ed2
-    elif len(ed1.shape)==1:
-        return edi_is_oned(ed1,ed2)
-    elif len(ed2.shape)==1:
-        # ed1 should have len 2 here
-        return edi_is_oned(ed2,ed1)
-    else:
-        # both ed1 and ed 2 have len 2 now
-        if ed1.shape[1]==ed2.shape[0]:
-            return ed1@ed2
-        elif ed2.shape[1]==ed1.shape[0]:
-            return ed2@ed1
-        else:
-            raise Exception(
-                f"""Dimensions of edge Jacobian should match
-                for matrix multiplication. Detected edge
-                dimensions are {ed1.shape} and {ed2.shape}
-                """
-            )
+class DerivativeFunction(object):
+    """
+    The function that gives the value of a `Derivative`. It lets the
+    derivative of a Derivative be set (e.g., second derivatives).
+    """
 
+    def __init__(self, derivative):
+        self.derivative = derivative
+        self.name = f"calc_{derivative.name}"
+        # Kept, so that its edge Jacobians are cached
+        self.func = derivative.func
 
-def path_jac_fn(*args):
-    eds = [*args]
-    res = 1.
-    for edi in eds:
-        res = edge_jac_prod(res,edi)
-    return res
+    @property
+    def parents(self):
+        return self.derivative.parents
 
+    @property
+    def children(self):
+        return (self.derivative,)
 
-def get_simple_path_grad_nodes(
-        paths,
-        sys,
-        grad_paths,
-        grad_name,
-):  
-    
-    # getting gradients from simple paths
-    for path_no, path in enumerate(paths):
-        grad_path_name = grad_name+f"{path_no}"
-        # grad_path_name does not guarantee uniqueness w.r.t 
-        # path. hence dydx_path are not added to the 
-        # sys_nodes_for_grad.
-        grad_path_edges = get_simple_path_gradients(
-                        path=path,
-                        sys_nodes_for_grad=sys.sys_nodes_for_grad,
-                        sys=sys,
-                    )
-            
-        if len(grad_path_edges) == 1:
-            dydx_path = grad_path_edges[0]
-        else:
-            with sys:
-                dydx_path = Variable(
-                    name=grad_path_name,
-                    value=0.,
-                    units=None,
-                    track=False
-                )
-                calc_dydx_path = Function(
-                    name=f"calc_{dydx_path.name}",
-                    func = path_jac_fn,
-                    parents=grad_path_edges,
-                    children=dydx_path
-                )
-                sys.sys_nodes_for_grad.add(dydx_path)
-                sys.sys_nodes_for_grad.add(calc_dydx_path)
-        
-        grad_paths.append(dydx_path)
-    
-    return grad_paths,path_no
 
+class Derivative(object):
+    """
+    The derivative of a node y w.r.t. a node x.
 
-def get_dir_indir_path_grad_nodes(
-        dir_paths,
-        indir_paths,
-        sys,
-        path_no,
-        grad_paths,
-        grad_name,
-):
-    # getting gradients from dir_indir paths
-    for idx, dp in enumerate(dir_paths):
-        grad_path_name = grad_name+f"{path_no+idx+1}"
-        grad_dir_path_edges, grad_indir_path_edges = (
-            get_dir_indir_path_gradients(
-                dir_path=dp,
-                indir_path=indir_paths[idx],
-                sys_nodes_for_grad=sys.sys_nodes_for_grad,
-                sys=sys,
+    The result has the shape `y.shape + x.shape` (like `jax.jacfwd`).
+    It is computed from the current values of the nodes every time
+    `value` is read.
+
+    Arguments:
+        sys: CDCM system that has the nodes between x and y.
+        y: CDCM node of type Variable or State, or a Derivative.
+        x: CDCM node of type Variable or Parameter or State.
+        name: The name of the derivative.
+        mode: "forward" pushes the tangents from x to y. "reverse" pulls
+              the adjoints from y to x. Forward is cheaper when x is
+              smaller than y.
+        use_jvp: If True, the Functions contribute with `jax.jvp` (or
+                 `jax.vjp`) instead of their edge Jacobians.
+        batch_edges: If True, the Jacobians w.r.t. all the arguments of
+                     a Function are computed by a single `jax.jacfwd`.
+        jit: Whether to jit the edge Jacobians (see `edge_jacobian()`).
+    """
+
+    def __init__(
+            self,
+            sys,
+            y,
+            x,
+            name: str = None,
+            mode: str = "forward",
+            use_jvp: bool = False,
+            batch_edges: bool = True,
+            jit: bool = True,
+    ):
+        if mode not in DERIVATIVE_MODES:
+            raise ValueError(f"mode must be one of {DERIVATIVE_MODES}")
+        if not isinstance(y, (Variable, State, Derivative)):
+            raise Exception("Derivative of Variable or State is set")
+        self.sys = sys
+        self.y = y
+        self.x = x
+        self.name = f"d{y.name}d{x.name}" if name is None else name
+        self.mode = mode
+        self.use_jvp = use_jvp
+        self.batch_edges = batch_edges
+        self.jit = jit
+        self.units = None
+        self._make_plan()
+
+    def _make_plan(self):
+        g = make_derivative_graph(self.sys)
+        g.add_node(self.x)
+        if isinstance(self.y, Derivative):
+            y_fn = DerivativeFunction(self.y)
+            for p in y_fn.parents:
+                g.add_edge(p, y_fn)
+            g.add_edge(y_fn, self.y)
+        # The derivative of a State is that of its next value
+        target = self.y
+        self._y_key = id(self.y)
+        if isinstance(self.y, State) and _next(self.y) in g:
+            target = _next(self.y)
+            self._y_key = ("next", id(self.y))
+        if target not in g or (
+                target is not self.x and not nx.has_path(g, self.x, target)):
+            raise Exception(
+                f"""no simple paths of dependency found
+                between nodes {self.x.name} and {self.y.name}"""
             )
+        on_path = (
+            (nx.descendants(g, self.x) | {self.x})
+            & (nx.ancestors(g, target) | {target})
         )
-        with sys:
-            dydx_dir_path = Variable(
-                name=grad_path_name+"dir",
-                value=0.,
-                units=None,
-                track=False
-            )
-            dydx_indir_path = Variable(
-                name=grad_path_name+"indir",
-                value=0.,
-                units=None,
-                track=False
+        sub = g.subgraph(on_path)
+        # The functions in topological order, with the parents that
+        # depend on x
+        self.plan = [
+            (
+                n,
+                [i for i, p in enumerate(n.parents) if p in on_path],
             )
-            calc_dydx_dir_path = Function(
-                name=f"calc_{dydx_dir_path.name}",
-                func = lambda *args: math.prod([*args]),
-                parents=grad_dir_path_edges,
-                children=dydx_dir_path
-            )
-            calc_dydx_indir_path = Function(
-                name=f"calc_{dydx_indir_path.name}",
-                func = rec_prod_func,
-                parents=grad_indir_path_edges,
-                children=dydx_indir_path
-            )
-            dydx_path = Variable(
-                name=grad_path_name,
-                value=0.,
-                units=None,
-                track=False,
-            )
-            calc_dydx_path = Function(
-                name=f"calc_{dydx_path.name}",
-                func = lambda *args: math.prod([*args]),
-                parents=[dydx_dir_path,dydx_indir_path],
-                children=dydx_path
+            for n in nx.topological_sort(sub)
+            if isinstance(n, (Function, DerivativeFunction))
+        ]
+        self.update_seq = [
+            f for f, _ in self.plan if isinstance(f, Function)
+        ]
+        # The nodes whose values are read
+        parents = [self.x]
+        for f, _ in self.plan:
+            for p in f.parents:
+                if not any(p is q for q in parents):
+                    parents.append(p)
+        self.parents = tuple(parents)
+        # The nodes that depend on x (they are differentiated)
+        self._depends_on_x = {id(self.x)} | {
+            id(f.parents[i]) for f, rel in self.plan for i in rel
+        }
+
+    @property
+    def value(self):
+        """The derivative at the current values of the nodes."""
+        return self.func(*(p.value for p in self.parents))
+
+    def func(self, *args):
+        """
+        Get the derivative from the values of `parents`.
+
+        It is a JAX function of its arguments. So, it can be
+        differentiated again.
+        """
+        values = {
+            id(p): _as_float(v) if id(p) in self._depends_on_x else v
+            for p, v in zip(self.parents, args)
+        }
+        if self.mode == "forward":
+            return self._forward(values)
+        return self._reverse(values)
+
+    def _args(self, f, values):
+        return [values[id(p)] for p in f.parents]
+
+    def _edge_jacobians(self, f, rel, args):
+        """Get the Jacobians of the outputs of `f` w.r.t. each argument
+        in `rel` (a list with a tuple per argument)."""
+        if self.batch_edges:
+            res = edge_jacobian(f.func, tuple(rel), self.jit)(*args)
+            return [tuple(J[k] for J in res) for k in range(len(rel))]
+        return [
+            tuple(J[0] for J in edge_jacobian(f.func, i, self.jit)(*args))
+            for i in rel
+        ]
+
+    def _forward(self, values):
+        x_shape = jnp.shape(values[id(self.x)])
+        tangents = {id(self.x): _identity(x_shape)}
+        for f, rel in self.plan:
+            args = self._args(f, values)
+            rel = [i for i in rel if id(f.parents[i]) in tangents]
+            if not rel:
+                continue
+            if self.use_jvp:
+                outs = self._jvp(f, args, rel, tangents, x_shape)
+            else:
+                outs = None
+                for i, jacs in zip(rel, self._edge_jacobians(f, rel, args)):
+                    terms = [
+                        jnp.tensordot(J, tangents[id(f.parents[i])],
+                                      axes=jnp.ndim(args[i]))
+                        for J in jacs
+                    ]
+                    outs = terms if outs is None else [
+                        a + b for a, b in zip(outs, terms)
+                    ]
+            for c, dc in zip(f.children, outs):
+                key = _key(f, c)
+                tangents[key] = tangents[key] + dc if key in tangents else dc
+        return tangents[self._y_key]
+
+    def _jvp(self, f, args, rel, tangents, x_shape):
+        """Push the tangents through `f` with `jax.jvp`."""
+        def g(*rel_args):
+            full = list(args)
+            for i, a in zip(rel, rel_args):
+                full[i] = a
+            return _outputs(f.func(*full))
+        size = int(np.prod(x_shape, dtype=int))
+        directions = [
+            jnp.moveaxis(
+                tangents[id(f.parents[i])].reshape(
+                    jnp.shape(args[i]) + (size,)
+                ),
+                -1, 0
             )
-        grad_paths.append(dydx_path)
-    return grad_paths
-
-
-class GradientPaths:
-     
-    def __init__(self,
-                 y,
-                 x, 
-                 sys_dag_for_grad,
-        ):
-        self.dir_paths = []
-        self.indir_paths = []
-        self.x, self.y = x, y
-        self.sys_dag_for_grad = sys_dag_for_grad
-        self.track_parents_set = set()
-        self.termination_set= set()
-
-        # simple paths from x to y. These are the paths of direct
-        # influence from x to y.
-        self.paths = [
-            i for i in nx.all_simple_paths(
-                                    self.sys_dag_for_grad,
-                                    self.x, 
-                                    self.y
-                                    )
+            for i in rel
         ]
-    
-    # no. of dir_paths and indir_paths are same 
-    # as a dir_path and indir_path form a path apart 
-    # from simple paths
-    def fetch_dir_indir_paths(self):
-        for path in self.paths:
-            for idx in range(len(path)-1,-2,-2):
-                p = path[idx]
-                self.update_dir_indir_paths(p=p)
-
-    def track_parents(self, p, p_indir_paths):
-        if p==self.x or p in self.track_parents_set: #if True stop track
-            return False
-        elif len(p_indir_paths)>0: # if True stop Track
-            self.track_parents_set.add(p)
-            return False
-        elif len(p.parents)>0:
-            self.track_parents_set.add(p)
-            return True
-        else:
-            self.track_parents_set.add(p)
-            return False
-
-    def update_dir_indir_paths(self,p):
-        p_indir_paths = [
-            i for i in nx.all_simple_paths(self.sys_dag_for_grad, p, self.x)
+        outs = jax.vmap(
+            lambda *ts: jax.jvp(g, tuple(args[i] for i in rel), ts)[1]
+        )(*directions)
+        return [
+            jnp.moveaxis(o, 0, -1).reshape(o.shape[1:] + x_shape)
+            for o in outs
         ]
-        if self.track_parents(
-            p=p,
-            p_indir_paths=p_indir_paths,
-        ):
-            p_fn = p.parents[0]
-            for p1 in p_fn.parents:
-                self.update_dir_indir_paths(p1)
-
-        else:
-            if p in self.termination_set:
-                pass
-            elif len(p_indir_paths)>0:
-                p_dir_paths = [
-                    i for i in nx.all_simple_paths(
-                    self.sys_dag_for_grad, p, self.y)
-                ]
-                for ind_pth in p_indir_paths:
-                    for d_pth in p_dir_paths:
-                        if self.x in d_pth:
-                            continue
-                        self.indir_paths.append(ind_pth)
-                        self.dir_paths.append(d_pth)
-                self.termination_set.add(p)
-
-
-def total_derv_func(*args):
-    args=[*args]
-
-    if not hasattr(args[0],"shape"):
-        # args[0] is scalar float/int object
-        res = 0.
-        for i in args:
-            if hasattr(i, "shape"):
-                assert len(i.shape)==0 or i.shape==(1,) or i.shape==(1,1)
-            res += i
-    elif len(args[0].shape)==0 or args[0].shape==(1,) or args[0].shape==(1,1):
-        res = jnp.zeros_like(args[0])
-        for i in args:
-            if hasattr(i, "shape"):
-                assert len(i.shape)==0 or i.shape==(1,) or i.shape==(1,1)
-            res += i
-    else:
-        res = jnp.zeros_like(args[0])
-        for i in args:
-            if not res.shape==i.shape:
-                raise Exception(f"""
-                path jacobians should have same shape. detected shapes 
-                {res.shape},{i.shape}
-                """)
-            res += i
-    return res
-
-
-def rec_prod_func(*args):
-    temp = [1/i for i in [*args]]
-    return math.prod(temp)
-
-
-def print_dag_edges(dag):
-    for i in dag.edges:
-        if isinstance(i[0],str):
-            if isinstance(i[1],str):
-                print(f"{i[0], i[1]}")
+
+    def _reverse(self, values):
+        y_shape = jnp.shape(self.y.value)
+        adjoints = {self._y_key: _identity(y_shape)}
+        for f, rel in reversed(self.plan):
+            if not any(_key(f, c) in adjoints for c in f.children):
+                continue
+            args = self._args(f, values)
+            if self.use_jvp:
+                terms = self._vjp(f, args, rel, adjoints, y_shape)
             else:
-                print(f"{i[0], i[1].name}")
-        elif isinstance(i[1],str):
-            print(f"{i[0].name, i[1]}")
-        else:
-            print(f"{i[0].name, i[1].name}")
+                terms = []
+                for i, jacs in zip(rel, self._edge_jacobians(f, rel, args)):
+                    term = None
+                    for c, J in zip(f.children, jacs):
+                        if _key(f, c) not in adjoints:
+                            continue
+                        t = jnp.tensordot(adjoints[_key(f, c)], J,
+                                          axes=jnp.ndim(J) - jnp.ndim(args[i]))
+                        term = t if term is None else term + t
+                    terms.append(term)
+            for i, t in zip(rel, terms):
+                if t is None:
+                    continue
+                p = f.parents[i]
+                adjoints[id(p)] = (
+                    adjoints[id(p)] + t if id(p) in adjoints else t
+                )
+        return adjoints[id(self.x)]
+
+    def _vjp(self, f, args, rel, adjoints, y_shape):
+        """Pull the adjoints through `f` with `jax.vjp`."""
+        def g(*rel_args):
+            full = list(args)
+            for i, a in zip(rel, rel_args):
+                full[i] = a
+            return _outputs(f.func(*full))
+        outs, pullback = jax.vjp(g, *(args[i] for i in rel))
+        size = int(np.prod(y_shape, dtype=int))
+        cotangents = tuple(
+            jnp.reshape(adjoints[_key(f, c)], (size,) + jnp.shape(o))
+            if _key(f, c) in adjoints
+            else jnp.zeros((size,) + jnp.shape(o), dtype=o.dtype)
+            for c, o in zip(f.children, outs)
+        )
+        terms = jax.vmap(pullback)(cotangents)
+        return [
+            t.reshape(y_shape + t.shape[1:]) for t in terms
+        ]
 
 
 def update_loss_grad(update_seq):
@@ -443,141 +424,55 @@ def update_loss_grad(update_seq):
 
 
 def get_derivative_update_seq(sys, x, grad_name):
-    update_sys_dag_for_grad(sys)
-    x_to_dydx_paths = [
-        i for i in nx.all_simple_paths(
-                            sys.sys_dag_for_grad,
-                            x, 
-                            getattr(sys,grad_name)
-                            )
-    ]
-    paths = x_to_dydx_paths
-    update_seq = []
-    update_seq.append(paths[0][-2])
-    max_path_len = max([len(p) for p in paths])
-    for i in range(max_path_len-2,-1, -2):
-        for idx, p in enumerate(paths):
-            if i<=len(p)-4:
-                if p[i] not in update_seq:
-                    update_seq.append(p[i])
-    update_seq.reverse()
-    return update_seq
-
-
-def set_derivative(sys,y,x,grad_name,derivative_update_seq=False):
+    """
+    Get the Functions to evaluate (in order) to update the nodes between
+    x and the derivative named `grad_name` after x changes.
+    """
+    return getattr(sys, grad_name).update_seq
+
+
+def set_derivative(
+        sys,
+        y,
+        x,
+        grad_name,
+        derivative_update_seq=False,
+        mode="forward",
+        use_jvp=False,
+        **kwargs,
+    ):
 
     """
-    sets the derivative of cdcm node y w.r.t cdcm node x as a<br>
-    cdcm Variable node to the System 'sys'. This Variable node is
-    accessible with the 'grad_name' argument passed.
+    sets the derivative of cdcm node y w.r.t cdcm node x as a
+    `Derivative` of the System 'sys'. The Derivative is accessible
+    with the 'grad_name' argument passed. It is not a node of the
+    system. Its value is computed when it is read.
     Arguments:
-        sys: CDCM system to which the gradient node should be added
-        y: CDCM node of type Variable or State
+        sys: CDCM system to which the gradient should be set
+        y: CDCM node of type Variable or State, or a Derivative (for
+           higher order derivatives).
         x: CDCM node of type Variable or Parameter or State.
-        grad_name: The name with which derivative node can be accessed
-                   from sys. Note the 'name' attribute of CDCM node
-                   representing the total derivative need not be necessary
-                   this one.
+        grad_name: The name with which derivative can be accessed
+                   from sys.
         derivative_update_seq: If True, this will return a list of CDCM Functions
-            to be evaluated in order to evaluate the value of derivative 
+            to be evaluated in order to evaluate the value of derivative
             of y w.r.t x for a given value of x. Useful for Calibration
             purposes.
+        mode: "forward" or "reverse" accumulation (see `Derivative`).
+        use_jvp: Use `jax.jvp`/`jax.vjp` instead of edge Jacobians.
+        Other keyword arguments (`batch_edges`, `jit`) are passed to
+        `Derivative`.
     Return: derivative_update_seq if update_seq==True else None.
 
     """
-
-    
-    if not hasattr(sys, 'sys_nodes_for_grad'):
-        sys.sys_nodes_for_grad = set()
-    sys.sys_nodes_for_grad =  get_sys_nodes_for_grad(
-        sys, sys.sys_nodes_for_grad
-    )
-    update_sys_dag_for_grad(sys)
-    
-    if hasattr(sys, grad_name):
-        if (
-            getattr(sys, grad_name).name in 
-            [i.name for i in sys.sys_nodes_for_grad]
-        ):
-            print(f"{grad_name} already set in the graph")
+    if isinstance(getattr(sys, grad_name, None), Derivative):
+        print(f"{grad_name} already set in the graph")
     else:
-        if not isinstance(y, (Variable, State)):
-            raise Exception("Derivative of Variable or State is set")
-        else: 
-            grad_paths_obj = GradientPaths(
-                y=y,
-                x=x, 
-                sys_dag_for_grad=sys.sys_dag_for_grad,
-            )
-            paths = grad_paths_obj.paths
-            grad_paths_obj.fetch_dir_indir_paths()
-            dir_paths = grad_paths_obj.dir_paths
-            indir_paths = grad_paths_obj.indir_paths
-
-            assert len(indir_paths)==len(dir_paths)
-            if len(paths)==0:
-                raise Exception(
-                    f"""no simple paths of dependency found
-                    between nodes {x.name} and {y.name}"""
-                    )
-            if len(paths)==1 and len(indir_paths)==0:
-                grad_path_edges = get_simple_path_gradients(
-                        path=paths[0],
-                        sys_nodes_for_grad=sys.sys_nodes_for_grad,
-                        sys=sys,
-                    )
-
-                if len(grad_path_edges) == 1:
-                    setattr(sys, grad_name, grad_path_edges[0])
-                else:
-                    with sys:
-                        dydx = Variable(
-                            name=grad_name,
-                            value=0.,
-                            units=None,
-                            track=True,
-                        )
-                        calc_dydx = Function(
-                            name=f"calc_{dydx.name}",
-                            func=path_jac_fn,
-                            parents=grad_path_edges,
-                            children=dydx,
-                        )
-                    sys.sys_nodes_for_grad.add(dydx)
-                    sys.sys_nodes_for_grad.add(calc_dydx)
-
-            else:
-                if len(indir_paths)>0:
-                    raise Exception(
-                        f"""
-                    Looks like {x.name} is an intermediate variable for
-                    setting the derivative of {y.name} w.r.t {x.name}.
-                    Derivative w.r.t intermediate variable is not currently
-                    supported."""
-                    )
-                else:
-                    grad_paths, path_no = (
-                    get_simple_path_grad_nodes(
-                                    paths=paths,
-                                    sys=sys,
-                                    grad_paths=[],
-                                    grad_name=grad_name,
-                    )
-                    )
-                    with sys:
-                        dydx = Variable(
-                            name=grad_name,
-                            value=0.,
-                            units=None,
-                            track=True,
-                        )
-                        calc_dydx = Function(
-                            name=f"calc_{dydx.name}",
-                            func=total_derv_func,
-                            parents=grad_paths,
-                            children=dydx,
-                        )
-                    sys.sys_nodes_for_grad.add(dydx)
-                    sys.sys_nodes_for_grad.add(calc_dydx)
-            if derivative_update_seq:
-                return get_derivative_update_seq(sys, x, grad_name)
\ No newline at end of file
+        setattr(
+            sys,
+            grad_name,
+            Derivative(sys, y, x, name=grad_name, mode=mode, use_jvp=use_jvp,
+                       **kwargs),
+        )
+    if derivative_update_seq:
+        return get_derivative_update_seq(sys, x, grad_name)
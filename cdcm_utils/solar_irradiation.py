@@ -1,5 +1,11 @@
 """Utility to query insolation data from NASA JPL's Horizons API
 
+The responses of the API are cached on disk by the hash of the request
+(see `EphemerisCache`). They are obtained by a fetcher: the API itself
+(`HorizonsFetcher`), a stand-in server, or a directory of files
+(`DirectoryFetcher`). Use `prewarm_ephemeris()` and `export_ephemeris()`
+to prepare a cache for machines without network access.
+
 Author:
     Sreehari Manikkan
 
@@ -9,16 +15,280 @@ Date:
 """
 
 
-__all__=["get_insolation_ephemeris"]
+__all__=[
+    "get_insolation_ephemeris",
+    "get_data_from_jplh",
+    "make_horizons_query",
+    "query_key",
+    "parse_horizons_response",
+    "EphemerisFetcher",
+    "HorizonsFetcher",
+    "DirectoryFetcher",
+    "EphemerisCache",
+    "EphemerisNotCached",
+    "get_ephemeris_cache",
+    "set_ephemeris_cache",
+    "prewarm_ephemeris",
+    "export_ephemeris",
+    "get_solar_irradiance_table",
+    "IrradianceTable",
+    "get_insolation_table",
+]
 
 
-import requests
+import os
 import re
+import json
 import math
+import shutil
+import hashlib
+import tempfile
 import pandas as pd
 import numpy as np
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+HORIZONS_URL = "https://ssd.jpl.nasa.gov/api/horizons.api"
+
+# The environment variable with the directory of the ephemeris cache
+EPHEMERIS_CACHE_ENV = "CDCM_EPHEMERIS_CACHE"
+
+# The directory of the ephemeris cache if the variable is not set
+EPHEMERIS_CACHE_DIR = os.path.join("~", ".cdcm_cache", "ephemeris")
+
+# Change this to invalidate all cached ephemerides
+EPHEMERIS_CACHE_VERSION = 1
+
+
+def make_horizons_query(
+        start_time: str,
+        end_time: str,
+        step_size: str,
+        quantities: str,
+        target: str,
+        observe_body: str,
+        phi=0.,
+        lamda=0.,
+        altitude=0.,
+) -> Dict[str, str]:
+    """Get the parameters of a JPL Horizons API request.
+
+    See `get_data_from_jplh()` for the arguments.
+
+    Return:
+        query: dict from the names of the parameters to their values.
+    """
+    query = {
+        "format": "text",
+        "OBJ_DATA": "'YES'",
+        "MAKE_EPHEM": "'YES'",
+        "EPHEM_TYPE": "'OBSERVER'",
+        "COMMAND": f"'{target}'",
+    }
+    if quantities == '19':
+        query["CENTER"] = f"'500@{observe_body}'"
+    elif quantities == '4':
+        query["CENTER"] = f"'coord@{observe_body}'"
+        query["COORD_TYPE"] = "'GEODETIC'"
+        query["SITE_COORD"] = f"'{lamda},{phi},{altitude}'"
+    else:
+        raise Exception("invalid quantity specified")
+    query.update({
+        "START_TIME": f"'{start_time}'",
+        "STOP_TIME": f"'{end_time}'",
+        "STEP_SIZE": f"'{step_size}'",
+        "QUANTITIES": f"'{quantities}'",
+    })
+    return query
+
+
+def parse_horizons_response(text: str) -> List[str]:
+    """Get the lines of the ephemeris in a JPL Horizons text response.
+
+    Return:
+        data: list with the line `$$SOE`, the lines of the ephemeris and
+              the line `$$EOE`.
+    """
+    # https://stackoverflow.com/questions/33312175/matching-any-character-including-newlines-in-a-python-regex-subexpression-not-g/33312193#33312193
+    # https://ideone.com/GZEQNf
+    data = re.findall(r"\$\$SOE(?s:.*?)\$\$EOE.*", text, re.M)
+    if not data:
+        raise ValueError("The response has no ephemeris.")
+    return re.split("\n", data[0])
 
 
+class EphemerisNotCached(LookupError):
+    """Raised when an offline cache does not have an ephemeris."""
+
+
+class EphemerisFetcher(ABC):
+    """Gets the text responses of JPL Horizons API requests.
+
+    Subclasses implement `fetch()`.
+    """
+
+    @abstractmethod
+    def fetch(self, query: Dict[str, str]) -> str:
+        """Get the text response to a request.
+
+        Arguments:
+            query: The parameters of the request (see
+                   `make_horizons_query()`).
+        """
+
+
+class HorizonsFetcher(EphemerisFetcher):
+    """Downloads the responses from the JPL Horizons API.
+
+    Arguments:
+        url: The URL of the API. Change it to use a stand-in server
+             that answers like JPL Horizons.
+        timeout: The timeout of a request in seconds.
+    """
+
+    def __init__(self, url: str = HORIZONS_URL, timeout: float = 60.):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self, query: Dict[str, str]) -> str:
+        import requests
+        url = self.url + "?" + "&".join(f"{k}={v}" for k, v in query.items())
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+
+def query_key(query: Dict[str, str]) -> str:
+    """Get the key of a request. It is the hash of its parameters."""
+    content = json.dumps(
+        {"version": EPHEMERIS_CACHE_VERSION, "query": query}, sort_keys=True
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+class DirectoryFetcher(EphemerisFetcher):
+    """Reads the responses from a directory of files named by the keys of
+    the requests (e.g., an ephemeris cache exported with
+    `export_ephemeris()`).
+
+    Arguments:
+        directory: The directory with the files `<key>.txt`.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, query: Dict[str, str]) -> str:
+        filename = os.path.join(self.directory, query_key(query) + ".txt")
+        if not os.path.exists(filename):
+            raise EphemerisNotCached(
+                f"{self.directory} has no ephemeris for {query}."
+            )
+        with open(filename) as fd:
+            return fd.read()
+
+
+def _write_atomically(filename: str, text: str) -> None:
+    """Write to a temporary file and then rename it to `filename`."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class EphemerisCache(object):
+    """A disk cache of JPL Horizons responses.
+
+    Each response is stored in `<key>.txt`, where the key is the hash of
+    the parameters of the request (see `query_key()`). The parameters
+    are stored in `<key>.json`. A missing response is obtained from the
+    fetcher and stored, unless the cache is offline.
+
+    Arguments:
+        directory: The directory of the cache. Default is the
+                   environment variable `CDCM_EPHEMERIS_CACHE`, or
+                   `~/.cdcm_cache/ephemeris`.
+        fetcher: Gets the missing responses. Default is a
+                 `HorizonsFetcher`.
+        offline: If True, a missing response raises
+                 `EphemerisNotCached` instead of being fetched.
+    """
+
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            fetcher: Optional[EphemerisFetcher] = None,
+            offline: bool = False,
+    ):
+        if directory is None:
+            directory = os.environ.get(
+                EPHEMERIS_CACHE_ENV,
+                os.path.expanduser(EPHEMERIS_CACHE_DIR)
+            )
+        self.directory = directory
+        self.fetcher = HorizonsFetcher() if fetcher is None else fetcher
+        self.offline = offline
+
+    def _filename(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def __contains__(self, query: Dict[str, str]) -> bool:
+        return os.path.exists(self._filename(query_key(query), ".txt"))
+
+    def keys(self) -> List[str]:
+        """Get the keys of the cached responses."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            f[:-4] for f in os.listdir(self.directory) if f.endswith(".txt")
+        )
+
+    def put(self, query: Dict[str, str], text: str) -> None:
+        """Store the response to a request."""
+        # Do not cache errors
+        parse_horizons_response(text)
+        os.makedirs(self.directory, exist_ok=True)
+        key = query_key(query)
+        _write_atomically(self._filename(key, ".json"), json.dumps(query))
+        _write_atomically(self._filename(key, ".txt"), text)
+
+    def get(self, query: Dict[str, str]) -> str:
+        """Get the response to a request from the cache or the fetcher."""
+        filename = self._filename(query_key(query), ".txt")
+        if os.path.exists(filename):
+            with open(filename) as fd:
+                return fd.read()
+        if self.offline:
+            raise EphemerisNotCached(
+                f"{self.directory} has no ephemeris for {query}."
+            )
+        text = self.fetcher.fetch(query)
+        self.put(query, text)
+        return text
+
+
+_ephemeris_cache = None
+
+
+def get_ephemeris_cache() -> EphemerisCache:
+    """Get the cache used when no cache is given (see
+    `set_ephemeris_cache()`)."""
+    global _ephemeris_cache
+    if _ephemeris_cache is None:
+        _ephemeris_cache = EphemerisCache()
+    return _ephemeris_cache
+
+
+def set_ephemeris_cache(cache: Optional[EphemerisCache]) -> None:
+    """Set the cache used when no cache is given. None restores the
+    default cache."""
+    global _ephemeris_cache
+    _ephemeris_cache = cache
 
 
 def get_data_from_jplh(
@@ -31,7 +301,7 @@ def get_data_from_jplh(
         phi=0.,
         lamda=0.,
         altitude=0.,
-    
+        cache: Optional[EphemerisCache] = None,
 ):     
     """Arguments:
         start_time: A string containing the start time in the format
@@ -49,25 +319,106 @@ def get_data_from_jplh(
         (Refer below link for more details on above arguments:
         https://ssd.jpl.nasa.gov/horizons/manual.html#intro
         )
+        cache: The `EphemerisCache` of the responses. Default is
+               `get_ephemeris_cache()`.
 
         Return:
          data: list containing the data as string elements.
     """
-    url = "https://ssd.jpl.nasa.gov/api/horizons.api"
-    url += "?format=text&OBJ_DATA='YES'&MAKE_EPHEM='YES'&EPHEM_TYPE='OBSERVER'"
-    if quantities == '19':
-        url += f"&COMMAND='{target}'&CENTER='500@{observe_body}'&START_TIME='{start_time}'&STOP_TIME='{end_time}'&STEP_SIZE='{step_size}'&QUANTITIES='{quantities}'"
-    elif quantities == '4':
-        url += f"&COMMAND='{target}'&CENTER='coord@{observe_body}'&START_TIME='{start_time}'&COORD_TYPE='GEODETIC'&SITE_COORD='{lamda},{phi},{altitude}'&STOP_TIME='{end_time}'&STEP_SIZE='{step_size}'&QUANTITIES='{quantities}'"
-    else:
-        raise Exception("invalid quantity specified")
-    response = requests.get(url)
-    result = response.text
-    # https://stackoverflow.com/questions/33312175/matching-any-character-including-newlines-in-a-python-regex-subexpression-not-g/33312193#33312193
-    # https://ideone.com/GZEQNf
-    data = re.findall(r"\$\$SOE(?s:.*?)\$\$EOE.*", result, re.M)
-    data = re.split("\n", data[0])
-    return data
+    query = make_horizons_query(
+        start_time, end_time, step_size, quantities, target, observe_body,
+        phi=phi, lamda=lamda, altitude=altitude
+    )
+    if cache is None:
+        cache = get_ephemeris_cache()
+    return parse_horizons_response(cache.get(query))
+
+
+def _insolation_queries(
+        start_time: str,
+        end_time: str,
+        step_size: str,
+        phi,
+        lamda,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Get the requests of `get_insolation_ephemeris()`."""
+    return (
+        # Moon-Sun distance and its rate
+        make_horizons_query(
+            start_time, end_time, step_size, quantities='19',
+            target='301', observe_body='10'
+        ),
+        # Solar azimuth and elevation(90-zenith angle)
+        make_horizons_query(
+            start_time, end_time, step_size, quantities='4',
+            target='10', observe_body='301', phi=phi, lamda=lamda
+        ),
+    )
+
+
+def prewarm_ephemeris(
+        start_time: str,
+        end_time: str,
+        step_size: str,
+        locations: Iterable[Tuple[float, float]],
+        cache: Optional[EphemerisCache] = None,
+) -> List[str]:
+    """Fetch the ephemerides of `get_insolation_ephemeris()` into a cache.
+
+    Run it where the network is available. Then, copy the cache with
+    `export_ephemeris()`.
+
+    Arguments:
+        start_time, end_time, step_size: The time window (see
+                                         `get_insolation_ephemeris()`).
+        locations: The pairs (phi, lamda) of latitudes and longitudes.
+        cache: The cache. Default is `get_ephemeris_cache()`.
+
+    Return:
+        keys: The keys of the cached responses.
+    """
+    if cache is None:
+        cache = get_ephemeris_cache()
+    keys = []
+    for phi, lamda in locations:
+        for query in _insolation_queries(
+                start_time, end_time, step_size, phi, lamda):
+            key = query_key(query)
+            if key not in keys:
+                cache.get(query)
+                keys.append(key)
+    return keys
+
+
+def export_ephemeris(
+        destination: str,
+        cache: Optional[EphemerisCache] = None,
+        keys: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Copy cached ephemerides to a directory.
+
+    The directory can be used as the directory of an `EphemerisCache`,
+    or read with a `DirectoryFetcher`.
+
+    Arguments:
+        destination: The directory.
+        cache: The cache. Default is `get_ephemeris_cache()`.
+        keys: The keys of the responses. Default is all.
+
+    Return:
+        keys: The keys of the copied responses.
+    """
+    if cache is None:
+        cache = get_ephemeris_cache()
+    if keys is None:
+        keys = cache.keys()
+    os.makedirs(destination, exist_ok=True)
+    for key in keys:
+        for extension in (".json", ".txt"):
+            filename = cache._filename(key, extension)
+            if os.path.exists(filename):
+                shutil.copy2(filename, destination)
+    return list(keys)
 
 
 def to_float(df, columns):
@@ -132,10 +483,12 @@ def get_insolation_ephemeris(
     lamda,
     alpha=0.,
     beta=0.,
+    cache=None,
 ):
     """
     Get the ephemeris data as a pandas framework. The ephemeris is
-    downloaded using the API provided by JPL Horizon.
+    downloaded using the API provided by JPL Horizon and cached on disk
+    (see `EphemerisCache`).
     More info at: https://ssd.jpl.nasa.gov/horizons/
 
     Arguments:
@@ -152,6 +505,7 @@ def get_insolation_ephemeris(
         alpha - Angle between surface and the horizon. Its a float.
                 Unit is degrees.
         beta - surface azimuth angle. Its a float. Unit is degrees.
+        cache - The `EphemerisCache`. Default is `get_ephemeris_cache()`.
         
     Return:
         df: A pandas dataframe with following columns:
@@ -178,7 +532,8 @@ def get_insolation_ephemeris(
             step_size,
             quantities='19', # code for Moon-Sun distance and its rate
             target='301', # Moon
-            observe_body='10' # Sun
+            observe_body='10', # Sun
+            cache=cache,
     )
     # Obtaining the solar azimuth and elevation(90-zenith angle)
     azi_elev_data = get_data_from_jplh(
@@ -190,9 +545,15 @@ def get_insolation_ephemeris(
             observe_body='301', # Moon
             phi=phi,
             lamda=lamda,
+            cache=cache,
     )
     
+    assert len(rm_data)==len(azi_elev_data)
     df = pd.DataFrame(
+        [
+            rm.split()[:-1] + azi_elev.split()[-2:]
+            for rm, azi_elev in zip(rm_data[1:-1], azi_elev_data[1:-1])
+        ],
         columns=[
             "Date",
             "Time",
@@ -201,11 +562,6 @@ def get_insolation_ephemeris(
             "Solar Elevation",
         ]
     )
-    assert len(rm_data)==len(azi_elev_data)
-    for i in range(1, len(rm_data) - 1):
-        rm_data[i] = rm_data[i].split()
-        azi_elev_data[i] = azi_elev_data[i].split()
-        df.loc[len(df)] = rm_data[i][:-1]+azi_elev_data[i][-2:]
 
     to_float(
         df, ["Distance","Solar Azimuth","Solar Elevation"]
@@ -221,3 +577,254 @@ def get_insolation_ephemeris(
         beta=beta,
     )
     return df
+
+
+def _solar_features(Rm, solar_azimuth, elevation):
+    """Get the terms of the solar irradiance that do not depend on the
+    orientation of the surface.
+
+    Return:
+        F: array (..., 3) such that the irradiance on a surface is
+           `F @ _orientation_weights(alpha, beta)`.
+    """
+    So = 1361. # W/m**2
+    Ro = 1. #au
+    tau = np.radians(solar_azimuth)
+    theta = np.radians(90 - np.asarray(elevation, dtype=np.float64))
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+    g = So*(Ro/np.asarray(Rm, dtype=np.float64))**2*(cos_theta>0)
+    return np.stack(
+        np.broadcast_arrays(
+            g*cos_theta,
+            g*sin_theta*np.cos(tau),
+            g*sin_theta*np.sin(tau),
+        ),
+        axis=-1,
+    )
+
+
+def _orientation_weights(alpha, beta):
+    """Get the coefficients of the features of `_solar_features()` for
+    each orientation.
+
+    Return:
+        W: array (3, number of orientations).
+    """
+    alpha = np.atleast_1d(np.asarray(alpha, dtype=np.float64))
+    beta = np.radians(np.atleast_1d(np.asarray(beta, dtype=np.float64)))
+    alpha, beta = np.broadcast_arrays(alpha, beta)
+    return np.stack([
+        np.cos(alpha),
+        np.sin(alpha)*np.cos(beta),
+        np.sin(alpha)*np.sin(beta),
+    ])
+
+
+def get_solar_irradiance_table(
+        Rm,
+        solar_azimuth,
+        elevation,
+        alpha=0.,
+        beta=0.,
+):
+    """
+    Get the solar irradiance on many surfaces at many times and sites.
+
+    It is the same as `get_solar_irradiance()` for every combination of
+    sun position and surface orientation. The irradiance is a linear
+    function of three terms of the sun position. So, all surfaces are
+    evaluated with one matrix product.
+
+    Arguments:
+        Rm - Distance between Sun and Moon in AU. An array that
+             broadcasts with `solar_azimuth`.
+        solar_azimuth - solar azimuth angles in degrees. An array of any
+                        shape, e.g., (times, sites).
+        elevation - elevation angles of sun in degrees. Same shape as
+                    `solar_azimuth`.
+        alpha - Angles between the surfaces and the horizon. Used as in
+                `get_solar_irradiance()` (i.e., in radians). A float or
+                a 1-D array.
+        beta - surface azimuth angles in degrees. A float or a 1-D array
+               that broadcasts with `alpha`.
+    Return:
+        Q - Solar Irradiance values (W/m^2). An array with the shape of
+            `solar_azimuth` and one more dimension for the orientations.
+    """
+    return _solar_features(Rm, solar_azimuth, elevation) @ \
+        _orientation_weights(alpha, beta)
+
+
+class IrradianceTable(object):
+    """
+    Solar irradiance precomputed at some times for many sites and
+    surface orientations. It is linearly interpolated in time.
+
+    Arguments:
+        times: The increasing times of the rows (T,). E.g., seconds
+               since the start of the ephemeris.
+        Q: The irradiance (W/m^2). An array (T, S, O) with a value per
+           time, site and orientation.
+        sites: The pairs (phi, lamda) of the sites (S, 2).
+        orientations: The pairs (alpha, beta) of the surfaces (O, 2).
+    """
+
+    def __init__(self, times, Q, sites=None, orientations=None):
+        times = np.asarray(times, dtype=np.float64)
+        Q = np.asarray(Q, dtype=np.float64)
+        assert Q.ndim == 3 and Q.shape[0] == times.shape[0], \
+            "Q must be an array (times, sites, orientations)."
+        assert times.shape[0] >= 2, "At least two times are needed."
+        assert np.all(np.diff(times) > 0), "The times must increase."
+        self.times = times
+        self.Q = Q
+        self.sites = sites
+        self.orientations = orientations
+        # The slopes of the intervals
+        self._dQ = np.diff(Q, axis=0) / np.diff(times)[:, None, None]
+
+    @property
+    def shape(self):
+        """The number of sites and orientations."""
+        return self.Q.shape[1:]
+
+    def __call__(self, t):
+        """
+        Get the irradiance at times `t`.
+
+        Times outside the table get the first or the last row.
+
+        Arguments:
+            t: A float or an array of times.
+        Return:
+            Q: array t.shape + (sites, orientations).
+        """
+        t = np.clip(np.asarray(t, dtype=np.float64),
+                    self.times[0], self.times[-1])
+        i = np.clip(
+            np.searchsorted(self.times, t, side="right") - 1,
+            0, self.times.shape[0] - 2
+        )
+        return self.Q[i] + (t - self.times[i])[..., None, None]*self._dQ[i]
+
+    def columns(self):
+        """The names `Q_<site>_<orientation>` of the flattened table."""
+        S, O = self.shape
+        return [f"Q_{s}_{o}" for s in range(S) for o in range(O)]
+
+    def make_data_system(self, clock=None, time_scale=1., **kwargs):
+        """
+        Get a `TimeDataSystem` with a column per site and orientation
+        (see `columns()`).
+
+        The table is resampled once on the time grid of the clock, so
+        the steps of the simulation only read rows.
+
+        Arguments:
+            clock: The clock of the simulation.
+            time_scale: Multiplies the times of the table to get the
+                        units of the clock (e.g., 1/3600 for hours).
+            Other keyword arguments are passed to `TimeDataSystem`.
+        """
+        from cdcm import TimeDataSystem
+        kwargs.setdefault("name", "irradiance")
+        columns = self.columns()
+        kwargs.setdefault("column_units", ["W/m^2"]*len(columns))
+        kwargs.setdefault(
+            "column_descriptions", ["Solar irradiation"]*len(columns)
+        )
+        return TimeDataSystem(
+            data=self.Q.reshape(self.Q.shape[0], -1),
+            times=self.times*time_scale,
+            columns=columns,
+            clock=clock,
+            **kwargs
+        )
+
+
+def _ephemeris_columns(lines, columns):
+    """Get columns of the ephemeris lines of `get_data_from_jplh()` as an
+    array (rows, len(columns))."""
+    return np.array(
+        [[float(line.split()[c]) for c in columns] for line in lines[1:-1]]
+    )
+
+
+def get_insolation_table(
+    start_time,
+    end_time,
+    step_size,
+    sites,
+    orientations=((0., 0.),),
+    cache=None,
+):
+    """
+    Get the solar irradiance on many surfaces at many sites on the Moon.
+
+    The ephemeris is obtained as in `get_insolation_ephemeris()`: one
+    request for the Moon-Sun distance and one request per site for the
+    solar azimuth and elevation.
+
+    Arguments:
+        start_time, end_time, step_size: The time window (see
+                                         `get_insolation_ephemeris()`).
+        sites: The pairs (phi, lamda) of latitudes and longitudes
+               (degrees).
+        orientations: The pairs (alpha, beta) of the surfaces (see
+                      `get_solar_irradiance_table()`).
+        cache: The `EphemerisCache`. Default is `get_ephemeris_cache()`.
+    Return:
+        table: An `IrradianceTable` with the times in seconds since the
+               first row.
+    """
+    # The values of the requests are kept as given (e.g., for the cache)
+    sites = [tuple(site) for site in sites]
+    orientations = np.atleast_2d(np.asarray(orientations, dtype=np.float64))
+    rm_data = get_data_from_jplh(
+            start_time,
+            end_time,
+            step_size,
+            quantities='19', # code for Moon-Sun distance and its rate
+            target='301', # Moon
+            observe_body='10', # Sun
+            cache=cache,
+    )
+    stamps = pd.to_datetime(
+        [" ".join(line.split()[:2]) for line in rm_data[1:-1]]
+    )
+    times = (stamps - stamps[0]).total_seconds().to_numpy()
+    Rm = _ephemeris_columns(rm_data, [-2])
+    azi_elev = np.stack(
+        [
+            _ephemeris_columns(
+                get_data_from_jplh(
+                    start_time,
+                    end_time,
+                    step_size,
+                    quantities='4', # code for solar azimuth and elevation
+                    target='10', # Sun
+                    observe_body='301', # Moon
+                    phi=phi,
+                    lamda=lamda,
+                    cache=cache,
+                ),
+                [-2, -1],
+            )
+            for phi, lamda in sites
+        ],
+        axis=1,
+    )
+    assert azi_elev.shape[0] == Rm.shape[0]
+    Q = get_solar_irradiance_table(
+        Rm=Rm,
+        solar_azimuth=azi_elev[..., 0],
+        elevation=azi_elev[..., 1],
+        alpha=orientations[:, 0],
+        beta=orientations[:, 1],
+    )
+    return IrradianceTable(
+        times, Q, sites=np.array(sites, dtype=np.float64),
+        orientations=orientations
+    )
+#~ovn!
\ No newline at end of file
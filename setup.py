@@ -33,5 +33,10 @@ setup(
     packages=find_packages(exclude=('docs','examples','tests', 'cdcm_mcvt', 'cdcm_rcbuilding')),
     python_requires=">=3.6",
     install_requires=requirements,
+    # Storage backends of SimulationSaver that are imported on use
+    extras_require={
+        'zarr': ['zarr'],
+        'parquet': ['pyarrow'],
+    },
 )
 
@@ -0,0 +1,97 @@
+"""Test the FastDataSystem class.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import pandas as pd
+
+
+num_rows, num_cols = 20, 300
+data = np.random.randn(num_rows, num_cols)
+columns = [f"c_{j}" for j in range(num_cols)]
+
+fast = FastDataSystem(
+    data=data,
+    columns=columns,
+    name="fast",
+    description="A wide data system."
+)
+slow = DataSystem(data=data, columns=columns, name="slow")
+
+# A function that reads two columns
+total = make_node("V:total:0.0")
+
+@make_function(total)
+def add(a=fast.c_3, b=fast.c_299):
+    return a + b
+
+sys = System(name="sys", nodes=[fast, slow, total, add])
+
+# The values are there before the first step
+assert fast.c_0.value == data[0, 0]
+assert isinstance(fast.row, DataCursor)
+assert fast.row.downstream == [add]
+for i in range(num_rows):
+    sys.forward()
+    assert fast.row.value == i
+    for j in [0, 3, 150, 299]:
+        assert getattr(fast, f"c_{j}").value == getattr(slow, f"c_{j}").value
+        assert getattr(fast, f"c_{j}").value == data[i, j]
+    assert np.isclose(total.value, data[i, 3] + data[i, 299])
+    sys.transition()
+
+# Seeking
+fast.row.seek(5)
+add.forward()
+assert np.isclose(total.value, data[5, 3] + data[5, 299])
+
+# One column and DataFrames
+y = np.random.randn(10)
+one = FastDataSystem(data=y, columns="omega", name="one",
+                     column_units="meters")
+assert one.omega.value == y[0]
+assert one.omega.units == "meters"
+df = pd.DataFrame({"a": np.arange(5.0), "b": np.arange(5.0) ** 2})
+ds = make_data_system(df, fast=True, name="df")
+ds.transition()
+ds.transition()
+assert ds.a.value == 2.0 and ds.b.value == 4.0
+
+# Functions attached after the first transition are told about moves
+late = FastDataSystem(data=np.arange(10.0).reshape(-1, 1), columns=("a",),
+                      name="late")
+late.forward()
+late.transition()
+y_late = Variable(name="y_late", value=0.0)
+
+
+@make_function(y_late)
+def f_late(a=late.a):
+    return 10.0 * a
+
+
+f_late.forward()
+assert y_late.value == 10.0
+late.transition()
+f_late.forward()
+assert y_late.value == 20.0
+# Functions detached from a column are forgotten
+late.a.remove_child(f_late)
+assert late.row.downstream == []
+
+# Saving
+import os
+with SimulationSaver("test_fast_data.h5", ds, max_steps=3,
+                     overwrite=True) as saver:
+    ds.row.seek(0)
+    for i in range(3):
+        saver.save()
+        ds.transition()
+with SimulationResults("test_fast_data.h5") as res:
+    assert np.all(res["df/b"][:] == [0.0, 1.0, 4.0])
+os.remove("test_fast_data.h5")
@@ -0,0 +1,92 @@
+"""Test skipping steps of linear time-invariant systems.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+
+
+def make_system(name):
+    with System(name=name) as sys:
+        clock = make_clock(0.5)
+        x = State(name="x", value=np.array([1.0, -2.0]))
+        y = State(name="y", value=3.0)
+        A = Parameter(name="A", value=np.array([[0.9, 0.05], [-0.1, 0.95]]))
+        B = Parameter(name="B", value=np.array([[0.1, 0.0], [0.0, 0.2]]))
+        u = Variable(name="u", value=np.array([1.0, 2.0]))
+        LinearTransition(name="step_x", states=x, A=A, B=B, inputs=(u,))
+        LinearTransition(name="step_y", states=y, A=0.5, B=1.0,
+                         inputs=(clock.dt,))
+    return sys
+
+
+# Stepping k times is the same as fast forwarding k steps
+slow = make_system("slow")
+fast = make_system("fast")
+assert can_fast_forward(fast)
+k = 37
+for _ in range(k):
+    slow.forward()
+    slow.transition()
+fast_forward(fast, k)
+assert np.allclose(fast.x.value, slow.x.value)
+assert np.isclose(fast.y.value, slow.y.value)
+assert isinstance(fast.y.value, float)
+assert np.isclose(fast.clock.t.value, slow.clock.t.value)
+assert np.isclose(fast.clock.t.value, k * 0.5)
+
+# Stepping still works after fast forwarding
+for s in [slow, fast]:
+    s.forward()
+    s.transition()
+assert np.allclose(fast.x.value, slow.x.value)
+
+# The powers are cached
+A = fast.A.value
+P1 = lti_powers(A, 10)
+P2 = lti_powers(A.copy(), 10)
+assert P1[0] is P2[0]
+assert np.allclose(P1[0], np.linalg.matrix_power(A, 10))
+assert np.allclose(P1[1], sum(np.linalg.matrix_power(A, i) for i in range(10)))
+
+# A state made of several scalar states
+T1 = State(name="T1", value=1.0)
+T2 = State(name="T2", value=0.0)
+rotate = LinearTransition(
+    name="rotate",
+    states=(T1, T2),
+    A=np.array([[0.0, -1.0], [1.0, 0.0]])
+)
+rot = System(name="rot", nodes=[T1, T2, rotate])
+fast_forward(rot, 4 * 100 + 1)
+assert np.isclose(T1.value, 0.0) and np.isclose(T2.value, 1.0)
+
+# Data systems skip rows
+data = np.arange(20.0).reshape(10, 2)
+with System(name="with_data") as sys:
+    clock = make_clock(1.0)
+    d1 = DataSystem(data=data, columns=["a", "b"], name="d1")
+    d2 = FastDataSystem(data=data, columns=["a", "b"], name="d2")
+fast_forward(sys, 3)
+sys.forward()
+assert d1.a.value == data[3, 0]
+assert d2.b.value == data[3, 1]
+
+# Transitions that do not declare how to skip steps are not allowed
+with System(name="nonlinear") as sys:
+    z = State(name="z", value=1.0)
+
+    @make_function(z)
+    def square(z=z):
+        return z ** 2
+
+assert not can_fast_forward(sys)
+try:
+    fast_forward(sys, 2)
+    assert False
+except ValueError:
+    pass
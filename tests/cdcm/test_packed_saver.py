@@ -0,0 +1,93 @@
+"""Test saving scalar nodes packed in `(time, column)` datasets.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import h5py
+import shutil
+import os
+
+
+num_zones = 20
+with System(name="building") as building:
+    clock = make_clock(60.0)
+    for i in range(num_zones):
+        with System(name=f"zone_{i}") as zone:
+            T = make_node(f"S:T:{20.0 + i}:degC", description="Temperature.")
+            occupied = make_node("V:occupied:0", description="Occupied.")
+            A = make_node("V:A", value=np.eye(2), description="A matrix.")
+            rate = make_node(f"P:rate:{0.001 * (i + 1)}:degC/second",
+                             track=False)
+
+            @make_function(T)
+            def f(T=T, rate=rate, dt=clock.dt):
+                return T + rate * dt
+
+num_steps = 50
+for pack in ["subsystem", "system"]:
+    for target in ["test_packed.h5", "test_packed.zarr",
+                   "test_packed.parquet", "test_packed.mmap"]:
+        clock.t.value = 0.0
+        for i in range(num_zones):
+            building.lookup(f"zone_{i}/T").value = 20.0 + i
+        with SimulationSaver(target, building, max_steps=num_steps,
+                             overwrite=True, buffer_size=16,
+                             pack=pack) as saver:
+            for k in range(num_steps):
+                building.forward()
+                saver.save()
+                building.transition()
+        with SimulationResults(target) as res:
+            # The packed datasets are hidden, their columns are not
+            assert not any("__packed_" in p for p in res.paths)
+            assert len(res.select("building/zone_*/T")) == num_zones
+            for i in [0, 7, 19]:
+                T = res[f"building/zone_{i}/T"]
+                assert T.shape == (num_steps,)
+                assert np.allclose(
+                    T[:],
+                    20.0 + i + 0.06 * (i + 1) * np.arange(num_steps),
+                    atol=1e-3
+                )
+                assert res.attrs(f"building/zone_{i}/T")["units"] == "degC"
+                assert np.all(res[f"building/zone_{i}/occupied"][:] == 0)
+                # Arrays are not packed
+                assert res[f"building/zone_{i}/A"].shape == (num_steps, 2, 2)
+            assert np.allclose(
+                res.to_pandas("building/zone_3/T")["building/zone_3/T"],
+                res["building/zone_3/T"][:]
+            )
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        else:
+            os.remove(target)
+
+# Check the layout of the HDF5 files
+with SimulationSaver("test_packed.h5", building, max_steps=10,
+                     overwrite=True, pack="system") as saver:
+    saver.save()
+with h5py.File("test_packed.h5", "r") as fd:
+    packed = fd["building/__packed_float32"]
+    assert packed.shape == (10, num_zones + 2)
+    assert list(packed.attrs["columns"])[:3] == ["building/clock/dt",
+                                                 "building/clock/t",
+                                                 "building/zone_0/T"]
+    assert fd["building/__packed_int32"].shape == (10, num_zones)
+    assert "T" not in fd["building/zone_0"]
+os.remove("test_packed.h5")
+
+# Save policies take precedence over packing
+with SimulationSaver("test_packed.h5", building, max_steps=10,
+                     overwrite=True, pack="subsystem",
+                     policies={"building/zone_0/T": EveryKSteps(2)}) as saver:
+    for k in range(10):
+        saver.save()
+with SimulationResults("test_packed.h5") as res:
+    assert res["building/zone_0/T"].shape == (5,)
+    assert res["building/zone_1/T"].shape == (10,)
+os.remove("test_packed.h5")
@@ -0,0 +1,70 @@
+"""Test the path index and the cached absolute names of nodes.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+
+
+with System(name="building") as building:
+    clock = make_clock(1.0)
+    for i in range(3):
+        with System(name=f"zone_{i}") as zone:
+            T_room = make_node("S:T_room:20.0:degC", description="Room temperature.")
+            T_env = make_node("S:T_env:18.0:degC", description="Envelope temperature.")
+    corridor = System(name="corridor")
+
+print(building.path_index.keys())
+
+assert building.lookup("zone_1/T_room") is building.zone_1.T_room
+assert building.lookup("building/zone_2/T_env") is building.zone_2.T_env
+assert building.lookup("clock/t") is clock.t
+assert building.lookup("zone_0") is building.zone_0
+
+try:
+    building.lookup("zone_5/T_room")
+    assert False
+except KeyError:
+    pass
+
+# Glob selection
+T_rooms = building.select("zone_*/T_room")
+assert len(T_rooms) == 3
+assert all(n.name == "T_room" for n in T_rooms)
+assert len(building.select("zone_1/*")) == 2
+assert building.select("T_room") == []
+
+# Cached absolute names follow ownership changes
+T_room = building.zone_0.T_room
+assert T_room.absname == "building/zone_0/T_room"
+with System(name="campus") as campus:
+    pass
+campus.add_node(building)
+assert T_room.absname == "campus/building/zone_0/T_room"
+building.zone_0.name = "zone_a"
+assert T_room.absname == "campus/building/zone_a/T_room"
+
+# The index follows renames
+assert campus.lookup("building/zone_a/T_room") is T_room
+assert building.lookup("zone_a/T_env") is building.zone_0.T_env
+try:
+    campus.lookup("building/zone_0/T_room")
+    assert False
+except KeyError:
+    pass
+assert len(campus.select("building/zone_*/T_room")) == 3
+T_room.name = "T_air"
+assert building.lookup("zone_a/T_air") is T_room
+assert building.select("zone_a/T_room") == []
+T_room.name = "T_room"
+
+# The index is updated when nodes are added
+assert campus.lookup("building/zone_1/T_env") is building.zone_1.T_env
+with building.corridor:
+    T_cor = make_node("V:T_cor:23.0:degC", description="Corridor temperature.")
+assert campus.lookup("building/corridor/T_cor") is T_cor
+assert T_cor.absname == "campus/building/corridor/T_cor"
+print(campus.select("*/*/T_*"))
@@ -0,0 +1,103 @@
+"""Test the save policies of the SimulationSaver.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import shutil
+import os
+
+
+clock = make_clock(0.1)
+x = make_node("S:x:0.0:meters", description="A ramp.")
+level = make_node("S:level:0", description="Changes every 10 steps.")
+fault = make_node("S:fault:0", description="A fault flag.")
+A = make_node("P:A", value=np.eye(3), description="A constant matrix.")
+
+@make_function(x, level, fault)
+def f(x=x, t=clock.t):
+    """The transition function."""
+    step = int(round(t / 0.1)) + 1
+    return x + 1.0, step // 10, int(step in (50, 53))
+
+plant = System(name="plant", nodes=[x, level, fault, A, f])
+sys = System(name="sys", nodes=[clock, plant])
+
+policies = {
+    "sys/plant/A": OnChange(),
+    "sys/plant/level": OnChange(),
+    "sys/plant/x": WindowStats(4),
+    "sys/clock/*": EveryKSteps(5, offset=1),
+}
+
+for filename in ["test_policies.h5", "test_policies.zarr",
+                 "test_policies.mmap"]:
+    with SimulationSaver(filename, sys, max_steps=None, overwrite=True,
+                         buffer_size=8, policies=policies) as saver:
+        clock.t.value = 0.0
+        x.value, level.value, fault.value = 0.0, 0, 0
+        for i in range(102):
+            sys.forward()
+            saver.save()
+            sys.transition()
+    with SimulationResults(filename) as res:
+        assert res.num_steps == 102
+        # The constant matrix is saved once
+        assert res["sys/plant/A"].shape == (1, 3, 3)
+        assert np.all(res.steps("sys/plant/A") == [0])
+        # The level is saved when it changes
+        assert np.all(res.steps("sys/plant/level") == np.arange(0, 102, 10))
+        assert np.all(res["sys/plant/level"][:] == np.arange(11))
+        # Windows of 4 steps (the last one has 2 steps)
+        assert np.all(res["sys/plant/x.min"][:] == np.arange(0, 102, 4))
+        assert np.all(res["sys/plant/x.max"][:-1] == np.arange(3, 102, 4))
+        assert res["sys/plant/x.max"][-1] == 101
+        assert np.allclose(res["sys/plant/x.mean"][:-1],
+                           np.arange(1.5, 100, 4))
+        assert np.all(res.steps("sys/plant/x.mean") == np.arange(0, 102, 4))
+        # Decimated clock
+        assert np.all(res.steps("sys/clock/t") == np.arange(1, 102, 5))
+        assert np.allclose(res["sys/clock/t"][:], 0.1 * np.arange(1, 102, 5))
+        # No policy
+        assert res["sys/plant/fault"].shape == (102,)
+        df = res.to_pandas()
+        assert "sys/plant/x.steps" not in df.columns
+        assert len(df) == 102
+        assert np.isnan(df["sys/plant/level"].iloc[1])
+        assert df["sys/plant/level"].iloc[20] == 2
+        ds = res.to_xarray("sys/plant/*")
+        assert ds["sys/plant/level"].dims == ("sys/plant/level_time",)
+    if os.path.isdir(filename):
+        shutil.rmtree(filename)
+    else:
+        os.remove(filename)
+
+# Windows around the steps at which the fault flag is set
+policies = {"sys/plant": TriggeredWindow(fault, before=2, after=3)}
+with SimulationSaver("test_policies.h5", sys, max_steps=200, overwrite=True,
+                     policies=policies) as saver:
+    clock.t.value = 0.0
+    x.value, level.value, fault.value = 0.0, 0, 0
+    for i in range(100):
+        sys.forward()
+        saver.save()
+        sys.transition()
+with SimulationResults("test_policies.h5") as res:
+    expected = np.arange(48, 57)
+    for name in ["x", "level", "fault", "A"]:
+        assert np.all(res.steps("sys/plant/" + name) == expected)
+    assert np.all(res["sys/plant/fault"][:] == np.isin(expected, [50, 53]))
+    assert res["sys/clock/t"].shape == (100,)
+os.remove("test_policies.h5")
+
+# Parquet files cannot hold datasets of different lengths
+try:
+    SimulationSaver("test_policies.parquet", sys, overwrite=True,
+                    policies={"sys/plant/A": OnChange()})
+    assert False
+except ValueError:
+    pass
@@ -0,0 +1,81 @@
+"""Test reading saved simulations with SimulationResults.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import shutil
+import os
+
+
+with System(name="sys") as sys:
+    clock = make_clock(60.0)
+    for i in range(2):
+        with System(name=f"zone_{i}") as zone:
+            T_room = make_node("S:T_room:20.0:degC", description="Room temperature.")
+            A = make_node("V:A", value=np.eye(2), description="A matrix.")
+            rate = make_node(f"P:rate:{0.001 * (i + 1)}:degC/second", track=False)
+
+            @make_function(T_room)
+            def f(T_room=T_room, rate=rate, dt=clock.dt):
+                return T_room + rate * dt
+
+num_steps = 300
+targets = [
+    "test_results.h5",
+    "test_results.zarr",
+    "test_results.parquet",
+    "test_results.mmap",
+]
+for target in targets:
+    clock.t.value = 0.0
+    sys.zone_0.T_room.value = 20.0
+    sys.zone_1.T_room.value = 20.0
+    # Fixed length datasets longer than the run
+    with SimulationSaver(target, sys, max_steps=1000, overwrite=True,
+                         buffer_size=50) as saver:
+        for i in range(num_steps):
+            sys.forward()
+            saver.save()
+            sys.transition()
+
+for target in targets:
+    with SimulationResults(target) as res:
+        print(target, res.paths)
+        assert res.num_steps == num_steps
+        T = res["sys/zone_1/T_room"]
+        assert T.shape == (num_steps,)
+        assert np.isclose(T[-1], 20.0 + 0.12 * (num_steps - 1), atol=1e-3)
+        assert np.allclose(T[[0, -1]], T[[0, num_steps - 1]])
+        for bad in ([0, num_steps + 3], [-num_steps - 1], num_steps):
+            try:
+                T[bad]
+                assert False, f"Step {bad} is out of range."
+            except IndexError:
+                pass
+        assert np.allclose(res["/sys/zone_0/A"][10:20], np.eye(2))
+        assert res.attrs("sys/zone_0/T_room")["units"] == "degC"
+        assert res.select("*/zone_*/T_room") == ["sys/zone_0/T_room", "sys/zone_1/T_room"]
+        df = res.to_pandas("*/zone_*/T_room")
+        assert df.index.name == "sys/clock/t"
+        assert df.shape == (num_steps, 2)
+        assert np.isclose(df.index[-1], 60.0 * (num_steps - 1))
+        df = res.to_pandas(["sys/zone_0/A"], time_slice=slice(0, 10))
+        assert list(df.columns) == ["sys/zone_0/A[0, 0]", "sys/zone_0/A[0, 1]",
+                                    "sys/zone_0/A[1, 0]", "sys/zone_0/A[1, 1]"]
+        ds = res.to_xarray("**/A")
+        assert ds["sys/zone_1/A"].dims == ("time", "sys/zone_1/A_dim_1", "sys/zone_1/A_dim_2")
+
+# Contiguous HDF5 datasets are memory-mapped
+with SimulationResults("test_results.h5") as res:
+    assert isinstance(res["sys/zone_0/T_room"].data, np.memmap)
+
+for target in targets:
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    else:
+        os.remove(target)
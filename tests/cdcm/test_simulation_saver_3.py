@@ -0,0 +1,72 @@
+"""Test the buffered and compressed SimulationSaver.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import h5py
+import os
+
+
+x = make_node("S:x:0.1:meters", description="The state of the system.")
+r = make_node("P:r:1.2:meters/second", description="The rate of change.")
+dt = make_node("P:dt:0.1:second", description="The timestep.")
+A = make_node("V:A", value=np.eye(3), description="A constant matrix.")
+y = make_node("V:y", value=np.zeros(3), units="meters", description="A vector.")
+
+@make_function(x)
+def f(x=x, r=r, dt=dt):
+    """The transition function."""
+    return x + r * dt
+
+@make_function(y)
+def g(x=x, A=A):
+    return A @ np.array([x, 2 * x, 3 * x])
+
+sys = System(
+    name="sys",
+    nodes=[x, r, dt, A, f, g, y],
+    description="An isolated system."
+)
+
+max_steps = 1000
+savers = [
+    SimulationSaver("test_3_plain.h5", sys, max_steps=max_steps, overwrite=True),
+    SimulationSaver("test_3_buffered.h5", sys, max_steps=max_steps, overwrite=True,
+                    buffer_size=64, chunks=256, compression="gzip",
+                    compression_opts=4, shuffle=True),
+    SimulationSaver("test_3_lzf.h5", sys, max_steps=max_steps, overwrite=True,
+                    buffer_size=100, compression="lzf"),
+]
+
+for i in range(max_steps - 10):
+    sys.forward()
+    for saver in savers:
+        saver.save()
+    sys.transition()
+
+# Not everything has been written yet
+assert savers[1]._stream.flushed < savers[1].count
+for saver in savers:
+    saver.flush()
+
+dset = savers[1].file_handler["/sys/y"]
+assert dset.chunks == (256, 3)
+assert dset.compression == "gzip"
+assert dset.shuffle
+assert savers[2].file_handler["/sys/A"].compression == "lzf"
+
+for path in ["/sys/x", "/sys/y", "/sys/A"]:
+    data = [saver.file_handler[path][:max_steps - 10] for saver in savers]
+    assert np.array_equal(data[0], data[1])
+    assert np.array_equal(data[0], data[2])
+print(savers[1].file_handler["/sys/x"][:10])
+
+for saver in savers:
+    filename = saver.file_handler.filename
+    saver.file_handler.close()
+    os.remove(filename)
@@ -0,0 +1,60 @@
+"""Test the SimulationSaver with resizable datasets.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import h5py
+import os
+
+
+clock = make_clock(0.1)
+x = make_node("S:x:0.0:meters", description="The state of the system.")
+r = make_node("P:r:1.2:meters/second", description="The rate of change.")
+
+@make_function(x)
+def f(x=x, r=r, dt=clock.dt):
+    """The transition function."""
+    return x + r * dt
+
+sys = System(
+    name="sys",
+    nodes=[clock, x, r, f],
+    description="A system that runs until x is large enough."
+)
+
+# We do not know how many steps we are going to need
+with SimulationSaver("test_4.h5", sys, max_steps=None, overwrite=True,
+                     buffer_size=100) as saver:
+    while x.value < 300.0:
+        sys.forward()
+        saver.save()
+        sys.transition()
+    num_steps = saver.count
+
+assert saver.closed
+saver.close()
+
+with h5py.File("test_4.h5", "r") as fd:
+    xs = fd["/sys/x"]
+    assert xs.shape == (num_steps,)
+    assert xs.maxshape == (None,)
+    assert fd.attrs["num_steps"] == num_steps
+    assert "start_time" in fd.attrs and "end_time" in fd.attrs
+    assert np.allclose(np.diff(xs[:]), 0.12, atol=1e-3)
+    print(num_steps, xs[-1])
+os.remove("test_4.h5")
+
+# Fixed size datasets are not trimmed
+sys2 = System(name="sys2", nodes=[make_node("V:y:1.0")])
+with SimulationSaver("test_4.h5", sys2, max_steps=50, overwrite=True) as saver:
+    for i in range(10):
+        saver.save()
+with h5py.File("test_4.h5", "r") as fd:
+    assert fd["/sys2/y"].shape == (50,)
+    assert fd.attrs["num_steps"] == 10
+os.remove("test_4.h5")
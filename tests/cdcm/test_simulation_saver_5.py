@@ -0,0 +1,66 @@
+"""Test the SimulationSaver with a background writer thread.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import h5py
+import os
+
+
+x = make_node("S:x:0.0:meters", description="The state of the system.")
+r = make_node("P:r:1.0:meters/second", description="The rate of change.")
+y = make_node("V:y", value=np.zeros(4), units="meters", description="A vector.")
+
+@make_function(x)
+def f(x=x, r=r):
+    """The transition function."""
+    return x + r
+
+@make_function(y)
+def g(x=x):
+    return x * np.arange(4)
+
+sys = System(name="sys", nodes=[x, r, y, f, g])
+
+num_steps = 5000
+with SimulationSaver("test_5.h5", sys, max_steps=None, overwrite=True,
+                     buffer_size=128, num_buffers=3, compression="gzip",
+                     asynchronous=True) as saver:
+    for i in range(num_steps):
+        sys.forward()
+        saver.save()
+        sys.transition()
+        if i == 1000:
+            # The data are readable after a flush
+            saver.flush()
+            assert saver.file_handler["/sys/x"][1000] == 1000.0
+
+with h5py.File("test_5.h5", "r") as fd:
+    xs = fd["/sys/x"][:]
+    ys = fd["/sys/y"][:]
+assert xs.shape == (num_steps,)
+assert np.array_equal(xs, np.arange(num_steps))
+assert np.array_equal(ys, np.arange(num_steps)[:, None] * np.arange(4))
+os.remove("test_5.h5")
+
+# Errors of the writer thread are raised in the simulation thread
+saver = SimulationSaver("test_5.h5", sys, max_steps=100, overwrite=True,
+                        buffer_size=64, asynchronous=True)
+try:
+    for i in range(1000):
+        saver.save()
+    saver.flush()
+    assert False
+except RuntimeError as error:
+    print(error, "<-", repr(error.__cause__))
+try:
+    saver.close()
+except RuntimeError:
+    pass
+assert saver.closed
+os.remove("test_5.h5")
@@ -0,0 +1,75 @@
+"""Test taking and restoring snapshots of systems.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import pandas as pd
+
+
+df = pd.DataFrame({"a": np.arange(50.0), "b": np.arange(50.0) ** 2})
+
+
+def make_system(name):
+    with System(name=name) as sys:
+        clock = make_clock(1.0)
+        data = make_data_system(df, name="data")
+        x = State(name="x", value=np.zeros(2))
+        k = Parameter(name="k", value=0.5)
+        y = Variable(name="y", value=0.0)
+
+        @make_function(x)
+        def step_x(x=x, a=data.a, k=k):
+            return k * x + a
+
+        @make_function(y)
+        def f_y(x=x, b=data.b):
+            return x.sum() + b
+    return sys
+
+
+sys = make_system("sys")
+twin = make_system("twin")
+for _ in range(10):
+    for s in (sys, twin):
+        s.forward()
+        s.transition()
+
+snapshot = take_snapshot(sys)
+assert "sys/x" in snapshot.values()
+assert "sys/k" not in snapshot.values()
+
+# Run ahead and change a parameter that is not in the snapshot
+for _ in range(5):
+    sys.forward()
+    sys.transition()
+sys.k.value = 0.9
+snapshot.restore()
+assert sys.k.value == 0.9
+sys.k.value = 0.5
+snapshot.restore()
+
+# Restoring puts the system back where it was
+for _ in range(10):
+    sys.forward()
+    twin.forward()
+    assert np.array_equal(sys.x.value, twin.x.value)
+    assert sys.y.value == twin.y.value
+    sys.transition()
+    twin.transition()
+
+# The snapshot does not share arrays with the system
+snapshot.restore()
+sys.x.value[0] = -1.0
+snapshot.restore()
+assert sys.x.value[0] != -1.0
+
+# Parameters are included on request
+snapshot = take_snapshot(sys, parameters=True)
+sys.k.value = 0.1
+snapshot.restore()
+assert sys.k.value == 0.5
@@ -0,0 +1,119 @@
+"""Test the cache of parsed and resampled input data.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import pandas as pd
+import shutil
+import os
+
+
+os.makedirs("test_cache_dir", exist_ok=True)
+source = os.path.join("test_cache_dir", "weather.csv")
+cache_dir = os.path.join("test_cache_dir", CACHE_DIR_NAME)
+df = pd.DataFrame({
+    "Index": 0.5 * np.arange(48),
+    "Tout": np.linspace(-4.0, 10.0, 48),
+    "Qsg": np.linspace(0.0, 470.0, 48)
+})
+df.to_csv(source, index=False)
+
+def cached_files():
+    return sorted(f for f in os.listdir(cache_dir) if f.endswith(".npy"))
+
+# The first load parses the file and fills the cache
+names, data = load_source(source, ["Tout", "Qsg"])
+assert names == ["Tout", "Qsg"]
+assert isinstance(data, np.memmap)
+assert np.allclose(data, df[["Tout", "Qsg"]].values)
+assert len(cached_files()) == 1
+
+# The second load maps the cached array
+names2, data2 = load_source(source, ["Tout", "Qsg"])
+assert names2 == names and np.all(data2 == data)
+assert len(cached_files()) == 1
+
+# Data systems use the cache
+fast = FastDataSystem(name="fast", data=source, columns=["Tout", "Qsg"])
+assert fast.Tout.value == data[0, 0]
+assert len(cached_files()) == 1
+
+# Resampled data are cached too (hours to seconds on a 10 minute grid)
+clock = make_clock(600.0)
+weather = TimeDataSystem(name="weather", data=source, times="Index",
+                         time_scale=3600.0, clock=clock, method="linear")
+assert weather.row.data.shape == (int(23.5 * 6) + 1, 2)
+assert np.isclose(weather.Tout.value, -4.0)
+weather.row.seek_time(2400.0)
+assert np.isclose(weather.Tout.value, -4.0 + 14.0 / 47.0 * 4.0 / 3.0)
+# The times and the resampled array are new entries
+assert len(cached_files()) == 3
+names3, resampled = load_source(
+    source, ["Tout", "Qsg"], times="Index", time_scale=3600.0,
+    grid=weather.row.grid, method="linear"
+)
+assert np.all(resampled == weather.row.data)
+
+# The columns of file-backed systems can be written
+num_cached = len(cached_files())
+stream = StreamingDataSystem(name="stream", source=source,
+                             columns=["Tout", "Qsg"], chunk_size=10)
+for system in [
+    FastDataSystem(name="fast", data=source, columns=["Tout", "Qsg"]),
+    TimeDataSystem(name="weather", data=source, times="Index",
+                   time_scale=3600.0, clock=clock, method="linear"),
+    stream
+]:
+    system.Tout.value = 100.0
+    assert system.Tout.value == 100.0
+stream.row.close()
+# The cached arrays are not changed
+names2, data2 = load_source(source, ["Tout", "Qsg"])
+assert np.all(data2 == data) and data2[0, 0] != 100.0
+assert np.isclose(
+    TimeDataSystem(name="weather", data=source, times="Index",
+                   time_scale=3600.0, clock=clock).Tout.value,
+    -4.0
+)
+assert len(cached_files()) == num_cached
+
+# Changing the source invalidates the cache
+df["Tout"] += 1.0
+df.to_csv(source, index=False)
+names, data = load_source(source, ["Tout", "Qsg"])
+assert np.allclose(data[:, 0], df["Tout"].values)
+assert len(cached_files()) == 1
+# Other settings are kept
+load_source(source, ["Qsg"])
+assert len(cached_files()) == 2
+
+# Another process may remove the old arrays at the same time
+real_remove = os.remove
+
+
+def racing_remove(f):
+    real_remove(f)
+    real_remove(f)
+
+
+df["Tout"] += 1.0
+df.to_csv(source, index=False)
+os.remove = racing_remove
+try:
+    names, data = load_source(source, ["Tout", "Qsg"])
+finally:
+    os.remove = real_remove
+assert np.allclose(data[:, 0], df["Tout"].values)
+assert len(cached_files()) == 1
+
+# The cache can be skipped
+names, data = load_source(source, cache=False)
+assert names == ["Index", "Tout", "Qsg"]
+assert not isinstance(data, np.memmap)
+
+shutil.rmtree("test_cache_dir")
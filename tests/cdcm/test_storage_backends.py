@@ -0,0 +1,117 @@
+"""Test saving simulations with the different storage backends.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import pyarrow.parquet as pq
+import zarr
+import h5py
+import json
+import shutil
+import os
+
+
+clock = make_clock(0.5)
+x = make_node("S:x:0.0:meters", description="The state of the system.")
+y = make_node("V:y", value=np.zeros((2, 3)), units="meters", description="A matrix.")
+
+@make_function(x)
+def f(x=x, dt=clock.dt):
+    """The transition function."""
+    return x + dt
+
+@make_function(y)
+def g(x=x):
+    return x * np.ones((2, 3))
+
+sys = System(name="sys", nodes=[clock, x, y, f, g])
+
+num_steps = 250
+targets = [
+    "test_backend.h5",
+    "test_backend.zarr",
+    "test_backend.parquet",
+    "memmap://test_backend.out",
+]
+for target in targets:
+    clock.t.value = 0.0
+    x.value = 0.0
+    with SimulationSaver(target, sys, max_steps=None, overwrite=True,
+                         buffer_size=32) as saver:
+        for i in range(num_steps):
+            sys.forward()
+            saver.save()
+            sys.transition()
+    print(target, type(saver.backend).__name__)
+
+expected_x = 0.5 * np.arange(num_steps)
+expected_y = expected_x[:, None, None] * np.ones((2, 3))
+
+with h5py.File("test_backend.h5", "r") as fd:
+    assert np.allclose(fd["sys/x"][:], expected_x)
+    assert np.allclose(fd["sys/y"][:], expected_y)
+    assert fd.attrs["num_steps"] == num_steps
+os.remove("test_backend.h5")
+
+root = zarr.open_group("test_backend.zarr", mode="r")
+assert root["sys/x"].shape == (num_steps,)
+assert np.allclose(root["sys/y"][:], expected_y)
+assert root["sys/clock/t"].attrs["units"] == "seconds"
+assert root.attrs["num_steps"] == num_steps
+shutil.rmtree("test_backend.zarr")
+
+table = pq.read_table("test_backend.parquet")
+assert table.column_names == ["sys/clock/dt", "sys/clock/t", "sys/x", "sys/y"]
+assert np.allclose(table["sys/x"].to_numpy(), expected_x)
+meta = json.loads(pq.read_metadata("test_backend.parquet").metadata[PARQUET_METADATA_KEY])
+assert meta["datasets"]["/sys/y"]["shape"] == [2, 3]
+assert meta["groups"][""]["num_steps"] == num_steps
+ys = np.stack(table["sys/y"].to_numpy(zero_copy_only=False)).reshape(-1, 2, 3)
+assert np.allclose(ys, expected_y)
+os.remove("test_backend.parquet")
+
+with open(os.path.join("test_backend.out", MEMMAP_METADATA)) as fd:
+    meta = json.load(fd)
+info = meta["datasets"]["/sys/y"]
+assert info["num_steps"] == num_steps
+ys = np.memmap(
+    os.path.join("test_backend.out", info["file"]),
+    dtype=info["dtype"],
+    mode="r",
+    shape=(info["num_steps"],) + tuple(info["shape"])
+)
+assert np.allclose(ys, expected_y)
+del ys
+shutil.rmtree("test_backend.out")
+
+# Compression is passed on to the backends
+with SimulationSaver("zarr://test_backend.out", sys, max_steps=100,
+                     overwrite=True, compression="gzip") as saver:
+    saver.save()
+assert zarr.open_group("test_backend.out", mode="r")["sys/x"].compressors
+shutil.rmtree("test_backend.out")
+
+# An explicit level of 0 is kept
+with SimulationSaver("zarr://test_backend.out", sys, max_steps=100,
+                     overwrite=True, compression="gzip",
+                     compression_opts=0) as saver:
+    saver.save()
+compressors = zarr.open_group("test_backend.out", mode="r")["sys/x"].compressors
+assert compressors[0].level == 0
+shutil.rmtree("test_backend.out")
+
+# The shuffle filter needs blosc
+try:
+    with SimulationSaver("zarr://test_backend.out", sys, max_steps=100,
+                         overwrite=True, compression="gzip",
+                         shuffle=True) as saver:
+        saver.save()
+    assert False, "Zarr cannot shuffle with gzip."
+except ValueError:
+    pass
+shutil.rmtree("test_backend.out", ignore_errors=True)
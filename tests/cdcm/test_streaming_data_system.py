@@ -0,0 +1,95 @@
+"""Test the StreamingDataSystem class.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import pandas as pd
+import h5py
+import os
+
+
+num_rows = 103
+df = pd.DataFrame({
+    "Tout": np.random.randn(num_rows),
+    "Qsg": np.random.rand(num_rows),
+    "Qint": np.arange(num_rows, dtype=float)
+})
+df.to_csv("test_stream.csv", index=False)
+df.to_parquet("test_stream.parquet")
+with h5py.File("test_stream.h5", "w") as fd:
+    for c in df.columns:
+        fd.create_dataset("weather/" + c, data=df[c].values)
+
+sources = [
+    dict(source="test_stream.csv"),
+    dict(source="test_stream.parquet", prefetch=0),
+    dict(source="test_stream.h5",
+         columns=["weather/Tout", "weather/Qsg", "weather/Qint"]),
+    dict(source=lambda: (df.values[i:i + 10] for i in range(0, num_rows, 10)),
+         columns=list(df.columns)),
+]
+for kwargs in sources:
+    weather = StreamingDataSystem(name="weather", chunk_size=7, **kwargs)
+    Q = make_node("V:Q:0.0")
+
+    @make_function(Q)
+    def total(Qsg=weather.Qsg, Qint=weather.Qint):
+        return Qsg + Qint
+
+    sys = System(name="sys", nodes=[weather, Q, total])
+    for i in range(num_rows):
+        sys.forward()
+        assert weather.row.value == i
+        assert weather.row.data.shape[0] <= 10
+        assert np.isclose(weather.Tout.value, df["Tout"].iloc[i])
+        assert np.isclose(Q.value, df["Qsg"].iloc[i] + df["Qint"].iloc[i])
+        sys.transition()
+    # Seek backwards and forwards
+    weather.row.seek(3)
+    assert weather.Qint.value == 3.0
+    weather.row.seek(95)
+    assert weather.Qint.value == 95.0
+    # Past the end of the data
+    weather.row.seek(num_rows)
+    try:
+        weather.Qint.value
+        assert False
+    except IndexError:
+        pass
+    weather.row.close()
+
+# Functions attached after the first transition are told about moves
+late = StreamingDataSystem(name="late", source=lambda: iter(
+    [np.arange(4.0).reshape(-1, 1), np.arange(4.0, 8.0).reshape(-1, 1)]
+), columns="a", prefetch=0)
+late.transition()
+y_late = Variable(name="y_late", value=0.0)
+f_late = make_function(y_late)(lambda a=late.a: 10.0 * a)
+f_late.forward()
+assert y_late.value == 10.0
+for _ in range(4):
+    late.transition()
+f_late.forward()
+assert y_late.value == 50.0
+
+# Errors of the reader are raised
+def bad_chunks():
+    yield np.zeros((2, 1))
+    raise RuntimeError("Broken source.")
+
+bad = StreamingDataSystem(name="bad", source=bad_chunks, columns="x")
+bad.transition()
+try:
+    bad.transition()
+    bad.transition()
+    assert False
+except RuntimeError:
+    pass
+
+for f in ["test_stream.csv", "test_stream.parquet", "test_stream.h5"]:
+    os.remove(f)
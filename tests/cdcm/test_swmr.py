@@ -0,0 +1,107 @@
+"""Test reading the output of a running simulation (SWMR mode).
+
+The simulation runs in another process that writes an HDF5 file in
+single-writer/multiple-reader mode. This process follows the file with
+a `SimulationTail`.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import subprocess
+import sys
+import os
+
+
+writer = """
+import time
+import numpy as np
+from cdcm import *
+
+clock = make_clock(0.5)
+x = make_node("S:x:0.0", description="A ramp.")
+flags = make_node("S:flags:0")
+A = make_node("V:A", value=np.eye(2))
+
+@make_function(x, flags)
+def f(x=x, flags=flags):
+    return x + 1.0, flags + 2
+
+sys = System(name="sys", nodes=[clock, x, flags, A, f])
+with SimulationSaver("test_swmr.h5", sys, max_steps=None, overwrite=True,
+                     buffer_size=4, swmr=True, flush_every=10,
+                     pack="subsystem",
+                     policies={"sys/A": OnChange()}) as saver:
+    print("ready", flush=True)
+    for i in range(200):
+        sys.forward()
+        saver.save()
+        sys.transition()
+        time.sleep(0.002)
+"""
+
+# The writer imports cdcm from this checkout wherever pytest runs
+repo_root = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)))
+python_path = os.pathsep.join(
+    [repo_root] + [p for p in [os.environ.get("PYTHONPATH")] if p]
+)
+proc = subprocess.Popen(
+    [sys.executable, "-c", writer],
+    stdout=subprocess.PIPE,
+    text=True,
+    env=dict(os.environ, PYTHONPATH=python_path)
+)
+assert proc.stdout.readline().strip() == "ready"
+
+xs, flags, ts = [], [], []
+sizes = []
+with SimulationTail("test_swmr.h5", paths=["sys/x", "sys/flags",
+                                            "sys/clock/t"]) as tail:
+    for new in tail.follow(interval=0.01, timeout=60.0):
+        xs.append(new["sys/x"])
+        flags.append(new["sys/flags"])
+        ts.append(new["sys/clock/t"])
+        sizes.append(len(new["sys/x"]))
+    assert tail.finished
+    assert tail.position == 200
+    assert tail.poll()["sys/x"].shape == (0,)
+assert proc.wait(timeout=60) == 0
+assert np.all(np.concatenate(xs) == np.arange(200.0))
+assert np.all(np.concatenate(flags) == np.arange(0, 400, 2))
+assert np.allclose(np.concatenate(ts), 0.5 * np.arange(200))
+assert sum(sizes) == 200
+
+# Sparse datasets are not followed
+with SimulationTail("test_swmr.h5") as tail:
+    assert "sys/A" not in tail.paths
+    assert "sys/x" in tail.paths
+
+with SimulationResults("test_swmr.h5") as res:
+    assert res.num_steps == 200
+    assert res["sys/x"].shape == (200,)
+    assert res.metadata["num_steps"] == 200
+os.remove("test_swmr.h5")
+
+# Files not written in SWMR mode are rejected
+s = System(name="s", nodes=[make_node("V:y:1.0")])
+with SimulationSaver("test_swmr.h5", s, max_steps=10, overwrite=True) as saver:
+    saver.save()
+try:
+    SimulationTail("test_swmr.h5")
+    assert False
+except (ValueError, OSError):
+    pass
+os.remove("test_swmr.h5")
+
+# SWMR is only available for HDF5 files
+try:
+    SimulationSaver("test_swmr.mmap", s, overwrite=True, swmr=True)
+    assert False
+except ValueError:
+    pass
@@ -0,0 +1,67 @@
+"""Test saving and loading a complete system.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import os
+
+
+class Oscillator(System):
+    """A system with internal nodes made out of closures."""
+
+    def define_internal_nodes(self, clock=None, **kwargs):
+        x = make_node("S:x:1.0:meters", description="Position.")
+        v = make_node("S:v:0.0:meters/second", description="Velocity.")
+        k = make_node("P:k:2.0:1/second**2", description="Stiffness.")
+
+        @make_function(x, v)
+        def step(x=x, v=v, k=k, dt=clock.dt):
+            """Symplectic Euler step."""
+            v_new = v - k * x * dt
+            return x + v_new * dt, v_new
+
+
+with System(name="sys") as sys:
+    clock = make_clock(0.1)
+    osc = Oscillator(name="osc", clock=clock)
+
+sys.forward()
+sys.transition()
+
+save_system(sys, "test_system.cdcm")
+sys2 = load_system("test_system.cdcm")
+os.remove("test_system.cdcm")
+
+print(sys2)
+
+# The loaded system is a new object with the same structure
+assert sys2 is not sys
+assert isinstance(sys2.osc, Oscillator)
+assert sys2.osc.x.owner is sys2.osc
+assert sys2.osc.step.parents[-1] is sys2.clock.dt
+assert sys2.osc.x.units == "meters"
+assert len(sys2.evaluation_order) == len(sys.evaluation_order)
+
+for i in range(100):
+    sys.forward()
+    sys2.forward()
+    sys.transition()
+    sys2.transition()
+    assert np.isclose(sys.osc.x.value, sys2.osc.x.value)
+    assert np.isclose(sys.clock.t.value, sys2.clock.t.value)
+
+# Saving without the compiled plan
+with open("test_system.cdcm", "wb") as fd:
+    save_system(sys, fd, include_plan=False)
+with open("test_system.cdcm", "rb") as fd:
+    sys3 = load_system(fd)
+os.remove("test_system.cdcm")
+assert "evaluation_order" not in sys3.__dict__
+sys3.forward()
+sys3.transition()
+print(f"x: {sys3.osc.x.value:1.3f}")
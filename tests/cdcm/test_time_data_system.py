@@ -0,0 +1,94 @@
+"""Test the TimeDataSystem class.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+import numpy as np
+import pandas as pd
+
+
+# Hourly data on a 10 minute clock
+times = 3600.0 * np.arange(24)
+df = pd.DataFrame({
+    "Tout": 10.0 + 5.0 * np.sin(2.0 * np.pi * times / 86400.0),
+    "Qsg": np.arange(24.0)
+})
+clock = make_clock(600.0)
+weather = TimeDataSystem(
+    name="weather",
+    data=df,
+    times=times,
+    clock=clock,
+    method="linear",
+    column_units=["degC", "W"]
+)
+zoh = TimeDataSystem(name="zoh", data=df, times=times, clock=clock,
+                     method="zoh")
+cubic = TimeDataSystem(name="cubic", data=df, times=times, clock=clock,
+                       method="cubic")
+sys = System(name="sys", nodes=[clock, weather, zoh, cubic])
+
+# The grid covers the data
+num_steps = 23 * 6 + 1
+assert weather.row.grid.shape == (num_steps,)
+assert weather.row.data.shape == (num_steps, 2)
+
+for k in range(num_steps):
+    sys.forward()
+    t = clock.t.value
+    assert np.isclose(weather.Qsg.value, t / 3600.0)
+    assert zoh.Qsg.value == np.floor(t / 3600.0 + 1e-9)
+    assert np.isclose(cubic.Qsg.value, t / 3600.0)
+    assert np.isclose(
+        weather.Tout.value,
+        np.interp(t, times, df["Tout"].values)
+    )
+    sys.transition()
+
+# After the end of the data the last values are held
+assert np.isclose(weather.Qsg.value, 23.0)
+
+# Jump to a time
+weather.row.seek_time(5.5 * 3600.0)
+assert np.isclose(weather.Qsg.value, 5.5)
+weather.row.seek_time(5.5 * 3600.0 + 100.0)
+assert np.isclose(weather.Qsg.value, 5.5)
+
+# Restart from the time of the clock
+clock.t.value = 7200.0
+for d in [weather, zoh, cubic]:
+    d.row.sync()
+assert np.isclose(weather.Qsg.value, 2.0)
+assert zoh.Qsg.value == 2.0
+
+# Without a clock
+short = TimeDataSystem(name="short", data=np.arange(5.0), times=np.arange(5.0),
+                       columns="x", dt=0.5, t0=1.0, method="zoh")
+assert np.all(short.row.data[:, 0] == [1, 1, 2, 2, 3, 3, 4])
+assert short.row.grid.shape == (7,)
+
+# Functions attached after the first transition are told about moves
+late = TimeDataSystem(name="late", data=np.arange(5.0), times=np.arange(5.0),
+                      columns="x", dt=1.0)
+late.transition()
+y_late = Variable(name="y_late", value=0.0)
+f_late = make_function(y_late)(lambda x=late.x: 10.0 * x)
+f_late.forward()
+assert y_late.value == 10.0
+late.transition()
+f_late.forward()
+assert y_late.value == 20.0
+late.row.seek_time(4.0)
+f_late.forward()
+assert y_late.value == 40.0
+
+# Resampling errors
+try:
+    resample(np.array([0.0, 0.0]), np.zeros((2, 1)), np.zeros(3))
+    assert False
+except ValueError:
+    pass
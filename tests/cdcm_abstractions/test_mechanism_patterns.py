@@ -0,0 +1,48 @@
+"""Test skipping steps of polynomial state mechanisms.
+
+Date:
+    10/19/2026
+
+"""
+
+
+from cdcm import *
+from cdcm_abstractions._mechanism_patterns import *
+import numpy as np
+
+
+def make_system(name, order, rate, clip=True):
+    with System(name=name) as sys:
+        clock = make_clock(0.5)
+        make_continuous_state_mechanism(
+            clock,
+            rate,
+            polynomial(order, _clip=clip),
+            0.9,
+            "health"
+        )
+    return sys
+
+
+# Stepping k times is the same as fast forwarding k steps. Some runs
+# reach the bounds.
+for order, rate, clip, k in [
+    (1, 0.01, True, 30),
+    (1, 0.1, True, 30),
+    (2, 0.3, True, 5),
+    (2, 0.3, True, 40),
+    (3, -0.5, True, 20),
+    (2, 0.3, False, 40),
+]:
+    slow = make_system("slow", order, rate, clip)
+    fast = make_system("fast", order, rate, clip)
+    assert can_fast_forward(fast)
+    for _ in range(k):
+        slow.forward()
+        slow.transition()
+    fast_forward(fast, k)
+    assert np.isclose(fast.health.value, slow.health.value), \
+        (order, rate, clip, k)
+    assert np.isclose(fast.clock.t.value, slow.clock.t.value)
+    if clip:
+        assert 0.0 <= fast.health.value <= 1.0
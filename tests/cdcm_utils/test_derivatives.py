@@ -0,0 +1,191 @@
+"""Test the derivatives of cdcm nodes
+
+Date:
+    10/19/2026
+
+"""
+
+import numpy as np
+import jax
+import jax.numpy as jnp
+from cdcm import *
+from cdcm_utils.derivatives import *
+
+
+# The checks compare with float64 references. 64-bit types are enabled
+# only here, so the modules collected after this one keep the default.
+with jax.enable_x64(True):
+    with System(name="sys") as sys:
+        x = Parameter(name="x", value=0.7)
+        k = Parameter(name="k", value=2)
+        w = Parameter(name="w", value=np.array([0.5, -1.0, 2.0]))
+        a = Variable(name="a", value=np.zeros(3))
+        b = Variable(name="b", value=0.0)
+        c = Variable(name="c", value=0.0)
+        y = Variable(name="y", value=0.0)
+        s = State(name="s", value=1.5)
+
+        @make_function(a)
+        def f_a(x=x, w=w):
+            return jnp.sin(x * w)
+
+        # A function with two outputs
+        @make_function(b, c)
+        def f_bc(a=a, x=x, k=k):
+            return jnp.sum(a ** 2) * x, jnp.dot(a, a) + k * x
+
+        @make_function(y)
+        def f_y(b=b, c=c, a=a, s=s):
+            return b * c + jnp.prod(a) + s * b
+
+        @make_function(s)
+        def f_s(s=s, y=y):
+            return 0.9 * s + 0.1 * y
+
+
+    def y_of(x, w, k, s):
+        a = jnp.sin(x * w)
+        b, c = jnp.sum(a ** 2) * x, jnp.dot(a, a) + k * x
+        return b * c + jnp.prod(a) + s * b
+
+
+    sys.forward()
+    assert np.isclose(y.value, y_of(x.value, w.value, k.value, s.value))
+    num_nodes = len(sys.nodes)
+
+    # All the ways of accumulating give the same derivatives
+    expected = {
+        "x": jax.jacfwd(y_of, argnums=0)(0.7, w.value, 2.0, 1.5),
+        "w": jax.jacfwd(y_of, argnums=1)(0.7, w.value, 2.0, 1.5),
+        "s": jax.jacfwd(y_of, argnums=3)(0.7, w.value, 2.0, 1.5),
+    }
+    for mode in ["forward", "reverse"]:
+        for use_jvp in [False, True]:
+            for name, node in [("x", x), ("w", w), ("s", s)]:
+                d = Derivative(sys, y, node, mode=mode, use_jvp=use_jvp)
+                assert np.allclose(d.value, expected[name]), \
+                    (mode, use_jvp, name)
+
+            # Vector outputs
+            d = Derivative(sys, a, w, mode=mode, use_jvp=use_jvp)
+            assert np.allclose(
+                d.value, np.diag(x.value * np.cos(x.value * w.value))
+            )
+
+            # Through the transition of a state
+            d = Derivative(sys, s, x, mode=mode, use_jvp=use_jvp)
+            assert np.allclose(d.value, 0.1 * expected["x"])
+
+            # The derivative w.r.t. an intermediate variable keeps the other
+            # paths fixed
+            d = Derivative(sys, y, a, mode=mode, use_jvp=use_jvp)
+            expected_a = jax.grad(
+                lambda a: (jnp.sum(a ** 2) * x.value)
+                * (jnp.dot(a, a) + 2 * x.value)
+                + jnp.prod(a) + s.value * jnp.sum(a ** 2) * x.value
+            )(a.value)
+            assert np.allclose(d.value, expected_a)
+
+    # Only the functions between x and y are evaluated
+    d = Derivative(sys, b, w)
+    assert d.update_seq == [f_a, f_bc]
+
+    # No nodes are added to the system
+    set_derivative(sys, y, x, "dydx")
+    set_derivative(sys, y, w, "dydw", mode="reverse")
+    assert len(sys.nodes) == num_nodes
+    assert np.allclose(sys.dydx.value, expected["x"])
+    assert np.allclose(sys.dydw.value, expected["w"])
+
+    # The derivatives follow the values of the nodes
+    update_seq = set_derivative(sys, b, x, "dbdx", derivative_update_seq=True)
+    x.value = 1.3
+    update_loss_grad(update_seq)
+    assert np.isclose(b.value, np.sum(np.sin(1.3 * w.value) ** 2) * 1.3)
+    assert np.allclose(
+        sys.dbdx.value,
+        jax.grad(lambda x: jnp.sum(jnp.sin(x * w.value) ** 2) * x)(1.3)
+    )
+
+    # Higher order derivatives
+    set_derivative(sys, sys.dbdx, x, "d2bdx2")
+    set_derivative(sys, sys.d2bdx2, x, "d3bdx3", mode="reverse", use_jvp=True)
+    b_of = lambda x: jnp.sum(jnp.sin(x * w.value) ** 2) * x
+    assert np.allclose(sys.d2bdx2.value, jax.grad(jax.grad(b_of))(1.3))
+    assert np.allclose(sys.d3bdx3.value,
+                       jax.grad(jax.grad(jax.grad(b_of)))(1.3))
+    set_derivative(sys, sys.dydw, x, "d2ydwdx")
+    sys.forward()
+    assert np.allclose(
+        sys.d2ydwdx.value,
+        jax.jacfwd(jax.jacfwd(y_of, argnums=1), argnums=0)(
+            1.3, w.value, 2.0, s.value
+        )
+    )
+    assert len(sys.nodes) == num_nodes
+
+    # Nodes that do not depend on x
+    try:
+        Derivative(sys, a, k)
+        assert False, "a does not depend on k."
+    except Exception as e:
+        assert "no simple paths" in str(e)
+
+    # The edge Jacobians are jitted once and shared by the Systems
+    traces = []
+
+
+    def g(u, v):
+        if isinstance(u, jax.core.Tracer):
+            traces.append(1)
+        return jnp.tanh(u * v), u ** 2
+
+
+    def clipped(u):
+        # Branches on the value. It cannot be jitted.
+        if u > 1.0:
+            return 1.0 + 0.0 * u
+        return u ** 3
+
+
+    def make_system(name):
+        with System(name=name) as sys:
+            u = Parameter(name="u", value=0.3)
+            v = Parameter(name="v", value=np.array([1.0, 2.0]))
+            p = Variable(name="p", value=np.zeros(2))
+            q = Variable(name="q", value=0.0)
+            r = Variable(name="r", value=0.0)
+            Function(name="f_pq", func=g, parents=(u, v), children=(p, q))
+            Function(name="f_r", func=clipped, parents=q, children=r)
+        return sys
+
+
+    sys1 = make_system("sys1")
+    sys2 = make_system("sys2")
+    assert edge_jacobian(g, (0, 1)) is edge_jacobian(g, (0, 1))
+    assert edge_jacobian(g, 0) is not edge_jacobian(g, (0, 1))
+    for s_ in [sys1, sys2]:
+        set_derivative(s_, s_.p, s_.u, "dpdu")
+        set_derivative(s_, s_.p, s_.v, "dpdv", batch_edges=False)
+        set_derivative(s_, s_.r, s_.u, "drdu", mode="reverse")
+    for step in range(20):
+        for s_ in [sys1, sys2]:
+            s_.u.value = 0.1 * step
+            s_.forward()
+            u_, v_ = 0.1 * step, s_.v.value
+            assert np.allclose(s_.dpdu.value, v_ / np.cosh(u_ * v_) ** 2)
+            assert np.allclose(s_.dpdv.value,
+                               np.diag(u_ / np.cosh(u_ * v_) ** 2))
+            assert np.isclose(s_.drdu.value, 0.0 if u_ > 1.0 else 6 * u_ ** 5)
+    # Traced a few times (shapes, dtypes and the modes), not every step
+    assert len(traces) <= 4, len(traces)
+    assert edge_jacobian(clipped, 0)._jitted is None
+
+    # Batched and separate edge Jacobians agree
+    for batch_edges in [True, False]:
+        for jit in [True, False]:
+            d = Derivative(sys, y, x, batch_edges=batch_edges, jit=jit)
+            assert np.allclose(
+                d.value,
+                jax.jacfwd(y_of, argnums=0)(x.value, w.value, 2.0, s.value)
+            )
@@ -0,0 +1,149 @@
+"""Test the disk cache of the JPL Horizons ephemerides
+
+Date:
+    10/19/2026
+
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import unquote
+
+import numpy as np
+from cdcm_utils.solar_irradiation import *
+
+
+def fake_response(query):
+    """A response in the format of JPL Horizons with 5 hourly rows."""
+    lines = []
+    for i in range(5):
+        if query["QUANTITIES"] == "'19'":
+            lines.append(f" 2022-Jan-10 0{i}:00  0.98{i}  0.01")
+        else:
+            lines.append(f" 2022-Jan-10 0{i}:00 *m  {100 + 10 * i}.0  {5 * i}.0")
+    return "header\n$$SOE\n" + "\n".join(lines) + "\n$$EOE\nfooter\n"
+
+
+class CountingFetcher(EphemerisFetcher):
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self, query):
+        self.calls += 1
+        return fake_response(query)
+
+
+class BrokenFetcher(EphemerisFetcher):
+    def fetch(self, query):
+        return "No ephemeris for the target."
+
+
+# A fetcher must implement fetch()
+try:
+    EphemerisFetcher()
+    assert False, "EphemerisFetcher is abstract."
+except TypeError:
+    pass
+
+
+window = dict(start_time="2022-01-10%2000:00", end_time="2022-01-10%2004:00",
+              step_size="1h")
+tmp = tempfile.mkdtemp()
+try:
+    fetcher = CountingFetcher()
+    cache = EphemerisCache(directory=os.path.join(tmp, "cache"),
+                           fetcher=fetcher)
+
+    # The first call fetches, the second comes from the cache
+    df = get_insolation_ephemeris(phi=0.7, lamda=0.5, cache=cache, **window)
+    assert fetcher.calls == 2
+    assert len(df) == 5
+    assert np.allclose(df["Solar Elevation"], [0.0, 5.0, 10.0, 15.0, 20.0])
+    df2 = get_insolation_ephemeris(phi=0.7, lamda=0.5, cache=cache, **window)
+    assert fetcher.calls == 2
+    assert df.equals(df2)
+    assert len(cache.keys()) == 2
+
+    # Another location needs only the azimuth and elevation
+    get_insolation_ephemeris(phi=45.6, lamda=88.5, cache=cache, **window)
+    assert fetcher.calls == 3
+
+    # The default cache is used when no cache is given
+    set_ephemeris_cache(cache)
+    get_insolation_ephemeris(phi=0.7, lamda=0.5, **window)
+    assert fetcher.calls == 3
+    set_ephemeris_cache(None)
+
+    # Pre-warm, export and use the copy offline
+    keys = prewarm_ephemeris(locations=[(0.7, 0.5), (88.5, -88.5)],
+                             cache=cache, **window)
+    assert len(keys) == 3
+    assert fetcher.calls == 4
+    export_ephemeris(os.path.join(tmp, "exported"), cache=cache, keys=keys)
+    offline = EphemerisCache(directory=os.path.join(tmp, "exported"),
+                             offline=True)
+    df3 = get_insolation_ephemeris(phi=0.7, lamda=0.5, cache=offline,
+                                   **window)
+    assert df.equals(df3)
+    try:
+        get_insolation_ephemeris(phi=45.6, lamda=88.5, cache=offline,
+                                 **window)
+        assert False, "The ephemeris is not cached."
+    except EphemerisNotCached:
+        pass
+
+    # A directory of files can fill another cache
+    other = EphemerisCache(
+        directory=os.path.join(tmp, "other"),
+        fetcher=DirectoryFetcher(os.path.join(tmp, "exported"))
+    )
+    get_insolation_ephemeris(phi=88.5, lamda=-88.5, cache=other, **window)
+    assert len(other.keys()) == 2
+
+    # Responses without an ephemeris are not cached
+    broken = EphemerisCache(directory=os.path.join(tmp, "broken"),
+                            fetcher=BrokenFetcher())
+    try:
+        get_insolation_ephemeris(phi=0.7, lamda=0.5, cache=broken, **window)
+        assert False, "The response has no ephemeris."
+    except ValueError:
+        pass
+    assert broken.keys() == []
+
+    # A stand-in server that answers like JPL Horizons
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = unquote(self.path.split("?", 1)[1]).split("&")
+            query = dict(p.split("=", 1) for p in params)
+            requested.append(query)
+            body = fake_response(query).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/api/horizons.api"
+        served = EphemerisCache(directory=os.path.join(tmp, "served"),
+                                fetcher=HorizonsFetcher(url=url))
+        df4 = get_insolation_ephemeris(phi=0.7, lamda=0.5, cache=served,
+                                       **window)
+        assert df.equals(df4)
+        assert len(requested) == 2
+        assert requested[1]["SITE_COORD"] == "'0.5,0.7,0.0'"
+    finally:
+        server.shutdown()
+        server.server_close()
+finally:
+    shutil.rmtree(tmp)
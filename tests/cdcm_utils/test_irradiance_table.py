@@ -0,0 +1,84 @@
+"""Test the vectorized solar irradiance tables
+
+Date:
+    10/19/2026
+
+"""
+
+import shutil
+import tempfile
+
+import numpy as np
+from cdcm import *
+from cdcm_utils.solar_irradiation import *
+
+
+num_rows = 48
+
+
+def fake_response(query):
+    """A response in the format of JPL Horizons with hourly rows."""
+    lines = []
+    if query["QUANTITIES"] == "'19'":
+        for i in range(num_rows):
+            lines.append(f" 2022-Jan-{10 + i // 24} {i % 24:02d}:00"
+                         f"  {0.98 + 0.0005 * i:.5f}  0.01")
+    else:
+        lamda, phi, _ = map(float, query["SITE_COORD"].strip("'").split(","))
+        for i in range(num_rows):
+            azimuth = (15.0 * i + lamda) % 360
+            elevation = 60.0 * np.sin(2 * np.pi * i / 24 + np.radians(phi))
+            lines.append(f" 2022-Jan-{10 + i // 24} {i % 24:02d}:00 *m"
+                         f"  {azimuth:.4f}  {elevation:.4f}")
+    return "header\n$$SOE\n" + "\n".join(lines) + "\n$$EOE\nfooter\n"
+
+
+class FakeFetcher(EphemerisFetcher):
+    def fetch(self, query):
+        return fake_response(query)
+
+
+window = dict(start_time="2022-01-10%2000:00", end_time="2022-01-11%2023:00",
+              step_size="1h")
+sites = [(0.7, 0.5), (45.6, 88.5), (88.5, -88.5)]
+orientations = [(0.0, 0.0), (0.5, 90.0), (1.2, 200.0), (np.pi / 2, 10.0)]
+tmp = tempfile.mkdtemp()
+try:
+    cache = EphemerisCache(directory=tmp, fetcher=FakeFetcher())
+    table = get_insolation_table(sites=sites, orientations=orientations,
+                                 cache=cache, **window)
+    assert table.Q.shape == (num_rows, len(sites), len(orientations))
+    assert table.shape == (len(sites), len(orientations))
+    assert np.allclose(table.times, 3600.0 * np.arange(num_rows))
+
+    # The table is the same as the ephemeris of each site and surface
+    for s, (phi, lamda) in enumerate(sites):
+        for o, (alpha, beta) in enumerate(orientations):
+            df = get_insolation_ephemeris(phi=phi, lamda=lamda, alpha=alpha,
+                                          beta=beta, cache=cache, **window)
+            assert np.allclose(table.Q[:, s, o], df["Q"].to_numpy())
+    assert np.any(table.Q > 0) and np.any(table.Q == 0)
+
+    # Interpolation
+    assert np.allclose(table(table.times), table.Q)
+    t = 3600.0 * 5.25
+    assert np.allclose(table(t), 0.75 * table.Q[5] + 0.25 * table.Q[6])
+    ts = np.array([[-10.0, 1800.0], [3600.0 * 100, 3600.0 * 3]])
+    Q = table(ts)
+    assert Q.shape == (2, 2, len(sites), len(orientations))
+    assert np.allclose(Q[0, 0], table.Q[0])
+    assert np.allclose(Q[0, 1], 0.5 * (table.Q[0] + table.Q[1]))
+    assert np.allclose(Q[1, 0], table.Q[-1])
+    assert np.allclose(Q[1, 1], table.Q[3])
+
+    # A data system on the grid of a clock in hours
+    clock = make_clock(0.5, units="hr")
+    irr = table.make_data_system(clock=clock, time_scale=1.0 / 3600.0)
+    sys = System(name="sys", nodes=[clock, irr])
+    for _ in range(10):
+        sys.forward()
+        t = clock.t.value * 3600.0
+        assert np.isclose(irr.Q_1_2.value, table(t)[1, 2])
+        sys.transition()
+finally:
+    shutil.rmtree(tmp)